@@ -0,0 +1,152 @@
+"""
+Stand-in `win32gui` / `win32con` / `win32api` modules backed by an in-memory desktop, so the Win32 code paths
+run on any platform. Call `install()` before importing anything from `w3cwatcher`.
+"""
+
+from __future__ import annotations
+
+import sys
+import types
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+GA_ROOT = 2
+
+
+@dataclass
+class FakeWindow:
+    hwnd: int
+    title: str
+    rect: Tuple[int, int, int, int]  # left, top, width, height of the client area in screen coordinates
+    visible: bool = True
+
+
+class FakeDesktop:
+    def __init__(self):
+        self.windows: Dict[int, FakeWindow] = {}
+        self.calls: Dict[str, int] = {}
+        self._next_hwnd = 0x1000
+
+    def add_window(self, title: str, rect=(0, 0, 800, 600), visible: bool = True) -> int:
+        self._next_hwnd += 4
+        self.windows[self._next_hwnd] = FakeWindow(self._next_hwnd, title, rect, visible)
+        return self._next_hwnd
+
+    def remove_window(self, hwnd: int) -> None:
+        self.windows.pop(hwnd, None)
+
+    def populate(self, count: int, prefix: str = "Window") -> None:
+        for i in range(count):
+            self.add_window(f"{prefix} {i} - Some Application", rect=(i % 50, i % 30, 640, 480))
+
+    def count(self, name: str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+
+desktop = FakeDesktop()
+
+
+def _window(hwnd: int) -> FakeWindow:
+    try:
+        return desktop.windows[hwnd]
+    except KeyError:
+        raise OSError(1400, "Invalid window handle.") from None
+
+
+def _build_win32gui() -> types.ModuleType:
+    mod = types.ModuleType("win32gui")
+
+    def EnumWindows(callback, param):
+        desktop.count("EnumWindows")
+        for hwnd in list(desktop.windows):
+            if callback(hwnd, param) is False:
+                return
+
+    def IsWindow(hwnd: int) -> bool:
+        desktop.count("IsWindow")
+        return hwnd in desktop.windows
+
+    def IsWindowVisible(hwnd: int) -> bool:
+        window = desktop.windows.get(hwnd)
+        return bool(window and window.visible)
+
+    def GetWindowText(hwnd: int) -> str:
+        window = desktop.windows.get(hwnd)
+        return window.title if window else ""
+
+    def ClientToScreen(hwnd: int, point: Tuple[int, int]) -> Tuple[int, int]:
+        desktop.count("ClientToScreen")
+        left, top, _, _ = _window(hwnd).rect
+        return left + point[0], top + point[1]
+
+    def GetClientRect(hwnd: int) -> Tuple[int, int, int, int]:
+        desktop.count("GetClientRect")
+        _, _, width, height = _window(hwnd).rect
+        return 0, 0, width, height
+
+    def GetWindowRect(hwnd: int) -> Tuple[int, int, int, int]:
+        left, top, width, height = _window(hwnd).rect
+        return left, top, left + width, top + height
+
+    def WindowFromPoint(point: Tuple[int, int]) -> int:
+        desktop.count("WindowFromPoint")
+        x, y = point
+        # last added window is topmost
+        for window in reversed(list(desktop.windows.values())):
+            left, top, width, height = window.rect
+            if window.visible and left <= x < left + width and top <= y < top + height:
+                return window.hwnd
+        return 0
+
+    def GetAncestor(hwnd: int, flag: int) -> int:
+        desktop.count("GetAncestor")
+        return hwnd
+
+    def GetWindowPlacement(hwnd: int):
+        return 0, 1, (-1, -1), (-1, -1), GetWindowRect(hwnd)
+
+    def ShowWindow(hwnd: int, cmd: int) -> None:
+        pass
+
+    def SetForegroundWindow(hwnd: int) -> None:
+        pass
+
+    for fn in (
+        EnumWindows, IsWindow, IsWindowVisible, GetWindowText, ClientToScreen, GetClientRect,
+        GetWindowRect, WindowFromPoint, GetAncestor, GetWindowPlacement, ShowWindow, SetForegroundWindow,
+    ):  # fmt: skip
+        setattr(mod, fn.__name__, fn)
+    return mod
+
+
+def _build_win32con() -> types.ModuleType:
+    mod = types.ModuleType("win32con")
+    mod.GA_ROOT = GA_ROOT
+    mod.SW_SHOWMINIMIZED = 2
+    mod.SW_RESTORE = 9
+    return mod
+
+
+def _build_win32api() -> types.ModuleType:
+    mod = types.ModuleType("win32api")
+    mod.GetLastError = lambda: 0
+    return mod
+
+
+def install() -> FakeDesktop:
+    """
+    Register the fake modules and make `ensure_windows()` pass; returns the shared desktop.
+    """
+    if "w3cwatcher.utils.window" in sys.modules and not isinstance(
+        getattr(sys.modules["w3cwatcher.utils.window"], "win32gui", None), types.ModuleType
+    ):
+        raise RuntimeError("benchmarks.fakes.install() must run before w3cwatcher.utils is imported")
+
+    sys.modules.setdefault("win32gui", _build_win32gui())
+    sys.modules.setdefault("win32con", _build_win32con())
+    sys.modules.setdefault("win32api", _build_win32api())
+
+    from w3cwatcher.utils import platform
+
+    platform._IS_WINDOWS = True
+    return desktop
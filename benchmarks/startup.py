@@ -0,0 +1,128 @@
+"""
+Import-time budget for the CLI entry points, measured with `python -X importtime` in fresh interpreters.
+
+    python -m benchmarks.startup [--runs 7] [--update] [--headroom 1.5]
+
+Each scenario imports what one CLI mode loads before it starts doing work. A scenario fails when its median
+import time exceeds the budget stored in startup_budget.json, or when it pulls in a module it must not
+(e.g. the tray GUI stack for plain CLI mode). --update rewrites the budget from this run times --headroom.
+
+Budgets are scaled by how long a fixed set of stdlib imports takes now versus when the budget was written,
+so a slower or busier machine does not fail the check on its own.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+BUDGET_FILE = Path(__file__).with_name("startup_budget.json")
+
+# stdlib imports timed as a yardstick for the speed of the machine
+REFERENCE = ["argparse", "dataclasses", "logging", "json", "queue", "http.server"]
+
+_GUI = ["pystray", "tkinter", "win32event", "win32com"]
+# only imported once a monitor loop actually runs
+_LOOP = ["asyncio"]
+
+# name -> (modules to import, top level modules that must not get imported)
+SCENARIOS: Dict[str, Tuple[List[str], List[str]]] = {
+    "cli": (["w3cwatcher.cli"], ["numpy", "PIL", "requests", "tomlkit", *_LOOP, *_GUI]),
+    "tail": (
+        ["w3cwatcher.cli", "w3cwatcher.log_tail"],
+        ["numpy", "PIL", "requests", "tomlkit", *_LOOP, *_GUI],
+    ),
+    "check": (["w3cwatcher.cli", "w3cwatcher.monitor"], ["requests", "tomlkit", *_LOOP, *_GUI]),
+    "watch": (["w3cwatcher.cli", "w3cwatcher.monitor", "w3cwatcher.discord_notifier"], ["tomlkit", *_GUI]),
+}
+
+
+def import_profile(modules: List[str]) -> Tuple[float, Set[str]]:
+    """
+    Import `modules` in a fresh interpreter; returns total import time in seconds and the top level
+    names of every module that got imported.
+    """
+    code = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).resolve().parents[1],
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {modules} failed:\n{proc.stderr}")
+
+    total_us = 0
+    imported = set()
+    lines = [line for line in proc.stderr.splitlines() if line.startswith("import time:") and "|" in line]
+    # everything up to `site` is interpreter start-up (including .pth hooks), the same for every scenario
+    names = [line.rsplit("|", 1)[1].strip() for line in lines]
+    start = len(names) - names[::-1].index("site") if "site" in names else 0
+    for line in lines[start:]:
+        # import time: self [us] | cumulative | imported package (nesting shown by indentation)
+        _, cumulative_us, name = line[len("import time:") :].split("|")
+        if not name[1:].startswith(" "):
+            total_us += int(cumulative_us)
+        imported.add(name.strip().split(".")[0])
+    return total_us / 1e6, imported
+
+
+def measure(modules: List[str], runs: int) -> Tuple[float, Set[str]]:
+    import_profile(modules)  # warm up: compile bytecode, fill the OS file cache
+    times = []
+    imported = set()
+    for _ in range(runs):
+        seconds, imported = import_profile(modules)
+        times.append(seconds)
+    return statistics.median(times), imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7, help="Fresh interpreters per scenario.")
+    parser.add_argument("--update", action="store_true", help="Rewrite the budget file from this run.")
+    parser.add_argument("--headroom", type=float, default=1.5, help="Budget = measured * headroom on --update.")
+    args = parser.parse_args()
+
+    budget = json.loads(BUDGET_FILE.read_text(encoding="utf-8")) if BUDGET_FILE.exists() else {}
+    reference_s, _ = measure(REFERENCE, args.runs)
+    scale = reference_s * 1000 / budget["reference_ms"] if budget.get("reference_ms") else 1.0
+    print(f"reference  {reference_s * 1000:>8.1f} ms  (machine speed factor {scale:.2f})")
+
+    ok = True
+    measured = {}
+    for name, (modules, forbidden) in SCENARIOS.items():
+        seconds, imported = measure(modules, args.runs)
+        measured[name] = seconds
+        limit_ms = budget.get("scenarios", {}).get(name, {}).get("budget_ms")
+        if limit_ms is not None:
+            limit_ms *= scale
+
+        problems = [f"imports {m}" for m in forbidden if m in imported]
+        if limit_ms is not None and seconds * 1000 > limit_ms and not args.update:
+            problems.append(f"over budget of {limit_ms:.1f} ms")
+        ok = ok and not problems
+        budget_text = f"{limit_ms:.1f} ms" if limit_ms is not None else "-"
+        print(f"{name:<10} {seconds * 1000:>8.1f} ms  (budget {budget_text})  {', '.join(problems)}")
+
+    if args.update:
+        budget = {
+            "reference_ms": round(reference_s * 1000, 2),
+            "scenarios": {
+                name: {"budget_ms": round(s * 1000 * args.headroom, 1)} for name, s in measured.items()
+            },
+        }
+        BUDGET_FILE.write_text(json.dumps(budget, indent=2) + "\n", encoding="utf-8")
+        print(f"Budget written to {BUDGET_FILE}")
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,458 @@
+"""
+Hot path benchmarks. Runs on any platform using the stand-in Win32 modules from `benchmarks.fakes`.
+
+    python -m benchmarks.suite [--output results.json] [--compare baseline.json] [--filter GROUP[/NAME]]
+
+Results are written as JSON (seconds per call, plus environment metadata) so runs of different versions
+can be compared with --compare, which exits non-zero if anything got slower than --threshold allows.
+"""
+
+from __future__ import annotations
+
+from benchmarks import fakes
+
+desktop = fakes.install()
+
+import argparse
+import json
+import logging
+import platform
+import random
+import statistics
+import string
+import sys
+import tempfile
+import timeit
+import tomllib
+from datetime import datetime, timedelta
+from importlib import metadata
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import tomlkit
+
+from w3cwatcher import utils
+from w3cwatcher.capture import SyntheticCaptureBackend
+from w3cwatcher.clock import VirtualClock
+from w3cwatcher.config import Config, MonitorConfig
+from w3cwatcher.discord_notifier import DiscordNotifier
+from w3cwatcher.log_tail import LogTail
+from w3cwatcher.logging import LogFiles, Logger, LogMaintenance, RedactionRegistry
+from w3cwatcher.monitor import Monitor
+from w3cwatcher.recording import IN_GAME, TICK_DTYPE, WINDOW_FOUND, TickRecorder, read_recording
+from w3cwatcher.state_manager import StateManager
+from w3cwatcher.utils.config_base import LayerCache
+
+Bench = Tuple[str, Callable[[], None]]
+
+_TMP = Path(tempfile.mkdtemp(prefix="w3cwatcher-bench-"))
+_WEBHOOK = "https://discord.com/api/webhooks/123456789012345678/abcdefghijklmnopqrstuvwxyz-ABCDEFGHIJ"
+
+_W3C_RECT = (200, 100, 1846, 1040)
+
+SAMPLE_CONFIG = """
+[monitor]
+w3champions_window_title = "W3Champions"
+x_offset_pct = 0.75
+y_offset_pct = 0.95
+probe_offsets_pct = [[0.74, 0.955], [0.77, 0.955]]
+poll_s = 0.5
+
+[notifications.discord]
+webhook_url = "%s"
+debounce = 30
+
+[logging]
+log_level = "DEBUG"
+""" % _WEBHOOK
+
+
+def _quiet_logger(level: str = "INFO") -> Logger:
+    return Logger(log_level=level, log_dir=_TMP / "logs")
+
+
+def _setup_desktop(window_count: int = 500) -> int:
+    desktop.windows.clear()
+    desktop.populate(window_count)
+    return desktop.add_window("W3Champions", rect=_W3C_RECT)
+
+
+def bench_color() -> List[Bench]:
+    lut = utils.get_color_lut(cache_dir=_TMP / "cache")
+    frame = np.random.default_rng(0).integers(0, 256, (1080, 1920, 3), dtype=np.uint8)
+    probes = frame[500, 900:905]
+
+    return [
+        ("name_color", lambda: utils.name_color(230, 40, 30)),
+        ("color_lut.name", lambda: lut.name(230, 40, 30)),
+        ("color_lut.classify[5 probes]", lambda: lut.classify(probes)),
+        ("name_colors[1080p frame]", lambda: utils.name_colors(frame)),
+        ("color_lut.classify[1080p frame]", lambda: lut.classify(frame)),
+    ]
+
+
+def bench_geometry() -> List[Bench]:
+    hwnd = _setup_desktop()
+    offsets = [(0.755, 0.955), (0.74, 0.955), (0.77, 0.955)]
+    cache = utils.WindowGeometryCache(offsets, 1846 / 1040)
+    geometry = cache.geometry(hwnd)
+    cache.belongs(geometry)
+    return [
+        ("crop_to_aspect_ratio", lambda: utils.crop_to_aspect_ratio((0, 0, 1920, 1080), 1846 / 1040)),
+        (
+            "hwnd_relative_to_screen_xy",
+            lambda: utils.hwnd_relative_to_screen_xy(hwnd, 0.755, 0.955, 1846 / 1040),
+        ),
+        (
+            "hwnd_relative_to_screen_points[3]",
+            lambda: utils.hwnd_relative_to_screen_points(hwnd, offsets, 1846 / 1040),
+        ),
+        ("point_belongs_to_window", lambda: utils.point_belongs_to_window(hwnd, (1500, 1000))),
+        ("window_geometry_cache.geometry[3, cached]", lambda: cache.geometry(hwnd)),
+        ("window_geometry_cache.belongs[3, cached]", lambda: cache.belongs(geometry)),
+    ]
+
+
+def bench_windows() -> List[Bench]:
+    _setup_desktop(500)
+    desktop.add_window("Warcraft III", rect=(0, 0, 1920, 1080))
+    locator = utils.WindowLocator(["W3Champions", "Warcraft III"])
+    locator.locate()
+    partial_locator = utils.WindowLocator(["W3Champions", "Not Running"])
+    partial_locator.locate()
+    return [
+        ("find_window_by_title[500 windows]", lambda: utils.find_window_by_title("W3Champions")),
+        (
+            "find_windows_by_titles[500 windows, 2 titles]",
+            lambda: utils.find_windows_by_titles(["W3Champions", "Warcraft III"]),
+        ),
+        ("window_locator.locate[500 windows, cached]", locator.locate),
+        ("window_locator.locate[500 windows, one title missing]", partial_locator.locate),
+    ]
+
+
+def bench_monitor() -> List[Bench]:
+    _setup_desktop(500)
+    frame = np.full((_W3C_RECT[3], _W3C_RECT[2], 3), (230, 30, 30), dtype=np.uint8)
+    capture = SyntheticCaptureBackend([frame], origin=_W3C_RECT[:2])
+
+    logger = _quiet_logger()
+    config = MonitorConfig()
+    config.probe_offsets_pct = [[0.74, 0.955], [0.77, 0.955]]
+    monitor = Monitor(logger, config, StateManager(logger), capture=capture)
+    monitor._sync_plan()
+    monitor._get_color_lut()
+
+    lifecycle_monitor = Monitor(logger, config, StateManager(logger), capture=capture)
+
+    def start_stop() -> None:
+        lifecycle_monitor.start()
+        lifecycle_monitor.stop()
+        lifecycle_monitor.join()
+
+    return [
+        ("monitor.tick[500 windows, 3 probes, in queue]", lambda: monitor._tick(True)),
+        ("monitor.start+stop+join", start_stop),
+    ]
+
+
+def simulate_queue_cycles(
+    cycles: int, lobby_s: float = 120.0, queue_s: float = 1200.0, game_s: float = 1500.0
+) -> List[timedelta]:
+    """
+    Run the monitor on a VirtualClock through `cycles` times lobby -> queue -> game; returns the time in
+    queue reported with every match start.
+    """
+    _setup_desktop(50)
+    lobby = np.full((_W3C_RECT[3], _W3C_RECT[2], 3), (100, 100, 100), dtype=np.uint8)
+    queue = np.full((_W3C_RECT[3], _W3C_RECT[2], 3), (230, 30, 30), dtype=np.uint8)
+    capture = SyntheticCaptureBackend([lobby, queue], origin=_W3C_RECT[:2])
+
+    clock = VirtualClock()
+    logger = _quiet_logger()
+    state_manager = StateManager(logger, clock=clock)
+    queue_times = []
+    state_manager.add_state_change_listener(
+        lambda state, after: queue_times.append(after) if state == "in-game" else None
+    )
+    config = MonitorConfig()
+    config.probe_offsets_pct = [[0.74, 0.955], [0.77, 0.955]]
+    monitor = Monitor(logger, config, state_manager, capture=capture, clock=clock)
+
+    def start_game():
+        capture.set_frame(0)
+        desktop.add_window("Warcraft III", rect=(0, 0, 1920, 1080))
+
+    def end_game():
+        for hwnd, window in list(desktop.windows.items()):
+            if window.title == "Warcraft III":
+                desktop.remove_window(hwnd)
+
+    t = 0.0
+    for _ in range(cycles):
+        clock.call_at(t := t + lobby_s, lambda: capture.set_frame(1))
+        clock.call_at(t := t + queue_s, start_game)
+        clock.call_at(t := t + game_s, end_game)
+    clock.call_at(t + lobby_s, monitor.stop)
+    monitor.run()
+    return queue_times
+
+
+def bench_recording() -> List[Bench]:
+    """
+    Cost of recording a tick on the monitor thread, and replay throughput over a recording.
+    """
+    recorder = TickRecorder(_TMP / "record.bin")
+    points = [(1494, 1093), (1466, 1093), (1521, 1093)]
+    pixels = np.array([(230, 30, 30)] * 3, dtype=np.uint8)
+    colors = np.array([4, 4, 4], dtype=np.uint8)
+
+    def record():
+        recorder.record(1.0, 0x1004, None, points, pixels, colors, in_queue=True, state="in-queue")
+
+    # 100k ticks alternating between idle, queue and game phases of random length
+    rng = np.random.default_rng(2)
+    ticks = np.zeros(100_000, dtype=TICK_DTYPE)
+    ticks["t"] = np.arange(len(ticks)) * 0.5
+    ticks["probes"] = 3
+    phase = np.repeat(rng.integers(0, 3, 2000), 50)
+    ticks["flags"] = WINDOW_FOUND | np.where(phase == 2, IN_GAME, 0)
+    ticks["rgb"][:, :3] = np.where((phase == 1)[:, None, None], (230, 30, 30), (100, 100, 100))
+    replay_path = _TMP / "replay.bin"
+    replay_recorder = TickRecorder(replay_path)
+    replay_recorder.close()
+    with open(replay_path, "ab") as f:
+        f.write(ticks.tobytes())
+
+    logger = _quiet_logger()
+    config = MonitorConfig()
+    config.probe_offsets_pct = [[0.74, 0.955], [0.77, 0.955]]
+    monitor = Monitor(logger, config, StateManager(logger))
+    monitor._get_color_lut()
+    recording = read_recording(replay_path)
+
+    return [
+        ("tick_recorder.record[3 probes]", record),
+        ("monitor.replay[100k ticks]", lambda: monitor.replay(recording)),
+    ]
+
+
+def bench_config() -> List[Bench]:
+    path = _TMP / "config.toml"
+    path.write_text(SAMPLE_CONFIG, encoding="utf-8")
+    data = tomlkit.loads(SAMPLE_CONFIG).unwrap()
+
+    def load_and_merge():
+        config = Config()
+        config.update_from(Config.from_file(path))
+        return config
+
+    layers = [path, _TMP / "missing.toml"]
+    cache = LayerCache()
+    cache.read(path)
+
+    return [
+        ("config.construct", Config),
+        ("config.from_dict", lambda: Config.from_dict(data)),
+        ("config.from_file", lambda: Config.from_file(path)),
+        ("config.from_file[round_trip]", lambda: Config.from_file(path, round_trip=True)),
+        ("config.load_and_merge", load_and_merge),
+        ("config.from_files[cached]", lambda: Config.from_files(layers, cache=cache)),
+        ("config.validate_all", Config.from_dict(data).validate_all),
+        ("config.as_toml", lambda: Config.from_dict(data).as_toml(include_defaults=True, comment="source")),
+    ]
+
+
+def bench_logging() -> List[Bench]:
+    logger = _quiet_logger("INFO")
+    logger.add_secrets(*DiscordNotifier.discord_webhook_secrets(_WEBHOOK))
+    rgb = [(230, 30, 30)]
+    log_dir = _TMP / "rotating"
+    log_dir.mkdir(exist_ok=True)
+    maintenance = LogMaintenance(log_dir, "bench", keep=3)
+    files = LogFiles(
+        log_dir / "bench_run.log", log_dir / "latest.log", max_bytes=1024**2, maintenance=maintenance
+    )
+    line = "2025-01-01 12:00:00.000 [DEBUG]: RGB=[(230, 30, 30)] -> in_queue=True, in_game=False\n"
+    return [
+        ("logger.info[redacted]", lambda: logger.info(f"Posting to {_WEBHOOK}")),
+        ("log_files.write[1 MiB segments]", lambda: files.write(line)),
+        ("logger.debug[disabled]", lambda: logger.debug(f"RGB={rgb} -> in_queue=True, in_game=False")),
+        ("logger.debug[disabled, guarded]", lambda: logger.debug_enabled and logger.debug(f"RGB={rgb}")),
+    ]
+
+
+def _fake_webhook_secrets(count: int) -> List[str]:
+    rng = random.Random(count)
+    token_chars = string.ascii_letters + string.digits + "_-"
+    secrets = []
+    for _ in range(count // 2 or 1):
+        secrets.append(str(rng.randrange(10**17, 10**18)))
+        secrets.append("".join(rng.choice(token_chars) for _ in range(68)))
+    return secrets[:count]
+
+
+def bench_redaction() -> List[Bench]:
+    """
+    One registry regex vs. the previous approach of one str.replace pass per secret.
+    """
+    line = f"2025-01-01 12:00:00.000 [INFO]: Posting to {_WEBHOOK} RGB=[(230, 30, 30)] -> in_queue=True"
+    benches = []
+    for count in (2, 20, 200):
+        secrets = _fake_webhook_secrets(count)
+        registry = RedactionRegistry()
+        registry.add(*secrets)
+
+        def chained_replace(text=line, secrets=secrets):
+            for secret in secrets:
+                text = text.replace(secret, "****")
+            return text
+
+        benches.append((f"registry.redact[{count} secrets]", lambda r=registry: r.redact(line)))
+        benches.append((f"chained_replace[{count} secrets]", chained_replace))
+    return benches
+
+
+def bench_tail() -> List[Bench]:
+    """
+    Reading the last lines should cost the same for any size of log, unlike reading the whole file.
+    """
+    path = _TMP / "tail.log"
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(300_000):
+            level = "WARNING" if i % 100 == 0 else "DEBUG"
+            f.write(f"2025-01-01 12:00:00.000 [{level}]: RGB=[(230, 30, 30)] -> in_queue=True, tick {i}\n")
+    size = f"{path.stat().st_size // 1024**2} MB log"
+
+    def read_whole_file():
+        return path.read_text(encoding="utf-8").splitlines()[-40:]
+
+    return [
+        (f"log_tail.last[40 lines, {size}]", lambda: LogTail(path).last(40)),
+        (f"log_tail.last[40 warnings, {size}]", lambda: LogTail(path, "WARNING").last(40)),
+        (f"read_whole_file[40 lines, {size}]", read_whole_file),
+    ]
+
+
+def bench_simulation() -> List[Bench]:
+    """
+    A 47 minute lobby -> 20 minute queue -> game cycle on a virtual clock.
+    """
+    return [("simulate_queue_cycles[1 cycle, 47 min]", lambda: simulate_queue_cycles(1))]
+
+
+GROUPS: Dict[str, Callable[[], List[Bench]]] = {
+    "color": bench_color,
+    "geometry": bench_geometry,
+    "windows": bench_windows,
+    "monitor": bench_monitor,
+    "recording": bench_recording,
+    "simulation": bench_simulation,
+    "config": bench_config,
+    "logging": bench_logging,
+    "redaction": bench_redaction,
+    "tail": bench_tail,
+}
+
+
+def check_color_lut_parity(samples: int = 200_000) -> None:
+    """
+    The LUT must agree with name_color exactly; benchmarks of a wrong table are meaningless.
+    """
+    lut = utils.get_color_lut(cache_dir=_TMP / "cache")
+    pixels = np.random.default_rng(1).integers(0, 256, (samples, 3), dtype=np.uint8)
+    expected = [utils.name_color(*p) for p in pixels.tolist()]
+    mismatches = int(np.count_nonzero(lut.names(pixels) != np.array(expected)))
+    if mismatches:
+        raise AssertionError(f"Color LUT disagrees with name_color for {mismatches} of {samples} pixels")
+
+
+def measure(fn: Callable[[], None], repeat: int = 5, min_time: float = 0.2) -> Dict[str, float]:
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    if elapsed < min_time:
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    runs = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {"median_s": statistics.median(runs), "min_s": min(runs), "calls": number * repeat}
+
+
+def _version() -> str:
+    try:
+        return metadata.version("w3cwatcher")
+    except metadata.PackageNotFoundError:
+        pyproject = Path(__file__).resolve().parents[1] / "pyproject.toml"
+        return tomllib.loads(pyproject.read_text(encoding="utf-8"))["project"]["version"]
+
+
+def run(name_filter: str = None) -> Dict:
+    """
+    `name_filter` is "GROUP" or "GROUP/NAME": only groups whose name contains GROUP are built, so the
+    others never set up their fakes, loggers or temp files. NAME narrows to benchmarks containing it.
+    """
+    group_filter, _, bench_filter = (name_filter or "").partition("/")
+    check_color_lut_parity()
+    results = {}
+    for group, factory in GROUPS.items():
+        if group_filter not in group:
+            continue
+        for name, fn in factory():
+            if bench_filter not in name:
+                continue
+            full_name = f"{group}/{name}"
+            results[full_name] = measure(fn)
+            print(f"{full_name:<60} {results[full_name]['median_s'] * 1e6:>12.2f} us", flush=True)
+
+    return {
+        "meta": {
+            "version": _version(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> bool:
+    ok = True
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        ratio = result["median_s"] / before["median_s"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  <-- regression"
+            ok = False
+        print(f"{name:<60} {ratio:>8.2f}x{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file.")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON produced by an earlier run.")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown ratio (0.25 = 25%%).")
+    parser.add_argument(
+        "--filter",
+        metavar="GROUP[/NAME]",
+        help="Only run groups whose name contains GROUP, and in them benchmarks whose name contains NAME.",
+    )
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.CRITICAL)
+    current = run(args.filter)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(current, indent=2), encoding="utf-8")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if not compare(current, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Cold vs. warm webhook delivery latency against a local HTTPS stand-in server.
+
+A self-signed certificate is generated with the `openssl` CLI. "Cold" sends go through a fresh
+WebhookDispatcher, "warm" sends go through one that was pre-warmed with `warm()` first.
+
+    python -m benchmarks.webhook_latency [--rounds N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.server
+import shutil
+import ssl
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from w3cwatcher.dispatch import WebhookDispatcher
+from w3cwatcher.logging import Logger
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def _reply(self, code: int) -> None:
+        body = b'{"id": "0"}'
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        # warm-ups: headers only
+        self.send_response(404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._reply(204)
+
+    def log_message(self, *args):
+        pass
+
+
+def _make_cert(directory: Path) -> tuple[Path, Path]:
+    cert, key = directory / "cert.pem", directory / "key.pem"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1",
+         "-keyout", str(key), "-out", str(cert)],
+        check=True, capture_output=True,
+    )  # fmt: skip
+    return cert, key
+
+
+def _serve(cert: Path, key: Path) -> http.server.ThreadingHTTPServer:
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _send(dispatcher: WebhookDispatcher) -> float:
+    done = threading.Event()
+    start = time.perf_counter()
+    dispatcher.submit({"content": "benchmark"}, on_delivered=done.set, on_failed=done.set)
+    done.wait(10)
+    return time.perf_counter() - start
+
+
+def measure(rounds: int = 20) -> dict:
+    if shutil.which("openssl") is None:
+        raise RuntimeError("openssl CLI is required to create the stand-in certificate")
+
+    # a logger of its own, so a benchmark run never writes into (or prunes) the real app's logs
+    logger = Logger(app_name="W3CWatcherBenchmark", log_level="WARNING", log_dir=tempfile.mkdtemp())
+    with tempfile.TemporaryDirectory() as tmp:
+        cert, key = _make_cert(Path(tmp))
+        server = _serve(cert, key)
+        url = f"https://127.0.0.1:{server.server_port}/api/webhooks/0/token"
+
+        cold, warm = [], []
+        for _ in range(rounds):
+            dispatcher = WebhookDispatcher(url, logger, verify=str(cert))
+            cold.append(_send(dispatcher))
+            dispatcher.close()
+
+            dispatcher = WebhookDispatcher(url, logger, verify=str(cert))
+            dispatcher.warm()
+            dispatcher.warmed.wait(10)
+            warm.append(_send(dispatcher))
+            dispatcher.close()
+
+        server.shutdown()
+
+    return {
+        "rounds": rounds,
+        "cold_median_ms": statistics.median(cold) * 1000,
+        "warm_median_ms": statistics.median(warm) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    result = measure(args.rounds)
+    print(
+        f"cold send: {result['cold_median_ms']:.2f} ms, warm send: {result['warm_median_ms']:.2f} ms "
+        f"(median of {result['rounds']})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from benchmarks import fakes
+
+# the Win32 code paths run against an in-memory desktop; has to happen before w3cwatcher.utils is imported
+_desktop = fakes.install()
+
+from typing import Callable, Optional, Tuple  # noqa: E402
+
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+
+from w3cwatcher.capture import SyntheticCaptureBackend  # noqa: E402
+from w3cwatcher.config import MonitorConfig  # noqa: E402
+from w3cwatcher.logging import Logger  # noqa: E402
+from w3cwatcher.monitor import Monitor  # noqa: E402
+from w3cwatcher.state_manager import StateManager  # noqa: E402
+from w3cwatcher.utils.color import ColorLUT, get_color_lut  # noqa: E402
+
+# client area of the fake W3Champions window: left, top, width, height
+W3C_RECT = (200, 100, 923, 520)
+RED = (230, 30, 30)
+
+
+@pytest.fixture(scope="session")
+def logger(tmp_path_factory) -> Logger:
+    # a logger name of its own, so the tests never write into the real app's logs
+    return Logger(app_name="W3CWatcherTests", log_level="DEBUG", log_dir=tmp_path_factory.mktemp("logs"))
+
+
+@pytest.fixture
+def desktop() -> fakes.FakeDesktop:
+    _desktop.windows.clear()
+    _desktop.calls.clear()
+    yield _desktop
+    _desktop.windows.clear()
+
+
+@pytest.fixture(scope="session")
+def color_lut() -> ColorLUT:
+    # built once and without a cache dir, so no test writes into the user's cache
+    return get_color_lut()
+
+
+def frame(color: Tuple[int, int, int] = RED, rect: Tuple[int, int, int, int] = W3C_RECT) -> np.ndarray:
+    return np.full((rect[3], rect[2], 3), color, dtype=np.uint8)
+
+
+@pytest.fixture
+def make_monitor(logger, color_lut, desktop) -> Callable[..., Monitor]:
+    """
+    A monitor watching a fake W3Champions window, captured through a SyntheticCaptureBackend.
+    """
+
+    def make(
+        config: Optional[MonitorConfig] = None, frames=None, window: bool = True, **kwargs
+    ) -> Monitor:
+        if window:
+            desktop.add_window("W3Champions", rect=W3C_RECT)
+        capture = SyntheticCaptureBackend(frames or [frame()], origin=W3C_RECT[:2])
+        state_manager = StateManager(logger)
+        monitor = Monitor(logger, config or MonitorConfig(), state_manager, capture=capture, **kwargs)
+        monitor._color_lut = color_lut
+        return monitor
+
+    return make
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import socket
+import threading
+import time
+import urllib.request
+
+from w3cwatcher.async_monitor import AsyncMonitor
+from w3cwatcher.config import MonitorConfig
+from w3cwatcher.state_manager import STATE_DISABLED
+
+
+def _config(**values) -> MonitorConfig:
+    config = MonitorConfig()
+    config.poll_s = config.in_queue_poll_s = 0.01
+    for name, value in values.items():
+        setattr(config, name, value)
+    return config
+
+
+def _slow_ticks(monitor, seconds: float, events: list) -> threading.Event:
+    """
+    Make every tick take `seconds`; returns an event set once a tick is under way.
+    """
+    tick = monitor._tick
+    started = threading.Event()
+
+    def slow_tick(*args):
+        started.set()
+        time.sleep(seconds)
+        result = tick(*args)
+        events.append("tick done")
+        return result
+
+    monitor._tick = slow_tick
+    return started
+
+
+def test_cancel_lets_the_running_tick_finish_before_disabled(make_monitor):
+    monitor = make_monitor(_config())
+    events = []
+    monitor.state_manager.add_state_change_listener(lambda state, _after: events.append(state))
+    started = _slow_ticks(monitor, 0.3, events)
+
+    async def main():
+        task = asyncio.create_task(AsyncMonitor(monitor).run())
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(main())
+    assert events[-2:] == ["tick done", STATE_DISABLED]
+    assert monitor.state_manager.current_state == STATE_DISABLED
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_metrics_server_answers_during_a_tick_without_offloading(make_monitor):
+    port = _free_port()
+    monitor = make_monitor(_config(metrics_port=port))
+    started = _slow_ticks(monitor, 1.0, [])
+
+    # Monitor.start() runs AsyncMonitor with offload=False; the metrics server must still get the loop
+    assert monitor.start()
+    try:
+        assert started.wait(5)
+        begin = time.perf_counter()
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            assert response.status == 200
+        assert time.perf_counter() - begin < 0.5
+    finally:
+        monitor.stop()
+        assert monitor.join(5)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from tests.conftest import RED, W3C_RECT, frame
+from w3cwatcher import utils
+from w3cwatcher.capture import SyntheticCaptureBackend, grab_points
+from w3cwatcher.config import MonitorConfig
+from w3cwatcher.monitor import classify_probes
+from w3cwatcher.state_manager import STATE_IN_QUEUE, STATE_WAITING
+
+GREY = (100, 100, 100)
+
+
+def _split_frame(left=RED, right=GREY, rect=W3C_RECT) -> np.ndarray:
+    """
+    A frame of the W3Champions client, `left` color on its left half and `right` on the other.
+    """
+    img = frame(right, rect)
+    img[:, : rect[2] // 2] = left
+    return img
+
+
+def test_regions_are_read_from_the_frame_at_its_origin():
+    img = np.arange(4 * 6 * 3, dtype=np.uint8).reshape(4, 6, 3)
+    backend = SyntheticCaptureBackend([img], origin=(10, 20))
+    assert backend.grab_pixel(12, 21) == tuple(img[1, 2])
+    assert (backend.grab_region((10, 20, 16, 24)) == img).all()
+
+    # whatever is outside the frame reads as black
+    straddling = backend.grab_region((8, 22, 12, 26))
+    assert straddling.shape == (4, 4, 3)
+    assert (straddling[:2, 2:] == img[2:, :2]).all()
+    assert straddling[:, :2].sum() == 0 and straddling[2:].sum() == 0
+    assert backend.grab_pixel(0, 0) == (0, 0, 0)
+    with pytest.raises(ValueError):
+        backend.grab_region((10, 20, 10, 24))
+
+
+def test_frames_load_from_files_and_advance(tmp_path):
+    paths = []
+    for i, color in enumerate([RED, GREY]):
+        paths.append(tmp_path / f"frame{i}.png")
+        Image.new("RGB", (4, 3), color).save(paths[-1])
+    backend = SyntheticCaptureBackend.from_files(paths, auto_advance=True)
+    assert [backend.grab_pixel(0, 0) for _ in range(3)] == [RED, GREY, RED]
+
+    backend = SyntheticCaptureBackend.from_files(paths, auto_advance=True, loop=False)
+    assert [backend.grab_pixel(0, 0) for _ in range(3)] == [RED, GREY, GREY]
+    assert backend.grab_window(0).size == (4, 3)
+
+
+def test_grab_points_takes_one_grab_for_all_probes():
+    img = _split_frame()
+    backend = SyntheticCaptureBackend([img, frame(GREY)], origin=W3C_RECT[:2], auto_advance=True)
+    left, top, width, height = W3C_RECT
+    points = [(left + 10, top + 10), (left + width - 10, top + 10), (left + 20, top + height - 1)]
+
+    pixels = grab_points(backend, points)
+    # a grab per probe would have moved on to the grey frame
+    assert pixels.tolist() == [list(RED), list(GREY), list(RED)]
+    assert backend.index == 1
+
+
+@pytest.mark.parametrize("quorum, in_queue", [(0.5, True), (0.75, False)])
+def test_classify_probes_on_synthetic_frames(color_lut, quorum, in_queue):
+    backend = SyntheticCaptureBackend([_split_frame()], origin=W3C_RECT[:2])
+    left, top, width, _ = W3C_RECT
+    points = [(left + int(width * x), top + 50) for x in (0.1, 0.4, 0.6, 0.9)]
+
+    colors, result = classify_probes(color_lut, grab_points(backend, points), "red", quorum)
+    assert utils.COLOR_NAMES_ARRAY[colors].tolist() == ["red", "red", "gray", "gray"]
+    assert bool(result) is in_queue
+
+
+def test_classify_probes_counts_only_the_recorded_probes(color_lut):
+    samples = np.array([[RED, RED, GREY, GREY], [RED, GREY, RED, RED]], dtype=np.uint8)
+    _, in_queue = classify_probes(color_lut, samples, "red", 1.0, counts=np.array([2, 1]))
+    assert in_queue.tolist() == [True, True]
+    _, in_queue = classify_probes(color_lut, samples, "red", 1.0)
+    assert in_queue.tolist() == [False, False]
+
+
+@pytest.mark.parametrize("quorum, state", [(0.5, STATE_IN_QUEUE), (0.75, STATE_WAITING)])
+def test_a_monitor_tick_samples_the_synthetic_frame(make_monitor, quorum, state):
+    config = MonitorConfig()
+    # the watched point and one probe on the red half, two probes on the grey half
+    config.x_offset_pct, config.y_offset_pct = 0.25, 0.5
+    config.probe_offsets_pct = [[0.3, 0.5], [0.7, 0.5], [0.8, 0.5]]
+    config.probe_quorum = quorum
+    monitor = make_monitor(config, frames=[_split_frame()])
+    monitor._sync_plan()
+    monitor.state_manager.update_state(STATE_WAITING)
+
+    assert monitor._tick(False) == (False, state == STATE_IN_QUEUE)
+    assert monitor.state_manager.current_state == state
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from w3cwatcher.clock import SYSTEM_CLOCK, Clock, VirtualClock
+
+
+def test_clock_is_abstract():
+    with pytest.raises(TypeError):
+        Clock()
+
+    class Partial(Clock):
+        def monotonic(self) -> float:
+            return 0.0
+
+    with pytest.raises(TypeError):
+        Partial()
+    assert isinstance(SYSTEM_CLOCK, Clock)
+
+
+def test_sleep_and_advance_move_both_clocks():
+    clock = VirtualClock(start_time=1_000.0)
+    clock.sleep(1.5)
+    clock.advance(0.5)
+    clock.sleep(-3)  # never backwards
+    assert clock.monotonic() == 2.0
+    assert clock.time() == 1_002.0
+    assert clock.now().timestamp() == 1_002.0
+
+
+def test_wall_time_jumps_leave_monotonic_time_alone():
+    clock = VirtualClock(start_time=1_000.0)
+    clock.advance(10)
+    clock.set_wall_time(500.0)
+    assert (clock.monotonic(), clock.time()) == (10.0, 500.0)
+    clock.advance(1)
+    assert (clock.monotonic(), clock.time()) == (11.0, 501.0)
+
+
+def test_callbacks_run_in_order_at_their_time():
+    clock = VirtualClock()
+    seen = []
+    clock.call_later(2.0, lambda: seen.append(("b", clock.monotonic())))
+    clock.call_at(1.0, lambda: seen.append(("a", clock.monotonic())))
+    clock.call_at(1.0, lambda: seen.append(("a2", clock.monotonic())))
+    clock.call_at(9.0, lambda: seen.append(("late", clock.monotonic())))
+
+    clock.advance(5)
+    assert seen == [("a", 1.0), ("a2", 1.0), ("b", 2.0)]
+    assert clock.monotonic() == 5.0
+
+
+def test_wait_times_out_on_the_virtual_clock():
+    clock = VirtualClock()
+    event = threading.Event()
+    assert not clock.wait(event, 30.0)
+    assert clock.monotonic() == 30.0
+
+
+def test_wait_ends_when_a_callback_sets_the_event():
+    clock = VirtualClock()
+    event = threading.Event()
+    clock.call_later(3.0, event.set)
+    assert clock.wait(event, 10.0)
+
+
+def test_wait_on_a_set_event_does_not_move_the_clock():
+    clock = VirtualClock()
+    event = threading.Event()
+    event.set()
+    assert clock.wait(event, 10.0)
+    assert clock.monotonic() == 0.0
+
+
+def test_wait_async_times_out_on_the_virtual_clock():
+    clock = VirtualClock()
+
+    async def main():
+        event = asyncio.Event()
+        clock.call_later(4.0, lambda: None)
+        timed_out = not await clock.wait_async(event, 5.0)
+        event.set()
+        return timed_out, await clock.wait_async(event, 5.0)
+
+    assert asyncio.run(main()) == (True, True)
+    assert clock.monotonic() == 5.0
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import itertools
+
+import numpy as np
+import pytest
+
+from w3cwatcher.utils.color import COLOR_NAMES, ColorLUT, classify_rules, color_index
+from w3cwatcher.utils.image import name_color, name_colors
+
+# every threshold used by the rules, with its neighbours
+_THRESHOLDS = (0, 15, 40, 80, 100, 200, 215, 255)
+_BOUNDARIES = sorted({v + d for v in _THRESHOLDS for d in (-1, 0, 1)} & set(range(256)))
+
+
+@pytest.fixture(scope="module")
+def lut() -> ColorLUT:
+    return ColorLUT.build(8)
+
+
+def _boundary_pixels() -> np.ndarray:
+    grid = np.array(list(itertools.product(_BOUNDARIES, repeat=3)), dtype=np.uint8)
+    # gray detection is about the spread between channels: walk a spread of 13..17 around every level
+    spread = np.array(
+        [(v, max(v - d, 0), max(v - d, 0)) for v in range(256) for d in range(13, 18)], dtype=np.uint8
+    )
+    return np.concatenate([grid, spread, spread[:, ::-1], spread[:, [1, 0, 2]]])
+
+
+def _random_pixels(count: int = 200_000) -> np.ndarray:
+    return np.random.default_rng(1).integers(0, 256, (count, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("pixels", [_boundary_pixels(), _random_pixels()], ids=["boundaries", "random"])
+def test_classify_rules_matches_name_color(pixels):
+    expected = [name_color(*p) for p in pixels.tolist()]
+    assert name_colors(pixels).tolist() == expected
+
+
+def test_lut_matches_classify_rules_in_every_cell(lut):
+    values = np.arange(256, dtype=np.uint8)
+    gg, bb = np.meshgrid(values, values, indexing="ij")
+    slab = np.empty((256, 256, 3), dtype=np.uint8)
+    slab[..., 1] = gg
+    slab[..., 2] = bb
+    # one red slice at a time, a full 256^3 pixel array would take 48 MiB plus temporaries
+    for red in range(256):
+        slab[..., 0] = red
+        mismatches = np.count_nonzero(lut.classify(slab) != classify_rules(slab))
+        assert mismatches == 0, f"{mismatches} cells differ at r={red}"
+
+
+@pytest.mark.parametrize("pixels", [_boundary_pixels(), _random_pixels()], ids=["boundaries", "random"])
+def test_lut_matches_name_color(lut, pixels):
+    expected = [name_color(*p) for p in pixels.tolist()]
+    assert [COLOR_NAMES[i] for i in lut.classify(pixels).tolist()] == expected
+    r, g, b = pixels[0].tolist()
+    assert lut.name(r, g, b) == expected[0]
+
+
+def test_coarse_lut_is_exact_at_bin_centers():
+    lut = ColorLUT.build(5)
+    centers = (np.arange(32, dtype=np.uint8) << 3) + 4
+    pixels = np.array(list(itertools.product(centers.tolist(), repeat=3)), dtype=np.uint8)
+    assert lut.classify(pixels).tolist() == classify_rules(pixels).tolist()
+
+
+def test_color_index_rejects_unknown_names():
+    assert COLOR_NAMES[color_index("red")] == "red"
+    with pytest.raises(ValueError):
+        color_index("pink")
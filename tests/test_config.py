@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import pytest
+
+from w3cwatcher.config import MAX_PROBE_OFFSETS, MonitorConfig
+
+
+@pytest.mark.parametrize(
+    "offsets",
+    [
+        [0.5, 0.5],  # a single pair without the outer list, easy to write in TOML
+        [[0.5]],
+        [[0.5, 1.5]],
+        [["0.5", 0.5]],
+        [None],
+    ],
+)
+def test_invalid_probe_offsets_are_validation_errors(offsets):
+    with pytest.raises(ValueError, match="probe_offsets_pct"):
+        MonitorConfig.from_dict({"probe_offsets_pct": offsets})
+
+
+@pytest.mark.parametrize("offsets", [0.5, "abc"])
+def test_probe_offsets_that_are_not_a_list_are_validation_errors(offsets):
+    with pytest.raises(ValueError, match="probe_offsets_pct"):
+        MonitorConfig.from_dict({"probe_offsets_pct": offsets})
+
+
+def test_valid_probe_offsets_load():
+    config = MonitorConfig.from_dict({"probe_offsets_pct": [[0.74, 0.955], (0.77, 0.955)]})
+    assert len(config.probe_offsets_pct) == 2
+
+
+@pytest.mark.parametrize(
+    "values, field_name",
+    [
+        ({"metrics_log_interval_s": -1}, "metrics_log_interval_s"),
+        ({"metrics_port": -1}, "metrics_port"),
+        ({"metrics_port": 65536}, "metrics_port"),
+    ],
+)
+def test_invalid_metrics_settings_are_validation_errors(values, field_name):
+    with pytest.raises(ValueError, match=field_name):
+        MonitorConfig.from_dict(values)
+
+
+def test_metrics_settings_accept_their_bounds():
+    config = MonitorConfig.from_dict({"metrics_log_interval_s": 0, "metrics_port": 65535})
+    assert (config.metrics_log_interval_s, config.metrics_port) == (0, 65535)
+
+
+def test_probe_offsets_are_capped():
+    MonitorConfig.from_dict({"probe_offsets_pct": [[0.5, 0.5]] * MAX_PROBE_OFFSETS})
+    with pytest.raises(ValueError, match="probe_offsets_pct"):
+        MonitorConfig.from_dict({"probe_offsets_pct": [[0.5, 0.5]] * (MAX_PROBE_OFFSETS + 1)})
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import copy
+import os
+from pathlib import Path
+
+import pytest
+
+from w3cwatcher.config import Config, MonitorConfig
+from w3cwatcher.utils import config_base
+from w3cwatcher.utils.config_base import ConfigBase, LayerCache, field
+
+_LAYER = "[monitor]\npoll_s = 0.5\n"
+_WEBHOOK = "https://discord.com/api/webhooks/123456789012345678/abcdefghijklmnopqrstuvwxyz-ABCDEFGHIJ"
+
+
+def _positive(value) -> list:
+    return [] if value > 0 else ["must be positive"]
+
+
+class _Base(ConfigBase):
+    size: int = field(default=1, help_text="Base size.")
+
+
+class _Derived(_Base):
+    size: int = field(default=2, help_text="Derived size.", validators=_positive)
+    name: str = field(default="derived", secret=True)
+
+
+class _Untouched(_Base):
+    pass
+
+
+class _Outer(_Base):
+    # refers to a class defined after it, so its schema can only be built on first use
+    inner: _Inner | None = field(default=None)
+
+
+class _Inner(ConfigBase):
+    depth: int = field(default=1)
+
+
+def _write(path: Path, text: str, mtime_ns: int = 1_700_000_000_000_000_000) -> Path:
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+def _reload(cache_file: Path, layer: Path) -> LayerCache:
+    cache = LayerCache(cache_file, secrets=Config.secret_paths())
+    cache.read(layer)
+    return cache
+
+
+def test_layer_cache_hit_across_runs(tmp_path):
+    layer = _write(tmp_path / "config.toml", _LAYER)
+    cache_file = tmp_path / "cache" / "layers.json"
+    first = _reload(cache_file, layer)
+    first.save()
+    assert (first.hits, first.misses) == (0, 1)
+
+    second = LayerCache(cache_file)
+    assert second.read(layer) == {"monitor": {"poll_s": 0.5}}
+    assert (second.hits, second.misses) == (1, 0)
+
+
+def test_layer_cache_miss_after_mtime_or_size_change(tmp_path):
+    layer = _write(tmp_path / "config.toml", _LAYER)
+    cache_file = tmp_path / "layers.json"
+    _reload(cache_file, layer).save()
+
+    # same size, newer mtime
+    _write(layer, _LAYER.replace("0.5", "0.7"), mtime_ns=1_700_000_001_000_000_000)
+    cache = _reload(cache_file, layer)
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert cache.read(layer) == {"monitor": {"poll_s": 0.7}}
+    cache.save()
+
+    # same mtime, different size
+    _write(layer, _LAYER.replace("0.5", "0.75"), mtime_ns=1_700_000_001_000_000_000)
+    cache = _reload(cache_file, layer)
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert cache.read(layer) == {"monitor": {"poll_s": 0.75}}
+
+
+def test_corrupt_layer_cache_is_ignored_and_rewritten(tmp_path):
+    layer = _write(tmp_path / "config.toml", _LAYER)
+    cache_file = tmp_path / "layers.json"
+    cache_file.write_text("{not json", encoding="utf-8")
+
+    cache = _reload(cache_file, layer)
+    assert (cache.hits, cache.misses) == (0, 1)
+    cache.save()
+    assert _reload(cache_file, layer).hits == 1
+
+
+def test_layers_with_secrets_are_not_written_to_disk(tmp_path):
+    public = _write(tmp_path / "public.toml", _LAYER)
+    private = _write(tmp_path / "private.toml", f'[notifications.discord]\nwebhook_url = "{_WEBHOOK}"\n')
+    cache_file = tmp_path / "layers.json"
+    cache = LayerCache(cache_file, secrets=Config.secret_paths())
+    cache.read(public)
+    assert cache.read(private)["notifications"]["discord"]["webhook_url"] == _WEBHOOK
+    cache.save()
+
+    assert _WEBHOOK not in cache_file.read_text(encoding="utf-8")
+    cache = LayerCache(cache_file, secrets=Config.secret_paths())
+    cache.read(public)
+    cache.read(private)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def _changed_config() -> Config:
+    config = Config()
+    config.monitor.poll_s = 0.25
+    config.logging.log_keep = 3
+    return config
+
+
+def test_batch_rolls_back_nested_sections_when_the_block_raises():
+    config = _changed_config()
+    before, monitor = copy.deepcopy(config), config.monitor
+    with pytest.raises(RuntimeError):
+        with config.batch():
+            config.monitor.poll_s = 0.5
+            config.notifications.discord.debounce = 30
+            config.tray = type(config.tray)()
+            raise RuntimeError("boom")
+
+    assert config == before
+    assert config.monitor is monitor
+    assert "debounce" not in config.notifications.discord._modified
+
+
+def test_batch_rolls_back_everything_when_one_field_fails_validation():
+    config = _changed_config()
+    before = copy.deepcopy(config)
+    with pytest.raises(ValueError, match="metrics_port"):
+        with config.batch():
+            config.logging.log_keep = 5
+            config.monitor.in_queue_color = "orange"
+            config.monitor.metrics_port = -1
+
+    assert config == before
+    # the transaction is gone, assignments are validated right away again
+    with pytest.raises(ValueError):
+        config.monitor.metrics_port = -1
+    assert config.monitor.metrics_port == before.monitor.metrics_port
+
+
+def test_batch_rolls_back_a_replaced_section_that_fails_validation():
+    config = _changed_config()
+    before, monitor = copy.deepcopy(config), config.monitor
+    replacement = MonitorConfig()
+    replacement._set_silently("probe_quorum", 2.0)
+    with pytest.raises(ValueError, match="probe_quorum"):
+        with config.batch():
+            config.monitor = replacement
+
+    assert config.monitor is monitor
+    assert config == before
+
+
+def test_nested_batches_roll_back_with_the_outermost():
+    config = _changed_config()
+    before = copy.deepcopy(config)
+    with pytest.raises(ValueError, match="metrics_port"):
+        with config.batch():
+            config.logging.log_keep = 5
+            with config.monitor.batch():
+                config.monitor.metrics_port = -1
+            # the inner batch does not validate on its own
+            assert config.monitor.metrics_port == -1
+
+    assert config == before
+
+
+def test_update_from_with_an_invalid_value_leaves_the_config_unchanged():
+    config = _changed_config()
+    before = copy.deepcopy(config)
+    other = Config()
+    other.monitor.poll_s = 0.75
+    other.logging.log_keep = 7
+    other.monitor._set_silently("metrics_port", 70000)
+    other.monitor._modified.add("metrics_port")
+
+    with pytest.raises(ValueError, match="metrics_port"):
+        config.update_from(other)
+    assert config == before
+
+    other.monitor._set_silently("metrics_port", 9100)
+    config.update_from(other)
+    assert (config.monitor.poll_s, config.monitor.metrics_port, config.logging.log_keep) == (0.75, 9100, 7)
+
+
+def test_schema_is_built_once_per_class(monkeypatch):
+    schema = Config.schema()
+    assert Config.__dict__["_schema"] is schema
+
+    def build(config_cls):
+        raise AssertionError(f"schema of {config_cls.__name__} rebuilt")
+
+    monkeypatch.setattr(config_base.ConfigSchema, "build", build)
+    config = Config.from_dict({"monitor": {"poll_s": 0.5}})
+    config.monitor.in_queue_poll_s = 0.5
+    config.monitor.validate_all()
+    config.update_from(Config())
+    assert Config.schema() is schema
+
+
+def test_subclasses_get_schemas_of_their_own():
+    base, derived, untouched = _Base.schema(), _Derived.schema(), _Untouched.schema()
+    assert len({id(base), id(derived), id(untouched)}) == 3
+    assert _Untouched.__dict__["_schema"] is untouched
+
+    assert [spec.name for spec in base.fields] == ["size"]
+    assert [spec.name for spec in derived.fields] == ["size", "name"]
+    assert (base.by_name["size"].help_text, base.by_name["size"].validators) == ("Base size.", ())
+    assert derived.by_name["size"].help_text == "Derived size."
+    assert derived.by_name["size"].validators == (_positive,)
+    assert derived.by_name["name"].secret
+    assert untouched.by_name["size"].help_text == "Base size."
+
+    # the base class keeps validating by its own specs
+    _Base().size = -1
+    with pytest.raises(ValueError, match="must be positive"):
+        _Derived().size = -1
+
+
+def test_a_schema_with_a_forward_reference_is_built_on_first_use():
+    assert "_schema" not in _Outer.__dict__ or _Outer.__dict__["_schema"] is None
+    schema = _Outer.schema()
+    # its own, not the one it would inherit from _Base
+    assert [spec.name for spec in schema.fields] == ["size", "inner"]
+    assert schema.by_name["inner"].type == _Inner | None
+    assert _Outer.__dict__["_schema"] is schema
+    assert _Outer.schema() is schema
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import List
+
+from w3cwatcher.config import Config
+from w3cwatcher.config_watcher import ConfigWatcher
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.records: List[tuple] = []
+
+    def __getattr__(self, level: str):
+        return lambda message, *args: self.records.append((level, str(message)))
+
+    def messages(self, level: str) -> List[str]:
+        return [message for lvl, message in self.records if lvl == level]
+
+
+_mtime = [1_700_000_000_000_000_000]
+
+
+def _write(path: Path, text: str) -> None:
+    # a new mtime on every write, so the change is seen even within the file system's time resolution
+    _mtime[0] += 1_000_000_000
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(_mtime[0], _mtime[0]))
+
+
+def _watcher(path: Path):
+    def load(cache) -> Config:
+        return Config.from_files([path], cache=cache)
+
+    logger = RecordingLogger()
+    config = load(None)
+    return ConfigWatcher(logger, config, [path], load=load), config, logger
+
+
+def test_changed_section_calls_only_its_subscribers(tmp_path):
+    path = tmp_path / "config.toml"
+    _write(path, "[monitor]\npoll_s = 1.0\n")
+    watcher, config, _ = _watcher(path)
+    calls = []
+    watcher.on_change("monitor", lambda section: calls.append(("monitor", section.poll_s)))
+    watcher.on_change("tray", lambda section: calls.append(("tray", section)))
+    watcher.on_change("logging", lambda section: calls.append(("logging", section)))
+
+    assert not watcher.check()  # nothing changed yet
+    _write(path, "[monitor]\npoll_s = 0.5\n")
+    assert watcher.check()
+    assert calls == [("monitor", 0.5)]
+    assert config.monitor.poll_s == 0.5
+
+
+def test_invalid_edit_keeps_the_running_config(tmp_path):
+    path = tmp_path / "config.toml"
+    _write(path, "[monitor]\npoll_s = 1.0\n")
+    watcher, config, logger = _watcher(path)
+    calls = []
+    watcher.on_change("monitor", calls.append)
+
+    _write(path, "[monitor]\npoll_s = -1.0\n")
+    assert not watcher.check()
+    assert config.monitor.poll_s == 1.0
+    assert calls == []
+    assert any("keeping the running config" in message for message in logger.messages("warning"))
+
+
+def test_deleted_file_reverts_to_defaults(tmp_path):
+    path = tmp_path / "config.toml"
+    _write(path, "[monitor]\npoll_s = 0.5\n")
+    watcher, config, _ = _watcher(path)
+    calls = []
+    watcher.on_change("monitor", calls.append)
+
+    path.unlink()
+    assert watcher.check()
+    assert config.monitor.poll_s == Config().monitor.poll_s
+    assert len(calls) == 1
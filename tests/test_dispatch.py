@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import http.server
+import json
+import socket
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+from w3cwatcher.config import DiscordConfig
+from w3cwatcher.discord_notifier import DiscordNotifier
+from w3cwatcher.dispatch import WebhookDispatcher
+
+_WEBHOOK = "https://discord.com/api/webhooks/123456789012345678/abcdefghijklmnopqrstuvwxyz-ABCDEFGHIJ"
+
+# status, headers, body
+Reply = Tuple[int, Dict[str, str], bytes]
+
+
+class StandInServer:
+    """
+    A local webhook endpoint answering POSTs with scripted replies (204 once the script runs out) and
+    recording when each request arrived.
+    """
+
+    def __init__(self):
+        self.replies: List[Reply] = []
+        self.requests: List[Tuple[str, str, float]] = []  # method, path, monotonic time
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, method: str) -> None:
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with server._lock:
+                    server.requests.append((method, self.path, time.monotonic()))
+                    status, headers, body = server.replies.pop(0) if server.replies else (204, {}, b"")
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                self._reply("POST")
+
+            def do_GET(self):
+                self._reply("GET")
+
+            def do_HEAD(self):
+                with server._lock:
+                    server.requests.append(("HEAD", self.path, time.monotonic()))
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self._server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_port}/api/webhooks/1/token"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def posts(self) -> List[float]:
+        with self._lock:
+            return [t for method, _, t in self.requests if method == "POST"]
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class Outcome:
+    def __init__(self):
+        self.done = threading.Event()
+        self.delivered: Optional[bool] = None
+
+    def on_delivered(self) -> None:
+        self.delivered = True
+        self.done.set()
+
+    def on_failed(self) -> None:
+        self.delivered = False
+        self.done.set()
+
+
+@pytest.fixture
+def server():
+    server = StandInServer()
+    yield server
+    server.close()
+
+
+def _dispatcher(url: str, logger, **kwargs) -> WebhookDispatcher:
+    kwargs.setdefault("backoff_s", 0.01)
+    kwargs.setdefault("max_backoff_s", 0.02)
+    kwargs.setdefault("timeout_s", 2.0)
+    return WebhookDispatcher(url, logger, **kwargs)
+
+
+def _send(dispatcher: WebhookDispatcher, timeout: float = 5.0) -> Optional[bool]:
+    outcome = Outcome()
+    assert dispatcher.submit({"content": "test"}, outcome.on_delivered, outcome.on_failed)
+    assert outcome.done.wait(timeout), "no delivery outcome"
+    return outcome.delivered
+
+
+def _json(payload: dict) -> bytes:
+    return json.dumps(payload).encode()
+
+
+def test_429_waits_for_retry_after_from_the_body(server, logger):
+    server.replies = [(429, {"Content-Type": "application/json"}, _json({"retry_after": 0.3}))]
+    dispatcher = _dispatcher(server.url, logger)
+    try:
+        assert _send(dispatcher) is True
+    finally:
+        dispatcher.close()
+    first, second = server.posts()
+    assert second - first >= 0.3
+
+
+def test_429_waits_for_the_retry_after_header(server, logger):
+    server.replies = [(429, {"Retry-After": "0.3"}, b"")]
+    dispatcher = _dispatcher(server.url, logger)
+    try:
+        assert _send(dispatcher) is True
+    finally:
+        dispatcher.close()
+    first, second = server.posts()
+    assert second - first >= 0.3
+
+
+def test_exhausted_rate_limit_bucket_holds_the_next_send(server, logger):
+    server.replies = [(204, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "0.4"}, b"")]
+    dispatcher = _dispatcher(server.url, logger)
+    try:
+        assert _send(dispatcher) is True
+        assert _send(dispatcher) is True
+    finally:
+        dispatcher.close()
+    first, second = server.posts()
+    assert second - first >= 0.4
+
+
+def test_remaining_requests_do_not_hold(server, logger):
+    server.replies = [(204, {"X-RateLimit-Remaining": "4", "X-RateLimit-Reset-After": "5"}, b"")]
+    dispatcher = _dispatcher(server.url, logger)
+    try:
+        assert _send(dispatcher) is True
+        assert _send(dispatcher) is True
+    finally:
+        dispatcher.close()
+    first, second = server.posts()
+    assert second - first < 1.0
+
+
+def test_server_errors_are_retried(server, logger):
+    server.replies = [(500, {}, b""), (502, {}, b"")]
+    dispatcher = _dispatcher(server.url, logger, max_retries=3)
+    try:
+        assert _send(dispatcher) is True
+    finally:
+        dispatcher.close()
+    assert len(server.posts()) == 3
+
+
+def test_server_errors_give_up_after_max_retries(server, logger):
+    server.replies = [(503, {}, b"")] * 5
+    dispatcher = _dispatcher(server.url, logger, max_retries=2)
+    try:
+        assert _send(dispatcher) is False
+    finally:
+        dispatcher.close()
+    assert len(server.posts()) == 3
+
+
+@pytest.mark.parametrize("status", [400, 401, 404])
+def test_other_client_errors_are_not_retried(server, logger, status):
+    server.replies = [(status, {}, b'{"message": "nope"}')]
+    dispatcher = _dispatcher(server.url, logger, max_retries=3)
+    try:
+        assert _send(dispatcher) is False
+    finally:
+        dispatcher.close()
+    assert len(server.posts()) == 1
+
+
+def test_connection_errors_are_retried(logger):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    # nothing listens on the port any more
+    dispatcher = _dispatcher(f"http://127.0.0.1:{port}/api/webhooks/1/token", logger, max_retries=2)
+    attempts = []
+    post = dispatcher._post
+
+    def counting_post(*args, **kwargs):
+        attempts.append(time.monotonic())
+        return post(*args, **kwargs)
+
+    dispatcher._post = counting_post
+    try:
+        assert _send(dispatcher) is False
+    finally:
+        dispatcher.close()
+    assert len(attempts) == 3
+
+
+def test_closed_dispatcher_refuses_messages(server, logger):
+    dispatcher = _dispatcher(server.url, logger)
+    dispatcher.close()
+    assert not dispatcher.submit({"content": "late"})
+
+
+def test_warm_up_does_not_touch_the_webhook(server, logger):
+    dispatcher = _dispatcher(server.url, logger)
+    try:
+        dispatcher.warm()
+        assert dispatcher.warmed.wait(5)
+    finally:
+        dispatcher.close()
+    assert [(method, path) for method, path, _ in server.requests] == [("HEAD", "/")]
+
+
+def test_warm_up_waits_out_the_rate_limit(server, logger):
+    server.replies = [(204, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "5"}, b"")]
+    dispatcher = _dispatcher(server.url, logger)
+    try:
+        assert _send(dispatcher) is True
+        dispatcher.warm()
+        assert dispatcher.warmed.wait(5)
+    finally:
+        dispatcher.close()
+    assert [method for method, _, _ in server.requests] == ["POST"]
+
+
+def _notifier(server: StandInServer, logger) -> DiscordNotifier:
+    notifier = DiscordNotifier(DiscordConfig(webhook_url=_WEBHOOK, debounce=30), logger)
+    # the config has to hold a real Discord url to validate, deliveries go to the stand-in
+    notifier.dispatcher.close()
+    notifier.dispatcher = _dispatcher(server.url, logger, max_retries=0)
+    return notifier
+
+
+def _notify(notifier: DiscordNotifier, server: StandInServer, expected_posts: int) -> None:
+    notifier.notify_match_started(queue_duration=None)
+    deadline = time.monotonic() + 5.0
+    while time.monotonic() < deadline:
+        if len(server.posts()) >= expected_posts and not notifier._discord_webhook_pending:
+            return
+        time.sleep(0.01)
+    raise AssertionError("notification was not delivered in time")
+
+
+def test_debounce_only_advances_after_a_delivery(server, logger):
+    server.replies = [(400, {}, b"")]
+    notifier = _notifier(server, logger)
+    try:
+        # rejected: the debounce does not start, so the next notification goes out
+        _notify(notifier, server, expected_posts=1)
+        assert notifier._discord_webhook_last_sent is None
+
+        _notify(notifier, server, expected_posts=2)
+        assert notifier._discord_webhook_last_sent is not None
+
+        # delivered: the next one within `debounce` is suppressed
+        notifier.notify_match_started(queue_duration=None)
+        time.sleep(0.2)
+        assert len(server.posts()) == 2
+    finally:
+        notifier.close()
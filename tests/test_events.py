@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import List
+
+import pytest
+
+from w3cwatcher.events import (
+    OVERFLOW_BLOCK,
+    OVERFLOW_DROP_NEWEST,
+    OVERFLOW_DROP_OLDEST,
+    Event,
+    EventBus,
+)
+from w3cwatcher.state_manager import STATE_IN_QUEUE, STATE_WAITING, StateManager
+
+
+@dataclass(frozen=True)
+class Numbered(Event):
+    n: int
+
+
+class GatedHandler:
+    """
+    Records events; blocks on the first one until `gate` is set, so the events after it pile up.
+    """
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.started = threading.Event()
+        self.received: List[int] = []
+        self.done = threading.Event()
+        self.expected = 0
+
+    def __call__(self, event: Numbered) -> None:
+        self.started.set()
+        assert self.gate.wait(5)
+        self.received.append(event.n)
+        if len(self.received) == self.expected:
+            self.done.set()
+
+
+@pytest.fixture
+def bus(logger):
+    bus = EventBus(logger)
+    yield bus
+    bus.close()
+
+
+def test_synchronous_delivery_runs_on_the_publishing_thread(bus):
+    threads = []
+    bus.subscribe(lambda event: threads.append(threading.current_thread()), Numbered, name="sync")
+    bus.publish(Numbered(1))
+    assert threads == [threading.current_thread()]
+    assert bus.stats()["sync"].delivered == 1
+
+
+def test_asynchronous_delivery_keeps_order_off_the_publishing_thread(bus):
+    received, threads, done = [], [], threading.Event()
+
+    def handler(event: Numbered) -> None:
+        received.append(event.n)
+        threads.append(threading.current_thread())
+        if len(received) == 5:
+            done.set()
+
+    bus.subscribe(handler, Numbered, asynchronous=True, name="async")
+    for n in range(5):
+        bus.publish(Numbered(n))
+    assert done.wait(5)
+    assert received == [0, 1, 2, 3, 4]
+    assert threading.current_thread() not in threads
+    assert bus.stats()["async"].delivered == 5
+
+
+def test_events_of_other_types_are_not_delivered(bus):
+    received = []
+    bus.subscribe(received.append, Numbered)
+    bus.publish(Event())
+    assert received == []
+
+
+def _fill(bus, overflow: str, expected: int) -> GatedHandler:
+    handler = GatedHandler()
+    handler.expected = expected
+    bus.subscribe(handler, Numbered, asynchronous=True, max_queue=2, overflow=overflow, name=overflow)
+    bus.publish(Numbered(1))
+    # the worker holds event 1, the queue takes two more
+    assert handler.started.wait(5)
+    bus.publish(Numbered(2))
+    bus.publish(Numbered(3))
+    return handler
+
+
+def test_drop_oldest_overflow(bus):
+    handler = _fill(bus, OVERFLOW_DROP_OLDEST, expected=3)
+    bus.publish(Numbered(4))
+    handler.gate.set()
+    assert handler.done.wait(5)
+    assert handler.received == [1, 3, 4]
+    assert bus.stats()[OVERFLOW_DROP_OLDEST].dropped == 1
+
+
+def test_drop_newest_overflow(bus):
+    handler = _fill(bus, OVERFLOW_DROP_NEWEST, expected=3)
+    bus.publish(Numbered(4))
+    handler.gate.set()
+    assert handler.done.wait(5)
+    assert handler.received == [1, 2, 3]
+    assert bus.stats()[OVERFLOW_DROP_NEWEST].dropped == 1
+
+
+def test_block_overflow_holds_the_publisher(bus):
+    handler = _fill(bus, OVERFLOW_BLOCK, expected=4)
+    publisher = threading.Thread(target=bus.publish, args=(Numbered(4),))
+    publisher.start()
+    publisher.join(0.2)
+    assert publisher.is_alive()
+
+    handler.gate.set()
+    publisher.join(5)
+    assert handler.done.wait(5)
+    assert handler.received == [1, 2, 3, 4]
+    assert bus.stats()[OVERFLOW_BLOCK].dropped == 0
+
+
+def test_unknown_overflow_policy_is_rejected(bus):
+    with pytest.raises(ValueError):
+        bus.subscribe(lambda event: None, asynchronous=True, overflow="drop-everything")
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_a_failing_subscriber_is_isolated(bus, asynchronous):
+    received, done = [], threading.Event()
+
+    def failing(event: Numbered) -> None:
+        raise RuntimeError("boom")
+
+    def healthy(event: Numbered) -> None:
+        received.append(event.n)
+        if len(received) == 2:
+            done.set()
+
+    failing_subscription = bus.subscribe(failing, Numbered, asynchronous=asynchronous, name="failing")
+    bus.subscribe(healthy, Numbered, asynchronous=asynchronous, name="healthy")
+    bus.publish(Numbered(1))
+    bus.publish(Numbered(2))
+    assert done.wait(5)
+    bus.unsubscribe(failing_subscription)  # waits for the worker to finish
+
+    failing_stats, healthy_stats = failing_subscription.snapshot(), bus.stats()["healthy"]
+    assert (failing_stats.delivered, failing_stats.errors) == (0, 2)
+    assert (healthy_stats.delivered, healthy_stats.errors) == (2, 0)
+
+
+def test_state_changes_do_not_wait_for_a_blocked_subscriber(logger):
+    state_manager = StateManager(logger)
+    gate, blocked, states = threading.Event(), threading.Event(), []
+
+    def listener(state, _after):
+        states.append(state)
+        if len(states) == 1:
+            blocked.set()
+            # reading the state from a subscriber must not deadlock
+            assert state_manager.current_state is not None
+            assert gate.wait(5)
+
+    state_manager.add_state_change_listener(listener)
+    first = threading.Thread(target=state_manager.update_state, args=(STATE_WAITING,))
+    first.start()
+    assert blocked.wait(5)
+
+    # the first publication is stuck in the listener; this change still goes through at once
+    second = threading.Thread(target=state_manager.update_state, args=(STATE_IN_QUEUE,))
+    second.start()
+    second.join(1)
+    assert not second.is_alive()
+    assert state_manager.current_state == STATE_IN_QUEUE
+
+    # and is published, in order, by the thread that was already publishing
+    gate.set()
+    first.join(5)
+    assert states == [STATE_WAITING, STATE_IN_QUEUE]
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import List
+
+from w3cwatcher.log_tail import LogTail
+
+
+def _record(level: str, message: str, ms: int = 0) -> str:
+    return f"2026-01-01 12:00:00.{ms:03d} [{level}]: {message}\n"
+
+
+def _append(path: Path, text: str) -> None:
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_last_lines_then_appended_ones(tmp_path):
+    path = tmp_path / "latest.log"
+    path.write_text("".join(_record("INFO", f"line {i}") for i in range(10)), encoding="utf-8")
+    tail = LogTail(path, block_size=64)
+
+    assert tail.last(3) == [_record("INFO", f"line {i}").rstrip("\n") for i in (7, 8, 9)]
+    assert tail.poll() == []
+
+    # an incomplete line waits for its newline
+    _append(path, _record("INFO", "line 10") + "2026-01-01 12:00:00.000 [INFO]: li")
+    assert tail.poll() == [_record("INFO", "line 10").rstrip("\n")]
+    _append(path, "ne 11\n")
+    assert tail.poll() == [_record("INFO", "line 11").rstrip("\n")]
+
+
+def test_follow_yields_new_lines_until_stopped(tmp_path):
+    path = tmp_path / "latest.log"
+    path.write_text(_record("INFO", "first"), encoding="utf-8")
+    stop = threading.Event()
+    lines: List[str] = []
+    follow = LogTail(path, poll_s=0.01).follow(5, stop)
+
+    lines.append(next(follow))
+    _append(path, _record("INFO", "second"))
+    lines.append(next(follow))
+    stop.set()
+    assert list(follow) == []
+    assert lines == [_record("INFO", "first").rstrip("\n"), _record("INFO", "second").rstrip("\n")]
+
+
+def test_level_filter_keeps_continuation_lines_with_their_record(tmp_path):
+    path = tmp_path / "latest.log"
+    path.write_text(
+        _record("DEBUG", "noise")
+        + _record("ERROR", "failed")
+        + "Traceback (most recent call last):\n"
+        + _record("INFO", "fine")
+        + _record("WARNING", "careful"),
+        encoding="utf-8",
+    )
+    tail = LogTail(path, min_level="WARNING")
+    assert tail.last(10) == [
+        _record("ERROR", "failed").rstrip("\n"),
+        "Traceback (most recent call last):",
+        _record("WARNING", "careful").rstrip("\n"),
+    ]
+
+    _append(path, _record("DEBUG", "more noise") + "  detail of the noise\n" + _record("ERROR", "again"))
+    assert tail.poll() == [_record("ERROR", "again").rstrip("\n")]
+    assert LogTail(path, min_level=logging.ERROR).last(1) == [_record("ERROR", "again").rstrip("\n")]
+
+
+def test_rewritten_file_is_read_from_the_top_even_when_it_grew_past_the_offset(tmp_path):
+    path = tmp_path / "latest.log"
+    path.write_text(_record("INFO", "old run", ms=1), encoding="utf-8")
+    tail = LogTail(path)
+    tail.last(10)
+
+    # what LogFiles.rotate does: the same file opened with "w", more than before written by the next poll
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(_record("INFO", "new segment", ms=2) + _record("INFO", "and more", ms=3))
+    assert tail.poll() == [
+        _record("INFO", "new segment", ms=2).rstrip("\n"),
+        _record("INFO", "and more", ms=3).rstrip("\n"),
+    ]
+
+
+def test_replaced_or_truncated_file_starts_over(tmp_path):
+    path = tmp_path / "latest.log"
+    path.write_text(_record("INFO", "old run, a line longer than the next one"), encoding="utf-8")
+    tail = LogTail(path)
+    tail.last(10)
+
+    path.write_text(_record("INFO", "short", ms=5), encoding="utf-8")
+    assert tail.poll() == [_record("INFO", "short", ms=5).rstrip("\n")]
+
+    replacement = tmp_path / "next.log"
+    replacement.write_text(_record("INFO", "replaced", ms=6), encoding="utf-8")
+    os.replace(replacement, path)
+    assert tail.poll() == [_record("INFO", "replaced", ms=6).rstrip("\n")]
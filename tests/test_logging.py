@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import itertools
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from w3cwatcher.config import LoggingConfig
+from w3cwatcher.discord_notifier import DiscordNotifier
+from w3cwatcher.logging import LogFilesHandler, Logger, LogMaintenance, QueueingHandler, RedactionRegistry
+
+_APP = "W3CWatcherPruneTests"
+_apps = itertools.count()
+_WEBHOOK = "https://discord.com/api/webhooks/123456789012345678/abcdefghijklmnopqrstuvwxyz-ABCDEFGHIJ"
+
+
+def _touch(directory: Path, name: str, mtime: int, size: int = 10) -> None:
+    path = directory / name
+    path.write_bytes(b"x" * size)
+    os.utime(path, (mtime, mtime))
+
+
+def _prune(directory: Path, **kwargs) -> list:
+    maintenance = LogMaintenance(directory, app_name=_APP, compress=False, **kwargs)
+    try:
+        maintenance.prune_later()
+        maintenance.flush()
+    finally:
+        maintenance.close()
+    return sorted(p.name for p in directory.iterdir())
+
+
+def test_keep_counts_runs_not_segments(tmp_path):
+    # three runs, the newest with two rotated segments
+    _touch(tmp_path, f"{_APP}_20260101-000000_1.log", 100)
+    _touch(tmp_path, f"{_APP}_20260102-000000_2.log.gz", 200)
+    _touch(tmp_path, f"{_APP}_20260103-000000_3.001.log.gz", 300)
+    _touch(tmp_path, f"{_APP}_20260103-000000_3.002.log.gz", 310)
+    _touch(tmp_path, f"{_APP}_20260103-000000_3.log", 320)
+
+    assert _prune(tmp_path, keep=2) == [
+        f"{_APP}_20260102-000000_2.log.gz",
+        f"{_APP}_20260103-000000_3.001.log.gz",
+        f"{_APP}_20260103-000000_3.002.log.gz",
+        f"{_APP}_20260103-000000_3.log",
+    ]
+
+
+def test_size_limit_drops_the_oldest_segments(tmp_path):
+    _touch(tmp_path, f"{_APP}_20260103-000000_3.001.log.gz", 300)
+    _touch(tmp_path, f"{_APP}_20260103-000000_3.002.log.gz", 310)
+    _touch(tmp_path, f"{_APP}_20260103-000000_3.log", 320)
+
+    assert _prune(tmp_path, keep=1, max_total_bytes=25) == [
+        f"{_APP}_20260103-000000_3.002.log.gz",
+        f"{_APP}_20260103-000000_3.log",
+    ]
+
+
+def test_active_logs_are_never_removed(tmp_path):
+    active = tmp_path / f"{_APP}_20260101-000000_1.log"
+    _touch(tmp_path, active.name, 100)
+    _touch(tmp_path, f"{_APP}_20260102-000000_2.log", 200)
+
+    assert _prune(tmp_path, keep=1, active=[active]) == sorted(
+        [active.name, f"{_APP}_20260102-000000_2.log"]
+    )
+
+
+def _registry(*secrets: str) -> RedactionRegistry:
+    registry = RedactionRegistry()
+    registry.add(*secrets)
+    return registry
+
+
+def test_a_secret_that_prefixes_another_masks_both_whole():
+    webhook_id, token = DiscordNotifier.discord_webhook_secrets(_WEBHOOK)
+    token_prefix = token[:10]
+    registry = _registry(_WEBHOOK, webhook_id, token, token_prefix)
+
+    # the longest registered secret wins, nothing of the longer one is left behind
+    assert registry.redact(f"POST {_WEBHOOK} failed") == "POST **** failed"
+    assert registry.redact(f"token={token}") == "token=****"
+    assert registry.redact(f"token={token_prefix}!") == "token=****!"
+    assert registry.redact(f"id {webhook_id}0") == "id ****0"
+
+
+@pytest.mark.parametrize(
+    "secrets, text, expected",
+    [
+        (["secret123", "123tail"], "secret123tail", "****tail"),
+        (["abcd", "bcde"], "xabcdex", "x****ex"),
+        (["ab", "abc", "abd"], "ab abc abd abx", "**** **** **** ****x"),
+        (["a.b", "c+d"], "a.b axb c+d ccd", "**** axb **** ccd"),
+    ],
+)
+def test_overlapping_secrets_are_masked_leftmost_first(secrets, text, expected):
+    redacted = _registry(*secrets).redact(text)
+    assert redacted == expected
+    assert not any(secret in redacted for secret in secrets)
+
+
+def test_unregistering_a_secret_stops_masking_only_that_one():
+    webhook_id, token = DiscordNotifier.discord_webhook_secrets(_WEBHOOK)
+    registry = _registry(webhook_id, token, "")
+    assert len(registry) == 2
+
+    registry.remove(token, "never registered")
+    assert len(registry) == 1
+    assert registry.redact(f"{webhook_id}/{token}") == f"****/{token}"
+
+    registry.remove(webhook_id)
+    assert len(registry) == 0
+    assert registry.redact(f"{webhook_id}/{token}") == f"{webhook_id}/{token}"
+
+    registry.add(token)
+    assert registry.redact(f"{webhook_id}/{token}") == f"{webhook_id}/****"
+
+
+@pytest.fixture
+def make_logger(tmp_path):
+    """
+    Loggers with an app name of their own each, so every test gets fresh handlers and files.
+    """
+    created = []
+
+    def make(config: Optional[LoggingConfig] = None, **kwargs) -> Logger:
+        app_name = f"W3CWatcherWriterTests{next(_apps)}"
+        if config is not None:
+            logger = Logger.from_config(config, app_name=app_name)
+        else:
+            kwargs.setdefault("flush_interval_s", 60.0)
+            logger = Logger(app_name=app_name, log_dir=tmp_path, **kwargs)
+        created.append(logger)
+        return logger
+
+    yield make
+    for logger in created:
+        Logger._instances.pop(logger.app_name, None)
+        for handler in list(logger.logger.handlers):
+            logger.logger.removeHandler(handler)
+            handler.close()
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_queued_errors_are_flushed_right_away(make_logger):
+    logger = make_logger()
+    logger.info("buffered line")
+    # the writer has had time to take the record, it stays in the file buffer until the flush interval
+    time.sleep(0.2)
+    assert "buffered line" not in logger.file_path.read_text(encoding="utf-8")
+
+    logger.error("error line")
+    assert _wait_for(lambda: "error line" in logger.file_path.read_text(encoding="utf-8"))
+    text = logger.file_path.read_text(encoding="utf-8")
+    assert text.index("buffered line") < text.index("error line")
+    assert "error line" in logger.latest_path.read_text(encoding="utf-8")
+
+
+def test_flush_drains_the_queue(make_logger):
+    logger = make_logger()
+    for i in range(500):
+        logger.info(f"line {i}")
+    logger.flush()
+    assert logger.file_path.read_text(encoding="utf-8").count("line ") == 500
+    assert "line 499" in logger.latest_path.read_text(encoding="utf-8")
+
+
+def test_close_drains_the_queue_and_stops_the_writer(make_logger):
+    logger = make_logger()
+    handler = next(h for h in logger.logger.handlers if isinstance(h, QueueingHandler))
+    for i in range(500):
+        logger.info(f"line {i}")
+    handler.close()
+
+    assert not handler.writer._thread.is_alive()
+    assert logger.file_path.read_text(encoding="utf-8").count("line ") == 500
+    # flushing a closed writer returns at once
+    begin = time.monotonic()
+    handler.flush()
+    assert time.monotonic() - begin < 1
+
+
+def test_unqueued_logging_writes_on_the_calling_thread(make_logger, tmp_path):
+    logger = make_logger(LoggingConfig.from_dict({"log_queued": False, "log_dir": str(tmp_path)}))
+    assert logger._writer() is None
+    assert any(isinstance(h, LogFilesHandler) for h in logger.logger.handlers)
+    writers = [t for t in threading.enumerate() if t.name == "log-writer"]
+
+    logger.info("synchronous line")
+    # no flush, no waiting
+    assert "synchronous line" in logger.file_path.read_text(encoding="utf-8")
+    assert "synchronous line" in logger.latest_path.read_text(encoding="utf-8")
+    assert [t for t in threading.enumerate() if t.name == "log-writer"] == writers
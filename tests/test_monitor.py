@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from w3cwatcher.config import MonitorConfig
+from w3cwatcher.state_manager import STATE_DISABLED, STATE_IN_QUEUE
+
+# what the tray allows a stop to take (TrayApp.STOP_TIMEOUT_S); the tray itself needs pystray
+STOP_TIMEOUT_S = 2.0
+
+
+def _long_poll_config() -> MonitorConfig:
+    config = MonitorConfig()
+    # a loop that would sleep for half a minute between ticks unless stop() wakes it
+    config.poll_s = config.in_queue_poll_s = config.reduced_poll_s = 30.0
+    return config
+
+
+def _wait_for_state(monitor, state: str, timeout: float = 5.0) -> None:
+    reached = threading.Event()
+    monitor.state_manager.add_state_change_listener(lambda new, _after: new == state and reached.set())
+    if monitor.state_manager.current_state != state:
+        assert reached.wait(timeout), f"monitor never reached {state}"
+
+
+def _samplers() -> int:
+    return sum(1 for t in threading.enumerate() if t.name == "monitor")
+
+
+@pytest.fixture
+def running(make_monitor):
+    monitor = make_monitor(_long_poll_config())
+    assert monitor.start()
+    _wait_for_state(monitor, STATE_IN_QUEUE)
+    yield monitor
+    monitor.stop()
+    monitor.join(STOP_TIMEOUT_S)
+
+
+def test_stop_interrupts_a_long_poll_interval(running):
+    begin = time.perf_counter()
+    running.stop()
+    assert running.join(STOP_TIMEOUT_S)
+    assert time.perf_counter() - begin < 0.5
+    assert not running.running
+    assert running.state_manager.current_state == STATE_DISABLED
+    assert running.last_stop_latency_s < 0.5
+
+
+def test_second_start_does_not_spawn_a_second_sampler(running):
+    assert _samplers() == 1
+    assert not running.start()
+    assert _samplers() == 1
+
+
+def test_join_returns_after_stop_and_the_monitor_can_start_again(running):
+    assert not running.join(0.05)  # still sleeping in its poll interval
+    running.stop()
+    assert running.join(STOP_TIMEOUT_S)
+
+    assert running.start()
+    _wait_for_state(running, STATE_IN_QUEUE)
+    assert _samplers() == 1
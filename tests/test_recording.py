@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from tests.conftest import RED, W3C_RECT, frame
+from w3cwatcher.clock import VirtualClock
+from w3cwatcher.config import MAX_PROBE_OFFSETS, MonitorConfig
+from w3cwatcher.recording import (
+    HEADER,
+    MAGIC,
+    MAX_PROBES,
+    STATES,
+    TICK,
+    VERSION,
+    WINDOW_FOUND,
+    RecordingError,
+    TickRecorder,
+    read_recording,
+)
+from w3cwatcher.state_manager import STATE_DISABLED, STATE_IN_GAME, STATE_IN_QUEUE, STATE_WAITING
+
+BLACK = (0, 0, 0)
+PROBES = MAX_PROBE_OFFSETS + 1
+
+
+def _config() -> MonitorConfig:
+    config = MonitorConfig()
+    # every probe slot the config allows, besides the watched point
+    config.probe_offsets_pct = [[0.1 + 0.1 * i, 0.5] for i in range(MAX_PROBE_OFFSETS)]
+    return config
+
+
+@pytest.fixture
+def recording(tmp_path, make_monitor, desktop):
+    """
+    Records a session: window missing, queue, game, queue again, queue left. Returns (path, live states).
+    """
+    path = tmp_path / "ticks.w3crec"
+    frames = [frame(RED), frame(BLACK)]
+    monitor = make_monitor(_config(), frames=frames, window=False, clock=VirtualClock())
+    monitor.recorder = TickRecorder(path)
+    monitor._sync_plan()
+    live = []
+    monitor.state_manager.add_state_change_listener(lambda state, _after: live.append(state))
+
+    def tick(color, was_in_queue):
+        monitor.capture.set_frame(0 if color == RED else 1)
+        result = monitor._tick(was_in_queue)
+        monitor.clock.advance(1)
+        return result[1] if result is not None else was_in_queue
+
+    assert monitor._tick(False) is None
+    monitor.clock.advance(1)
+    desktop.add_window("W3Champions", rect=W3C_RECT)
+    was_in_queue = tick(RED, False)
+    was_in_queue = tick(RED, was_in_queue)
+    # beside the client, so it does not cover the probes
+    warcraft3 = desktop.add_window("Warcraft III", rect=(0, 0, 100, 50))
+    was_in_queue = tick(RED, was_in_queue)
+    desktop.remove_window(warcraft3)
+    was_in_queue = tick(BLACK, was_in_queue)
+    was_in_queue = tick(RED, was_in_queue)
+    tick(BLACK, was_in_queue)
+    monitor.recorder.close()
+    return path, live
+
+
+def test_recording_round_trip(recording):
+    path, live = recording
+    assert live == [STATE_IN_QUEUE, STATE_IN_GAME, STATE_IN_QUEUE, STATE_WAITING]
+
+    ticks = read_recording(path)
+    assert len(ticks) == 7
+    assert ticks["flags"][0] & WINDOW_FOUND == 0
+    samples = ticks[1:]
+    assert (samples["probes"] == PROBES).all()
+    assert (samples["rgb"][:, PROBES:] == 0).all()
+    assert (samples["points"][:, PROBES:] == 0).all()
+    assert (samples["rgb"][samples["rgb"][:, 0, 0] != 0][:, :PROBES] == RED).all()
+    assert [STATES[state] for state in samples["state"]] == [
+        STATE_IN_QUEUE,
+        STATE_IN_QUEUE,
+        STATE_IN_GAME,
+        STATE_IN_GAME,
+        STATE_IN_QUEUE,
+        STATE_WAITING,
+    ]
+
+
+def test_replay_reproduces_the_recorded_transitions(recording, make_monitor):
+    path, _ = recording
+    ticks = read_recording(path)
+    monitor = make_monitor(_config(), window=False)
+    replayed = []
+    monitor.state_manager.add_state_change_listener(lambda state, _after: replayed.append(state))
+
+    stats = monitor.replay(ticks)
+
+    assert (stats.ticks, stats.samples) == (7, 6)
+    assert (stats.classification_mismatches, stats.state_mismatches) == (0, 0)
+    t0 = ticks["t"][0]
+    assert [(t - t0, state) for t, state in stats.transitions] == [
+        (1, STATE_IN_QUEUE),
+        (3, STATE_IN_GAME),
+        (5, STATE_IN_QUEUE),
+        (6, STATE_WAITING),
+    ]
+    # replay starts from waiting and leaves the monitor disabled, as a live run does
+    assert replayed == [
+        STATE_WAITING,
+        STATE_IN_QUEUE,
+        STATE_IN_GAME,
+        STATE_IN_QUEUE,
+        STATE_WAITING,
+        STATE_DISABLED,
+    ]
+
+
+def test_replay_with_another_config_counts_mismatches(recording, make_monitor):
+    path, _ = recording
+    config = _config()
+    config.in_queue_color = "green"
+    stats = make_monitor(config, window=False).replay(read_recording(path))
+    # the four red samples are no longer in queue, so replay stays waiting; only the last sample agrees
+    assert stats.classification_mismatches == 4
+    assert stats.transitions == []
+    assert stats.state_mismatches == 5
+
+
+def test_a_record_cut_short_is_ignored_and_overwritten(recording):
+    path, _ = recording
+    with open(path, "r+b") as f:
+        f.truncate(HEADER.size + 3 * TICK.size + TICK.size // 2)
+    assert len(read_recording(path)) == 3
+
+    recorder = TickRecorder(path)
+    recorder.record(100.0, None, state=STATE_WAITING)
+    recorder.close()
+    ticks = read_recording(path)
+    assert path.stat().st_size == HEADER.size + 4 * TICK.size
+    assert ticks["t"][-1] == 100.0
+    assert STATES[ticks["state"][-1]] == STATE_WAITING
+
+
+def test_a_file_shorter_than_the_header_is_rejected(tmp_path):
+    path = tmp_path / "short.w3crec"
+    path.write_bytes(MAGIC)
+    with pytest.raises(RecordingError, match="too short"):
+        read_recording(path)
+    with pytest.raises(RecordingError, match="too short"):
+        TickRecorder(path)
+
+
+@pytest.mark.parametrize(
+    "header, message",
+    [
+        (HEADER.pack(b"NOTAREC\0", VERSION, TICK.size, MAX_PROBES), "not a tick recording"),
+        (HEADER.pack(MAGIC, VERSION + 1, TICK.size, MAX_PROBES), f"version {VERSION + 1}"),
+        (HEADER.pack(MAGIC, VERSION, TICK.size + 8, MAX_PROBES), f"{TICK.size + 8} byte records"),
+        (HEADER.pack(MAGIC, VERSION, TICK.size, MAX_PROBES - 1), f"{MAX_PROBES - 1} probes"),
+    ],
+)
+def test_a_bad_header_is_rejected(tmp_path, header, message):
+    path = tmp_path / "bad.w3crec"
+    path.write_bytes(header + bytes(TICK.size))
+    with pytest.raises(RecordingError, match=message):
+        read_recording(path)
+    # and is never appended to
+    with pytest.raises(RecordingError, match=message):
+        TickRecorder(path)
+    assert path.stat().st_size == HEADER.size + TICK.size
+
+
+def test_recorder_rejects_more_points_than_probe_slots(tmp_path):
+    recorder = TickRecorder(tmp_path / "ticks.w3crec")
+    points = [(i, i) for i in range(MAX_PROBES + 1)]
+    pixels, colors = np.zeros((len(points), 3)), np.zeros(len(points))
+    with pytest.raises(ValueError):
+        recorder.record(0.0, 1, points=points, pixels=pixels, colors=colors)
+    recorder.close()
+    assert read_recording(recorder.path).size == 0
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from tests.conftest import RED, W3C_RECT, frame
+from w3cwatcher.clock import VirtualClock
+from w3cwatcher.config import MonitorConfig
+from w3cwatcher.scheduler import Backoff, DeadlineScheduler
+from w3cwatcher.state_manager import STATE_DISABLED, STATE_IN_GAME, STATE_IN_QUEUE, STATE_WAITING
+
+GREY = (100, 100, 100)
+
+
+@pytest.fixture
+def clock() -> VirtualClock:
+    return VirtualClock()
+
+
+def test_work_between_waits_does_not_drift_the_schedule(clock):
+    scheduler = DeadlineScheduler(clock=clock)
+    # the schedule starts with the first wait
+    scheduler.wait(1.0)
+    starts = []
+    for _ in range(20):
+        starts.append(clock.monotonic())
+        clock.advance(0.375)  # the work of a tick
+        assert scheduler.wait(1.0) == 0.0
+        assert scheduler.last_overshoot_s == 0.0
+    assert starts == [float(i) for i in range(1, 21)]
+    assert clock.monotonic() == 21.0
+    assert (scheduler.missed, scheduler.interrupted) == (0, False)
+
+
+def test_a_missed_deadline_restarts_the_schedule_from_now(clock):
+    scheduler = DeadlineScheduler(clock=clock)
+    scheduler.wait(1.0)
+    clock.advance(2.5)
+    assert scheduler.wait(1.0) == 1.5
+    assert clock.monotonic() == 3.5  # returns at once, no catching up
+    assert (scheduler.missed, scheduler.max_lateness_s, scheduler.last_overshoot_s) == (1, 1.5, 1.5)
+
+    scheduler.wait(1.0)
+    assert clock.monotonic() == 4.5
+    assert scheduler.missed == 1
+
+
+def test_a_wake_event_cuts_the_wait_short(clock):
+    scheduler = DeadlineScheduler(clock=clock)
+    wake = threading.Event()
+    clock.call_at(0.5, wake.set)
+    scheduler.wait(1.0, wake=wake)
+    assert scheduler.interrupted
+    wake.clear()
+    scheduler.wait(1.0, wake=wake)
+    assert not scheduler.interrupted
+    assert clock.monotonic() == 2.0
+
+
+def test_a_cancel_predicate_is_polled_in_slices(clock):
+    scheduler = DeadlineScheduler(clock=clock)
+    clock.call_at(2.1, lambda: None)
+    scheduler.wait(10.0, cancelled=lambda: clock.monotonic() >= 2.0)
+    assert scheduler.interrupted
+    assert clock.monotonic() == 2.0
+
+
+def test_wait_async_keeps_the_same_schedule(clock):
+    scheduler = DeadlineScheduler(clock=clock)
+
+    async def main():
+        wake = asyncio.Event()
+        await scheduler.wait_async(0.5, wake)
+        for _ in range(4):
+            clock.advance(0.25)
+            await scheduler.wait_async(0.5, wake)
+        wake.set()
+        await scheduler.wait_async(0.5, wake)
+
+    asyncio.run(main())
+    assert clock.monotonic() == 2.5
+    assert scheduler.interrupted and scheduler.missed == 0
+
+
+def test_backoff_doubles_up_to_its_maximum_and_resets():
+    backoff = Backoff(1.0, 10.0)
+    assert [backoff.next() for _ in range(6)] == [1.0, 2.0, 4.0, 8.0, 10.0, 10.0]
+    backoff.reset()
+    assert backoff.next() == 1.0
+    assert Backoff(5.0, 1.0).max_s == 5.0
+
+
+def test_monitor_polls_at_the_interval_of_each_state(make_monitor, desktop, clock):
+    config = MonitorConfig()
+    config.poll_s = 1.0
+    config.in_queue_poll_s = 0.25
+    config.reduced_poll_s = 5.0
+    config.window_missing_poll_s = 1.0
+    config.window_missing_max_poll_s = 10.0
+    monitor = make_monitor(config, frames=[frame(GREY), frame(RED)], window=False, clock=clock)
+
+    ticks = []
+    tick = monitor._tick
+
+    def timed_tick(was_in_queue):
+        ticks.append(clock.monotonic())
+        result = tick(was_in_queue)
+        clock.advance(0.125)  # ticks take time, the schedule must not drift by it
+        return result
+
+    monitor._tick = timed_tick
+    states = []
+    monitor.state_manager.add_state_change_listener(lambda state, _after: states.append(state))
+    w3c = []
+
+    def start_game():
+        monitor.capture.set_frame(0)
+        desktop.add_window("Warcraft III", rect=(0, 0, 100, 50))
+
+    clock.call_at(40.0, lambda: w3c.append(desktop.add_window("W3Champions", rect=W3C_RECT)))
+    clock.call_at(47.5, lambda: monitor.capture.set_frame(1))
+    clock.call_at(49.9, start_game)
+    clock.call_at(62.0, lambda: desktop.remove_window(w3c[0]))
+    clock.call_at(69.0, monitor.stop)
+    monitor.run()
+
+    intervals = [b - a for a, b in zip(ticks, ticks[1:])]
+    assert intervals == [
+        # no window: back off from window_missing_poll_s to window_missing_max_poll_s; the schedule
+        # starts once the first tick is done
+        *[1.125, 2.0, 4.0, 8.0, 10.0, 10.0, 10.0],
+        # lobby at poll_s, then in queue at in_queue_poll_s
+        *[1.0, 1.0, 1.0],
+        *[0.25] * 8,
+        # in game at reduced_poll_s
+        *[5.0, 5.0, 5.0],
+        # the window is gone again, the backoff starts over
+        *[1.0, 2.0],
+    ]
+    assert states == [STATE_WAITING, STATE_IN_QUEUE, STATE_IN_GAME, STATE_DISABLED]
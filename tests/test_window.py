@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from typing import List
+
+import pytest
+
+from w3cwatcher.clock import VirtualClock
+from w3cwatcher.utils import window
+from w3cwatcher.utils.window import TitleMatcher, WindowGeometryCache, WindowLocator
+
+W3C, WARCRAFT3 = "W3Champions", "Warcraft III"
+
+
+@pytest.fixture
+def enumerated(monkeypatch) -> List[list]:
+    """
+    The keywords of every enumeration WindowLocator runs.
+    """
+    calls = []
+    find = window.find_windows_by_titles
+
+    def recording_find(keywords):
+        calls.append(list(keywords))
+        return find(keywords)
+
+    monkeypatch.setattr(window, "find_windows_by_titles", recording_find)
+    return calls
+
+
+@pytest.fixture
+def windows(desktop):
+    desktop.populate(20)
+    return desktop.add_window(W3C), desktop.add_window(WARCRAFT3)
+
+
+def test_valid_cached_handles_skip_enumeration(desktop, windows, enumerated):
+    locator = WindowLocator([W3C, WARCRAFT3])
+    assert locator.locate() == {W3C: windows[0], WARCRAFT3: windows[1]}
+    assert locator.enumerations == 1
+    assert enumerated == [[W3C, WARCRAFT3]]
+
+    for _ in range(3):
+        assert locator.locate() == {W3C: windows[0], WARCRAFT3: windows[1]}
+    assert locator.enumerations == 1
+    assert desktop.calls["EnumWindows"] == 1
+
+
+def test_a_closed_window_is_enumerated_again_alone(desktop, windows, enumerated):
+    locator = WindowLocator([W3C, WARCRAFT3])
+    locator.locate()
+    desktop.remove_window(windows[0])
+    reopened = desktop.add_window(W3C)
+
+    assert locator.locate() == {W3C: reopened, WARCRAFT3: windows[1]}
+    assert locator.enumerations == 2
+    assert enumerated[1:] == [[W3C]]
+
+
+@pytest.mark.parametrize("change", ["title", "hidden"])
+def test_a_retitled_or_hidden_window_is_enumerated_again_alone(desktop, windows, enumerated, change):
+    locator = WindowLocator([W3C, WARCRAFT3])
+    locator.locate()
+    if change == "title":
+        desktop.windows[windows[1]].title = "Battle.net"
+    else:
+        desktop.windows[windows[1]].visible = False
+
+    assert locator.locate() == {W3C: windows[0], WARCRAFT3: None}
+    assert locator.enumerations == 2
+    assert enumerated[1:] == [[WARCRAFT3]]
+
+    # a keyword without a window stays stale until one turns up
+    game = desktop.add_window(WARCRAFT3)
+    assert locator.locate() == {W3C: windows[0], WARCRAFT3: game}
+    assert locator.locate() == {W3C: windows[0], WARCRAFT3: game}
+    assert enumerated[1:] == [[WARCRAFT3], [WARCRAFT3]]
+
+
+def test_invalidate_enumerates_every_keyword(windows, enumerated):
+    matcher = TitleMatcher.regex(r"^warcraft iii$")
+    locator = WindowLocator([W3C, matcher])
+    assert locator.locate() == {W3C: windows[0], matcher: windows[1]}
+    locator.invalidate()
+    assert locator.locate() == {W3C: windows[0], matcher: windows[1]}
+    assert enumerated == [[W3C, matcher], [W3C, matcher]]
+    assert locator.enumerations == 2
+
+
+OFFSETS = [(0.5, 0.5), (0.25, 0.75)]
+TTL_S = 2.0
+
+
+@pytest.fixture
+def clock() -> VirtualClock:
+    return VirtualClock()
+
+
+@pytest.fixture
+def cache(clock) -> WindowGeometryCache:
+    return WindowGeometryCache(OFFSETS, ownership_ttl_s=TTL_S, clock=clock.monotonic)
+
+
+def test_geometry_is_mapped_once_per_client_rect(desktop, cache):
+    hwnd = desktop.add_window(W3C, rect=(100, 50, 400, 200))
+    geometry = cache.geometry(hwnd)
+    assert geometry.client_bbox == (100, 50, 500, 250)
+    assert geometry.screen_points == ((300, 150), (200, 200))
+    assert geometry.window_points == ((200, 100), (100, 150))
+    assert cache.geometry(hwnd) is geometry
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    desktop.windows[hwnd].rect = (120, 50, 400, 200)
+    moved = cache.geometry(hwnd)
+    assert moved.screen_points == ((320, 150), (220, 200))
+    desktop.windows[hwnd].rect = (120, 50, 600, 200)
+    resized = cache.geometry(hwnd)
+    assert resized.screen_points == ((420, 150), (270, 200))
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_an_empty_client_area_has_no_geometry(desktop, cache):
+    hwnd = desktop.add_window(W3C, rect=(100, 50, 400, 200))
+    cache.geometry(hwnd)
+    desktop.windows[hwnd].rect = (100, 50, 0, 0)
+    assert cache.geometry(hwnd) is None
+    desktop.windows[hwnd].rect = (100, 50, 400, 200)
+    cache.geometry(hwnd)
+    assert cache.misses == 2
+
+
+def test_ownership_is_cached_for_its_ttl(desktop, cache, clock):
+    hwnd = desktop.add_window(W3C, rect=(100, 50, 400, 200))
+    geometry = cache.geometry(hwnd)
+    assert cache.belongs(geometry)
+    clock.advance(TTL_S - 0.1)
+    assert cache.belongs(geometry)
+    assert desktop.calls["WindowFromPoint"] == 1
+
+    clock.advance(0.1)
+    assert cache.belongs(geometry)
+    assert desktop.calls["WindowFromPoint"] == 2
+
+
+def test_a_changed_client_rect_checks_ownership_again(desktop, cache):
+    hwnd = desktop.add_window(W3C, rect=(100, 50, 400, 200))
+    assert cache.belongs(cache.geometry(hwnd))
+    assert cache.belongs(cache.geometry(hwnd))
+    assert desktop.calls["WindowFromPoint"] == 1
+
+    desktop.windows[hwnd].rect = (150, 50, 400, 200)
+    moved = cache.geometry(hwnd)
+    assert cache.belongs(moved)
+    assert desktop.calls["WindowFromPoint"] == 2
+    # a geometry that is no longer the cached one is checked every time, and not cached
+    desktop.windows[hwnd].rect = (100, 50, 400, 200)
+    cache.geometry(hwnd)
+    assert cache.belongs(moved) and cache.belongs(moved)
+    assert desktop.calls["WindowFromPoint"] == 4
+
+
+def test_a_failed_ownership_check_is_repeated(desktop, cache):
+    hwnd = desktop.add_window(W3C, rect=(100, 50, 400, 200))
+    # added later, so on top of the first probe
+    cover = desktop.add_window("Notepad", rect=(250, 100, 100, 100))
+    geometry = cache.geometry(hwnd)
+    assert not cache.belongs(geometry)
+    assert not cache.belongs(geometry)
+    assert desktop.calls["WindowFromPoint"] == 2
+
+    desktop.remove_window(cover)
+    assert cache.belongs(geometry)
+    assert cache.belongs(geometry)
+    assert desktop.calls["WindowFromPoint"] == 3
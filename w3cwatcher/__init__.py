@@ -3,5 +3,6 @@ __all__ = [
     "config",
     "state_manager",
     "monitor",
+    "capture",
     "tray"
 ]
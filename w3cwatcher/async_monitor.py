@@ -0,0 +1,188 @@
+"""
+The monitor loop as a coroutine, so several monitors, an HTTP status server and coroutine state listeners
+(`StateManager.add_async_state_change_listener`) can share one event loop instead of a thread each. The
+blocking parts of a tick (window lookup, capture) run in an executor; waits are on the event loop and end
+as soon as the monitor is stopped, reconfigured or the task is cancelled.
+
+`Monitor.run` is this loop on an event loop of its own.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Callable, Optional, TypeVar
+
+from .metrics import AsyncMetricsServer
+from .scheduler import Backoff, DeadlineScheduler
+from .state_manager import STATE_DISABLED, STATE_WAITING
+from .utils import show_error
+from .utils.platform import set_dpi_awareness
+
+if TYPE_CHECKING:
+    # monitor.py runs its loop through this module
+    from .monitor import Monitor
+
+T = TypeVar("T")
+
+
+class AsyncMonitor:
+    """
+    Runs `monitor` on the current event loop. `Monitor.stop()` and `Monitor.apply_config()` wake it up
+    from any thread; cancelling the task that runs `run()` stops it too, and the monitor still ends up
+    disabled. Ticks go to `executor`, the loop's default executor if None; with `offload=False` they run on
+    the loop itself, for a loop that has nothing else to do. The metrics server counts as something to do:
+    while it runs, ticks are offloaded either way, so it keeps answering during a capture.
+    """
+
+    def __init__(self, monitor: Monitor, executor: Optional[Executor] = None, offload: bool = True):
+        self.monitor = monitor
+        self.executor = executor
+        self.offload = offload
+        # the tick running in the executor, if any
+        self._in_flight: Optional[asyncio.Future] = None
+        self._metrics_server: Optional[AsyncMetricsServer] = None
+
+    def stop(self) -> None:
+        self.monitor.stop()
+
+    async def run(self, reset_stop: bool = True) -> None:
+        """
+        Monitor until stopped. With `reset_stop=False` a `stop()` that came before this call is honored.
+        """
+        monitor = self.monitor
+        if monitor._async_waker is not None:
+            raise RuntimeError("This monitor is already running on an event loop")
+        if reset_stop:
+            monitor._reset_stop()
+
+        loop = asyncio.get_running_loop()
+        wake = asyncio.Event()
+
+        def waker() -> None:
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                pass  # the loop is closed, nothing left to wake
+
+        monitor._async_waker = waker
+        try:
+            await self._run(loop, wake)
+        finally:
+            monitor._async_waker = None
+
+    async def _run(self, loop: asyncio.AbstractEventLoop, wake: asyncio.Event) -> None:
+        monitor = self.monitor
+        logger = monitor.logger
+        try:
+            monitor._sync_plan()
+        except Exception as ex:
+            logger.error(ex)
+            show_error(str(ex))
+            return
+
+        set_dpi_awareness()
+        monitor._window_missing = False
+        await self._call(loop, monitor._get_color_lut)
+
+        logger.info(f"Monitoring started")
+        monitor.state_manager.update_state(STATE_WAITING)
+        was_in_queue = False
+
+        scheduler = DeadlineScheduler(logger, monitor.clock)
+        plan = monitor._active_plan
+        missing_backoff = Backoff(plan.window_missing_poll_s, plan.window_missing_max_poll_s)
+
+        self._metrics_server = await self._start_metrics_server()
+        next_summary = monitor.clock.monotonic() + plan.metrics_log_interval_s
+
+        try:
+            while not monitor._stop:
+                try:
+                    # stop() and apply_config() change the monitor before waking it, so whatever woke it
+                    # before this point is seen below
+                    wake.clear()
+                    monitor._wake.clear()
+                    previous_plan = plan
+                    if monitor._sync_plan():
+                        plan = monitor._active_plan
+                        missing_backoff = Backoff(
+                            plan.window_missing_poll_s, plan.window_missing_max_poll_s
+                        )
+                        next_summary = monitor.clock.monotonic() + plan.metrics_log_interval_s
+                        if plan.metrics_port != previous_plan.metrics_port:
+                            await self._stop_metrics_server()
+                            self._metrics_server = await self._start_metrics_server()
+
+                    result = await self._call(loop, monitor._tick, was_in_queue)
+                    if result is None:
+                        await self._wait(scheduler, wake, missing_backoff.next())
+                        continue
+                    missing_backoff.reset()
+                    in_game, was_in_queue = result
+
+                    if plan.metrics_log_interval_s and monitor.clock.monotonic() >= next_summary:
+                        next_summary = monitor.clock.monotonic() + plan.metrics_log_interval_s
+                        logger.info(monitor.metrics.format_summary())
+
+                    await self._wait(scheduler, wake, plan.poll_interval(in_game, was_in_queue))
+                except Exception as e:
+                    logger.error(e)
+                    monitor._stop = True
+                    break
+        finally:
+            await self._finish_in_flight()
+            if scheduler.missed:
+                logger.info(
+                    f"Missed {scheduler.missed} poll deadlines "
+                    f"(worst by {scheduler.max_lateness_s * 1000:.1f} ms)"
+                )
+            await self._stop_metrics_server()
+            monitor.state_manager.update_state(STATE_DISABLED)
+            if monitor._stop_requested_at is not None:
+                monitor.last_stop_latency_s = time.perf_counter() - monitor._stop_requested_at
+                latency_ms = monitor.last_stop_latency_s * 1000
+                logger.info(f"Monitoring stopped {latency_ms:.1f} ms after the request")
+
+    async def _call(self, loop: asyncio.AbstractEventLoop, func: Callable[..., T], *args) -> T:
+        if not self.offload and self._metrics_server is None:
+            return func(*args)
+        self._in_flight = loop.run_in_executor(self.executor, func, *args)
+        # shielded: a cancel ends the wait, not the work, which keeps running in the executor either way
+        return await asyncio.shield(self._in_flight)
+
+    async def _finish_in_flight(self) -> None:
+        future, self._in_flight = self._in_flight, None
+        if future is not None and not future.done():
+            # cancelled mid-tick: the tick can still publish a state, so let it finish before DISABLED
+            await asyncio.wait([future])
+
+    async def _start_metrics_server(self) -> Optional[AsyncMetricsServer]:
+        monitor = self.monitor
+        port = monitor._active_plan.metrics_port
+        if not port:
+            return None
+        metrics_server = AsyncMetricsServer(monitor.metrics, port, monitor.logger)
+        try:
+            await metrics_server.start()
+        except OSError as ex:
+            monitor.logger.warning(f"Could not start metrics server: {ex}")
+            return None
+        return metrics_server
+
+    async def _stop_metrics_server(self) -> None:
+        metrics_server, self._metrics_server = self._metrics_server, None
+        if metrics_server is not None:
+            await metrics_server.stop()
+
+    async def _wait(self, scheduler: DeadlineScheduler, wake: asyncio.Event, interval_s: float) -> None:
+        monitor = self.monitor
+        if monitor._stop:
+            return
+        await scheduler.wait_async(interval_s, wake)
+        if scheduler.interrupted:
+            # stopped or reconfigured: the next tick starts a fresh schedule
+            scheduler.reset()
+        elif not monitor._stop:
+            monitor.metrics.record("sleep_overshoot", scheduler.last_overshoot_s)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional, Protocol, Sequence, Tuple, Union
+
+import numpy as np
+from PIL import Image, ImageGrab
+
+from .utils.geometry import Point, Rect, crop_to_aspect_ratio
+from .utils.image import get_window_image
+
+RGB = Tuple[int, int, int]
+FrameSource = Union[np.ndarray, Image.Image, Path, str]
+
+
+class CaptureBackend(Protocol):
+    """
+    Source of screen pixels used by the monitor.
+    Coordinates are screen coordinates; regions are (left, top, right, bottom) with exclusive right/bottom.
+    """
+
+    def grab_pixel(self, x: int, y: int) -> RGB: ...
+
+    def grab_region(self, bbox: Rect) -> np.ndarray: ...
+
+    def grab_window(self, hwnd: int, aspect_ratio: Optional[float] = None) -> Image.Image: ...
+
+
+def grab_points(backend: CaptureBackend, points: Sequence[Point]) -> np.ndarray:
+    """
+    Sample several screen points with a single grab of their bounding box; returns an (N, 3) array.
+    """
+    if len(points) == 1:
+        return np.asarray([backend.grab_pixel(*points[0])[:3]], dtype=np.uint8)
+
+    xs = np.fromiter((p[0] for p in points), dtype=np.intp, count=len(points))
+    ys = np.fromiter((p[1] for p in points), dtype=np.intp, count=len(points))
+    left, top = int(xs.min()), int(ys.min())
+    region = backend.grab_region((left, top, int(xs.max()) + 1, int(ys.max()) + 1))
+    return region[ys - top, xs - left, :3]
+
+
+class ImageGrabCaptureBackend:
+    """
+    Live desktop capture through PIL.ImageGrab (Windows).
+    """
+
+    def grab_pixel(self, x: int, y: int) -> RGB:
+        img = self._grab((x, y, x + 1, y + 1))
+        # noinspection PyTypeChecker
+        return img.getpixel((0, 0))
+
+    def grab_region(self, bbox: Rect) -> np.ndarray:
+        return np.asarray(self._grab(bbox).convert("RGB"))
+
+    def grab_window(self, hwnd: int, aspect_ratio: Optional[float] = None) -> Image.Image:
+        return get_window_image(hwnd, aspect_ratio)
+
+    @staticmethod
+    def _grab(bbox: Rect) -> Image.Image:
+        return ImageGrab.grab(bbox=bbox, include_layered_windows=True, all_screens=True)
+
+
+class SyntheticCaptureBackend:
+    """
+    In-memory capture backend serving pre-recorded frames, for headless runs and benchmarks.
+
+    Each frame is an (H, W, 3) uint8 array placed on a virtual screen with its top-left corner at `origin`.
+    Pixels outside the frame read as black. With `auto_advance` every grab moves to the next frame.
+    """
+
+    def __init__(
+        self,
+        frames: Sequence[FrameSource],
+        origin: Point = (0, 0),
+        auto_advance: bool = False,
+        loop: bool = True,
+    ):
+        if len(frames) == 0:
+            raise ValueError("At least one frame is required")
+        self.frames = [self._load_frame(f) for f in frames]
+        self.origin = origin
+        self.auto_advance = auto_advance
+        self.loop = loop
+        self.index = 0
+
+    @classmethod
+    def from_files(cls, paths: Sequence[Path | str], **kwargs) -> SyntheticCaptureBackend:
+        return cls([Path(p) for p in paths], **kwargs)
+
+    @staticmethod
+    def _load_frame(frame: FrameSource) -> np.ndarray:
+        if isinstance(frame, (str, Path)):
+            with Image.open(frame) as img:
+                frame = img.convert("RGB")
+        if isinstance(frame, Image.Image):
+            frame = np.asarray(frame.convert("RGB"))
+
+        arr = np.ascontiguousarray(frame, dtype=np.uint8)
+        if arr.ndim != 3 or arr.shape[2] < 3:
+            raise ValueError(f"Frame must have shape (H, W, 3), got {arr.shape}")
+        return arr[:, :, :3]
+
+    @property
+    def current_frame(self) -> np.ndarray:
+        return self.frames[self.index]
+
+    def advance(self) -> None:
+        if self.index + 1 < len(self.frames):
+            self.index += 1
+        elif self.loop:
+            self.index = 0
+
+    def set_frame(self, index: int) -> None:
+        if not 0 <= index < len(self.frames):
+            raise IndexError(f"Frame index {index} out of range")
+        self.index = index
+
+    def grab_pixel(self, x: int, y: int) -> RGB:
+        region = self.grab_region((x, y, x + 1, y + 1))
+        r, g, b = region[0, 0]
+        return int(r), int(g), int(b)
+
+    def grab_region(self, bbox: Rect) -> np.ndarray:
+        left, top, right, bottom = bbox
+        if right <= left or bottom <= top:
+            raise ValueError(f"Invalid bbox {bbox}")
+
+        frame = self.current_frame
+        ox, oy = self.origin
+        out = np.zeros((bottom - top, right - left, 3), dtype=np.uint8)
+
+        # intersect the requested region with the frame
+        src_l, src_t = max(left - ox, 0), max(top - oy, 0)
+        src_r, src_b = min(right - ox, frame.shape[1]), min(bottom - oy, frame.shape[0])
+        if src_r > src_l and src_b > src_t:
+            dst_l, dst_t = src_l + ox - left, src_t + oy - top
+            dst_r, dst_b = dst_l + src_r - src_l, dst_t + src_b - src_t
+            out[dst_t:dst_b, dst_l:dst_r] = frame[src_t:src_b, src_l:src_r]
+
+        if self.auto_advance:
+            self.advance()
+        return out
+
+    def grab_window(self, hwnd: int, aspect_ratio: Optional[float] = None) -> Image.Image:
+        height, width = self.current_frame.shape[:2]
+        bbox = (0, 0, width, height)
+        if aspect_ratio is not None:
+            bbox = crop_to_aspect_ratio(bbox, aspect_ratio)
+        l, t, r, b = bbox
+        return Image.fromarray(self.current_frame[t:b, l:r])
@@ -1,35 +1,102 @@
 from __future__ import annotations
 
-import tomlkit
+from pathlib import Path
 
-from .config import load_config, APP_NAME
-from .discord_notifier import DiscordNotifier
+from .config import APP_NAME, build_config, get_config_files, load_config
+from .config_watcher import ConfigWatcher
 from .logging import Logger
-from .monitor import Monitor
 from .state_manager import StateManager
-from .tray import TrayApp
+
+# Mode specific modules (monitor: numpy/PIL, discord_notifier: requests, tray: pystray/win32) are imported
+# inside main() so each mode only pays for what it uses; see benchmarks/startup.py for the budget.
 
 
 def main():
     args, config = load_config()
+    if args.tail is not None:
+        # before the Logger is created, it would start a new latest.log
+        tail(Logger.get_latest_path(config.logging), args.tail, args.tail_level)
+        return
+
     logger = Logger.from_config(config.logging)
 
-    doc = config.as_toml(include_defaults=True, comment="source")
-    logger.debug(tomlkit.dumps(doc))
+    if logger.is_enabled_for("DEBUG"):
+        import tomlkit
+
+        doc = config.as_toml(include_defaults=True, comment="source")
+        logger.debug(tomlkit.dumps(doc))
 
     errors, message = config.validate_all(raise_error=False)
     if len(errors) > 0:
         logger.warning(message)
 
+    from .monitor import Monitor
+
     state_manager = StateManager(logger=logger)
     monitor = Monitor(logger=logger, config=config.monitor, state_manager=state_manager)
-    notifier = DiscordNotifier(config=config.notifications.discord, logger=logger)
-    state_manager.add_state_change_listener(notifier.on_monitor_state_change)
 
     if args.check:
         monitor.show_debug_image()
-    elif args.tray:
-        tray = TrayApp.create_singleton(logger=logger, config=config.tray, monitor=monitor)
-        tray.run()
-    else:
-        monitor.run()
+        return
+
+    if args.replay:
+        from .recording import read_recording
+
+        monitor.replay(read_recording(args.replay))
+        return
+
+    if args.record:
+        from .recording import TickRecorder
+
+        monitor.recorder = TickRecorder(args.record)
+        logger.info(f"Recording ticks to {monitor.recorder.path}")
+
+    from .discord_notifier import DiscordNotifier
+
+    notifier = DiscordNotifier(config=config.notifications.discord, logger=logger)
+    state_manager.add_state_change_listener(notifier.on_monitor_state_change, asynchronous=True)
+
+    config_files = get_config_files(args)
+    watcher = ConfigWatcher(
+        logger, config, config_files, load=lambda cache: build_config(args, config_files, cache)
+    )
+    watcher.on_change("monitor", monitor.apply_config)
+    watcher.on_change("notifications.discord", notifier.apply_config)
+    watcher.on_change("logging", logger.apply_config)
+    watcher.start()
+
+    try:
+        if args.tray:
+            from .tray import TrayApp
+
+            tray = TrayApp.create_singleton(logger=logger, config=config.tray, monitor=monitor)
+            if tray is None:
+                # another instance is running, create_singleton already told the user
+                return
+            # the watcher swaps in a new section on reload, the startup one would go stale
+            watcher.on_change("tray", tray.apply_config)
+            tray.run()
+        else:
+            monitor.run()
+    finally:
+        watcher.stop()
+        if monitor.recorder is not None:
+            monitor.recorder.close()
+        state_manager.bus.close()
+        notifier.close()
+        for name, stats in state_manager.bus.stats().items():
+            logger.debug(
+                f"Listener {name}: {stats.delivered} events, mean {stats.mean_s * 1000:.2f} ms, "
+                f"max {stats.max_s * 1000:.2f} ms, {stats.dropped} dropped, {stats.errors} errors"
+            )
+
+
+def tail(path: Path, lines: int, level: str = None) -> None:
+    from .log_tail import LogTail
+
+    log_tail = LogTail(path, min_level=level or "NOTSET")
+    try:
+        for line in log_tail.follow(lines):
+            print(line, flush=True)
+    except KeyboardInterrupt:
+        pass
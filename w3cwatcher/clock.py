@@ -0,0 +1,146 @@
+"""
+Time source shared by the monitor loop, the scheduler, the state manager and the notifier debounce.
+`SystemClock` is the real thing; `VirtualClock` only moves when something sleeps, so a simulated
+20 minute queue passes in milliseconds.
+
+Durations are always measured with `monotonic()`; `time()`/`now()` are only for timestamps shown to people.
+`wait_async()` is `wait()` for code on an asyncio event loop.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+from abc import ABC, abstractmethod
+import threading
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    # asyncio takes ~30 ms to import; only a running monitor loop needs it, not --check, --tail or --replay
+    import asyncio
+
+
+class Clock(ABC):
+    @abstractmethod
+    def monotonic(self) -> float: ...
+
+    @abstractmethod
+    def time(self) -> float: ...
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.time())
+
+    @abstractmethod
+    def sleep(self, seconds: float) -> None: ...
+
+    @abstractmethod
+    def wait(self, event: threading.Event, timeout: Optional[float] = None) -> bool:
+        """
+        Like `event.wait(timeout)`, but with the timeout measured on this clock.
+        """
+
+    @abstractmethod
+    async def wait_async(self, event: asyncio.Event, timeout: Optional[float] = None) -> bool:
+        """
+        `wait()` for an asyncio.Event; cancelling the awaiting task ends the wait.
+        """
+
+
+class SystemClock(Clock):
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def time(self) -> float:
+        return time.time()
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def wait(self, event: threading.Event, timeout: Optional[float] = None) -> bool:
+        return event.wait(timeout)
+
+    async def wait_async(self, event: asyncio.Event, timeout: Optional[float] = None) -> bool:
+        import asyncio
+
+        try:
+            async with asyncio.timeout(timeout):
+                await event.wait()
+        except TimeoutError:
+            pass
+        return event.is_set()
+
+
+SYSTEM_CLOCK = SystemClock()
+
+
+class VirtualClock(Clock):
+    """
+    Simulated time. `sleep()` returns immediately after moving the clock forward, and callbacks scheduled
+    with `call_at`/`call_later` run on whichever thread moves the clock past their time, with the clock set
+    to exactly that time. Meant for one simulated thread (e.g. `Monitor.run`) driving the scenario.
+    """
+
+    def __init__(self, start_time: Optional[float] = None):
+        self._now = 0.0
+        self._epoch = time.time() if start_time is None else start_time
+        self._callbacks: List[Tuple[float, int, Callable[[], None]]] = []
+        self._order = itertools.count()
+        self._lock = threading.RLock()
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def time(self) -> float:
+        return self._epoch + self._now
+
+    def sleep(self, seconds: float) -> None:
+        self.advance(max(seconds, 0.0))
+
+    def wait(self, event: threading.Event, timeout: Optional[float] = None) -> bool:
+        if timeout is None:
+            return event.wait()
+        if not event.is_set():
+            self.advance(max(timeout, 0.0))
+        return event.is_set()
+
+    async def wait_async(self, event: asyncio.Event, timeout: Optional[float] = None) -> bool:
+        import asyncio
+
+        if timeout is None:
+            await event.wait()
+            return True
+        if not event.is_set():
+            self.advance(max(timeout, 0.0))
+        # let the rest of the event loop catch up with the new time
+        await asyncio.sleep(0)
+        return event.is_set()
+
+    def set_wall_time(self, wall_time: float) -> None:
+        """
+        Jump the wall clock (e.g. an NTP correction) without moving monotonic time.
+        """
+        with self._lock:
+            self._epoch = wall_time - self._now
+
+    def call_at(self, monotonic_time: float, callback: Callable[[], None]) -> None:
+        with self._lock:
+            heapq.heappush(self._callbacks, (monotonic_time, next(self._order), callback))
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> None:
+        self.call_at(self._now + delay, callback)
+
+    def advance(self, seconds: float) -> None:
+        with self._lock:
+            target = self._now + seconds
+            while self._callbacks and self._callbacks[0][0] <= target:
+                when, _, callback = heapq.heappop(self._callbacks)
+                self._now = max(self._now, when)
+                callback()
+            # a callback may have slept past the target itself
+            self._now = max(self._now, target)
@@ -3,12 +3,64 @@ from __future__ import annotations
 import argparse
 import re
 from pathlib import Path
-from typing import Tuple
+from typing import List, Tuple
 
-from .utils.config_base import ConfigBase, field, get_allowed_values_validator, get_config_file
+from platformdirs import user_cache_dir
+
+from .utils.config_base import ConfigBase, LayerCache, field, get_allowed_values_validator, get_config_file
 
 APP_NAME = "W3CWatcher"
 
+# probes are sampled along with the watched point; a tick recording has room for 8 in total
+MAX_PROBE_OFFSETS = 7
+
+
+def _validate_probe_offsets(offsets):
+    if not isinstance(offsets, (list, tuple)):
+        return [f"Invalid probe offsets {offsets!r}, expected a list of [x, y] pairs."]
+    errors = []
+    if len(offsets) > MAX_PROBE_OFFSETS:
+        errors.append(f"At most {MAX_PROBE_OFFSETS} probe offsets are supported, got {len(offsets)}.")
+    for offset in offsets:
+        if (
+            not isinstance(offset, (list, tuple))
+            or len(offset) != 2
+            or not all(isinstance(v, (int, float)) and 0.0 <= v <= 1.0 for v in offset)
+        ):
+            errors.append(f"Invalid probe offset {offset!r}, expected [x, y] with values in 0..1.")
+    return errors
+
+
+def _validate_positive(value):
+    if value > 0:
+        return []
+    return ["Must be greater than 0."]
+
+
+def _validate_non_negative(value):
+    if value >= 0:
+        return []
+    return ["Must be 0 or greater."]
+
+
+def _validate_fraction(value):
+    if 0.0 < value <= 1.0:
+        return []
+    return ["Must be greater than 0 and at most 1."]
+
+
+def _validate_port(value):
+    if 0 <= value <= 65535:
+        return []
+    return ["Must be a port number between 0 and 65535."]
+
+
+def _validate_color_name(value):
+    # utils.color needs numpy, so defer the import until a config actually gets validated
+    from .utils.color import COLOR_NAMES
+
+    return get_allowed_values_validator(*COLOR_NAMES)(value)
+
 
 class MonitorConfig(ConfigBase):
     w3champions_window_title: str = field(
@@ -22,6 +74,12 @@ class MonitorConfig(ConfigBase):
         help_text="Default Warcraft III window title (used for fallback).",
     )
 
+    window_title_match: str = field(
+        default="substring",
+        help_text="How the window titles are matched: 'substring' or 'regex' (both ignore case).",
+        validators=get_allowed_values_validator("substring", "regex"),
+    )
+
     x_offset_pct: float = field(
         default=0.755,
         arg="--x",
@@ -39,13 +97,80 @@ class MonitorConfig(ConfigBase):
         help_text="Aspect ratio for the inner rectangle of the window capture.",
     )
 
-    in_queue_color: str = field(default="red", help_text="Color used to detect when in queue.")
+    probe_offsets_pct: list = field(
+        default_factory=list,
+        arg=None,
+        help_text="Extra [x, y] client offsets sampled along with x/y_offset_pct, e.g. [[0.74, 0.955]].",
+        validators=_validate_probe_offsets,
+    )
+
+    probe_quorum: float = field(
+        default=0.5,
+        help_text="Fraction of probes that must show in_queue_color to count as in queue.",
+        validators=_validate_fraction,
+    )
+
+    in_queue_color: str = field(
+        default="red",
+        help_text="Color used to detect when in queue.",
+        validators=_validate_color_name,
+    )
 
-    ready_color: str = field(default="green", help_text="Color used to detect when the match is ready.")
+    ready_color: str = field(
+        default="green",
+        help_text="Color used to detect when the match is ready.",
+        validators=_validate_color_name,
+    )
 
-    poll_s: int = field(default=1, arg="--poll", help_text="Polling rate in seconds.")
+    poll_s: float = field(
+        default=1.0,
+        arg="--poll",
+        help_text="Polling interval while waiting for a queue (seconds).",
+        validators=_validate_positive,
+    )
 
-    reduced_poll_s: int = field(default=5, help_text="Reduced polling rate when idle (seconds).")
+    in_queue_poll_s: float = field(
+        default=0.25,
+        help_text="Polling interval while in queue (seconds).",
+        validators=_validate_positive,
+    )
+
+    reduced_poll_s: float = field(
+        default=5.0,
+        help_text="Reduced polling interval while in game (seconds).",
+        validators=_validate_positive,
+    )
+
+    window_missing_poll_s: float = field(
+        default=1.0,
+        help_text="Initial polling interval while the W3Champions window is missing (seconds).",
+        validators=_validate_positive,
+    )
+
+    window_missing_max_poll_s: float = field(
+        default=10.0,
+        help_text="The missing-window interval doubles on each miss up to this value (seconds).",
+        validators=_validate_positive,
+    )
+
+    ownership_recheck_s: float = field(
+        default=2.0,
+        help_text="How often to re-check that nothing covers the watched pixel while the window stays put "
+        "(seconds).",
+        validators=_validate_positive,
+    )
+
+    metrics_log_interval_s: float = field(
+        default=600.0,
+        help_text="How often a tick timing summary (p50/p95/p99) is logged, in seconds. 0 disables it.",
+        validators=_validate_non_negative,
+    )
+
+    metrics_port: int = field(
+        default=0,
+        help_text="Serve Prometheus-style tick timings on http://127.0.0.1:<port>/metrics. 0 disables it.",
+        validators=_validate_port,
+    )
 
 
 def _validate_discord_webhook(url):
@@ -67,6 +192,7 @@ class DiscordConfig(ConfigBase):
         default=None,
         help_text="Discord webhook URL for notifications.",
         validators=[_validate_discord_webhook],
+        secret=True,
     )
 
     debounce: int = field(
@@ -75,6 +201,11 @@ class DiscordConfig(ConfigBase):
         help_text="Minimum seconds between Discord webhook notifications.",
     )
 
+    max_retries: int = field(
+        default=3,
+        help_text="How many times a failed Discord webhook delivery is retried.",
+    )
+
 
 class LoggingConfig(ConfigBase):
     log_level: str = field(
@@ -85,10 +216,45 @@ class LoggingConfig(ConfigBase):
         ),
     )
 
-    log_keep: int = field(default=10, help_text="Number of old log files to keep. -1 for no cleanup")
+    log_keep: int = field(default=10, help_text="Number of runs whose logs are kept. -1 for no limit")
+
+    log_max_total_bytes: int = field(
+        default=100 * 1024 * 1024,
+        help_text="Delete the oldest log files once together they exceed this many bytes. 0 for no limit.",
+        validators=_validate_non_negative,
+    )
+
+    log_max_bytes: int = field(
+        default=10 * 1024 * 1024,
+        help_text="Start a new log segment once the current one reaches this many bytes. 0 to disable.",
+        validators=_validate_non_negative,
+    )
+
+    log_rotate_interval_h: float = field(
+        default=24.0,
+        help_text="Start a new log segment after this many hours. 0 to disable.",
+        validators=_validate_non_negative,
+    )
+
+    log_compress: bool = field(
+        default=True, arg=None, help_text="Compress finished log segments with gzip."
+    )
 
     log_dir: Path = field(default=None, help_text="Logging directory.")
 
+    log_queued: bool = field(
+        default=True,
+        arg=None,
+        help_text="Write log files from a background thread instead of the thread that logs.",
+    )
+
+    log_flush_interval_s: float = field(
+        default=1.0,
+        arg=None,
+        help_text="How often queued log output is flushed to disk; errors are flushed immediately.",
+        validators=_validate_positive,
+    )
+
 
 class TrayConfig(ConfigBase):
     autostart: bool = field(default=False, help_text="Whether the tray app should autostart with Windows.")
@@ -115,36 +281,73 @@ def load_config() -> Tuple[argparse.Namespace, Config]:
     # 3. local file ./w3cwatcher.config.toml
     # 4. user file %localappdata%/W3CWatcher/config.toml
 
-    config = Config()
     default_config_file = get_config_file(
         user_config=True, filename="config.default.toml", app_name=APP_NAME
     )
     if not default_config_file.exists():
-        config.save(default_config_file, include_defaults=True, comment='help_text')
+        Config().save(default_config_file, include_defaults=True, comment='help_text')
 
     parser = argparse.ArgumentParser()
     parser.add_argument("--config", type=str, help="Specify config file (defaults to user file).")
     parser.add_argument("--tray", action="store_true", help="Run as a system tray app")
     parser.add_argument("--check", action="store_true", help="Check currently captured rectangle")
+    parser.add_argument("--record", type=Path, metavar="FILE", help="Append every monitor tick to FILE")
+    parser.add_argument(
+        "--replay",
+        type=Path,
+        metavar="FILE",
+        help="Run a --record file through the detection logic, then exit",
+    )
+    parser.add_argument(
+        "--tail",
+        nargs="?",
+        type=int,
+        const=40,
+        metavar="LINES",
+        help="Print the last lines of the log (default 40) and follow it",
+    )
+    parser.add_argument(
+        "--tail-level",
+        type=str.upper,
+        choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+        help="Only show --tail records at or above this level",
+    )
     Config.fill_arg_parse(parser)
     args = parser.parse_args()
 
-    arg_config_file = getattr(args, "config", None)
+    config_files = get_config_files(args)
+    for file in config_files:
+        if file.exists():
+            print("Loading ", file)
+
+    cache_file = Path(user_cache_dir(APP_NAME, appauthor=False)) / "config_layers.json"
+    cache = LayerCache(cache_file, secrets=Config.secret_paths())
+    config = build_config(args, config_files, cache)
+    cache.save()
+
+    return args, config
+
+
+def get_config_files(args: argparse.Namespace) -> List[Path]:
+    """
+    Config layers in increasing priority.
+    """
     config_files = [
         get_config_file(user_config=True, app_name=APP_NAME),
         get_config_file(user_config=False, app_name=APP_NAME),
     ]
 
+    arg_config_file = getattr(args, "config", None)
     if arg_config_file:
-        config_files.append(arg_config_file)
+        config_files.append(Path(arg_config_file))
+    return config_files
 
-    for file in config_files:
-        if file.exists():
-            print("Loading ", file)
-            args_cfg = Config.from_file(file)
-            config.update_from(args_cfg)
-
-    args_cfg = Config.from_args(args)
-    config.update_from(args_cfg)
 
-    return args, config
+def build_config(args: argparse.Namespace, config_files: List[Path], cache: LayerCache = None) -> Config:
+    """
+    Defaults, overridden by the config files, overridden by the shell arguments.
+    """
+    config = Config()
+    config.update_from(Config.from_files(config_files, cache=cache))
+    config.update_from(Config.from_args(args))
+    return config
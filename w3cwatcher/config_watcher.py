@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .config import Config
+from .logging import Logger
+from .utils.config_base import ConfigBase, LayerCache
+
+SectionListener = Callable[[ConfigBase], None]
+
+
+class ConfigWatcher:
+    """
+    Polls the config layer files and applies edits to the running config without a restart.
+
+    The reloaded config is diffed against the running one and only changed sections are swapped in, inside
+    a `batch()` so an invalid edit is rejected as a whole. Listeners registered for a section path
+    ("monitor", "notifications.discord", ...) then receive the new section object.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        config: Config,
+        files: Sequence[Path],
+        load: Callable[[LayerCache], Config],
+        interval_s: float = 2.0,
+    ):
+        self.logger = logger
+        self.config = config
+        self.files = [Path(f) for f in files]
+        self.interval_s = interval_s
+        self._load = load
+        self._cache = LayerCache()
+        self._listeners: Dict[str, List[SectionListener]] = {}
+        self._signatures = self._current_signatures()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.reloads = 0
+
+    def on_change(self, section: str, listener: SectionListener) -> None:
+        self._listeners.setdefault(section, []).append(listener)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def check(self) -> bool:
+        """
+        Poll once; returns True if a change was applied.
+        """
+        signatures = self._current_signatures()
+        if signatures == self._signatures:
+            return False
+        self._signatures = signatures
+
+        try:
+            new = self._load(self._cache)
+        except Exception as ex:
+            self.logger.warning(f"Config reload failed, keeping the running config: {ex}")
+            return False
+
+        changes = self.config.diff(new)
+        if not changes:
+            return False
+
+        try:
+            with self.config.batch():
+                # parents first, so a child path resolves inside the section that was just swapped in
+                for path in sorted(changes, key=lambda p: p.count(".") if p else -1):
+                    self._replace(path, new, changes[path])
+        except ValueError as ex:
+            self.logger.warning(f"Config reload rejected, keeping the running config: {ex}")
+            return False
+
+        self.reloads += 1
+        for path, names in changes.items():
+            self.logger.info(f"Config reloaded, [{path or 'root'}] changed: {', '.join(sorted(names))}")
+            section = self.config.section(path)
+            for listener in self._listeners.get(path, []):
+                # noinspection PyBroadException
+                try:
+                    listener(section)
+                except Exception as ex:
+                    self.logger.error(f"Applying reloaded [{path}] config failed: {ex}")
+        return True
+
+    def _replace(self, path: str, new: Config, names) -> None:
+        if not path:
+            for name in names:
+                setattr(self.config, name, getattr(new, name))
+            return
+        parent, _, name = path.rpartition(".")
+        setattr(self.config.section(parent), name, new.section(path))
+
+    def _current_signatures(self) -> Tuple[Optional[Tuple[int, int]], ...]:
+        return tuple(LayerCache.signature(f) for f in self.files)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            # noinspection PyBroadException
+            try:
+                self.check()
+            except Exception as ex:
+                self.logger.error(f"Config watcher failed: {ex}")
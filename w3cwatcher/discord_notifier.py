@@ -1,58 +1,99 @@
-import json
 import re
-import time
+import threading
 from datetime import datetime
-from typing import Optional, Dict, Any, Callable
-
-import requests
+from typing import Optional, Dict, Any, Callable, Tuple
 
+from .clock import SYSTEM_CLOCK, Clock
 from .config import DiscordConfig
-from .logging import Logger
-from .state_manager import STATE_IN_GAME
+from .dispatch import WebhookDispatcher
+from .logging import Logger, RedactionRegistry
+from .state_manager import STATE_IN_GAME, STATE_IN_QUEUE
 
 
 class DiscordNotifier:
-    def __init__(self, config: DiscordConfig, logger: Logger):
+    def __init__(self, config: DiscordConfig, logger: Logger, clock: Clock = SYSTEM_CLOCK):
         self.config = config
         self.logger = logger
-        self._discord_webhook_last_sent = 0.0
-
+        self.clock = clock
+        self._discord_webhook_last_sent: Optional[float] = None
+        self._discord_webhook_pending = False
+        self._keep_warm = False
+        self._lock = threading.Lock()
 
+        # before the dispatcher, an invalid config should not leave a session and pool behind
         self.config.validate_all()
+        self.dispatcher = WebhookDispatcher(config.webhook_url, logger, max_retries=config.max_retries)
+        self._add_redactor(config.webhook_url)
+
+    def _add_redactor(self, webhook_url: str) -> None:
         # noinspection PyBroadException
         try:
-            logger.add_redactor(self.create_discord_webhook_redactor(config.webhook_url))
+            self.logger.add_secrets(*self.discord_webhook_secrets(webhook_url))
         except Exception:
-            logger.warning("Failed to add discord url redactor.")
+            self.logger.warning("Failed to add discord url redactor.")
 
     def _send_discord_webhook(self, content: str, embed_fields: Optional[Dict[str, Any]] = None) -> None:
-        now = time.monotonic()
-        elapsed = now - self._discord_webhook_last_sent
-
-        if elapsed < self.config.debounce:
-            remaining = self.config.debounce - elapsed
-            self.logger.info(f"Not sending Discord message (debounced, {remaining:.1f}s remaining)")
-            return
-
-        payload: dict[str, Any] = {"content": content}
-        if embed_fields:
-            payload["embeds"] = [embed_fields]
-
-        headers = {"Content-Type": "application/json"}
-        try:
-            resp = requests.post(
-                self.config.webhook_url,
-                data=json.dumps(payload),
-                headers=headers,
-                timeout=5,
+        with self._lock:
+            if self._discord_webhook_pending:
+                self.logger.info("Not sending Discord message (previous message still being delivered)")
+                return
+
+            last_sent = self._discord_webhook_last_sent
+            elapsed = self.clock.monotonic() - last_sent if last_sent is not None else None
+            if elapsed is not None and elapsed < self.config.debounce:
+                remaining = self.config.debounce - elapsed
+                self.logger.info(f"Not sending Discord message (debounced, {remaining:.1f}s remaining)")
+                return
+
+            payload: dict[str, Any] = {"content": content}
+            if embed_fields:
+                payload["embeds"] = [embed_fields]
+
+            self._discord_webhook_pending = self.dispatcher.submit(
+                payload, on_delivered=self._on_webhook_delivered, on_failed=self._on_webhook_failed
             )
-            resp.raise_for_status()
-        except Exception as e:
-            self.logger.error(f"[!] Webhook error: {e}")
 
-        self._discord_webhook_last_sent = now
+    def _on_webhook_delivered(self) -> None:
+        # debounce only advances once a message actually went through
+        with self._lock:
+            self._discord_webhook_last_sent = self.clock.monotonic()
+            self._discord_webhook_pending = False
+
+    def _on_webhook_failed(self) -> None:
+        with self._lock:
+            self._discord_webhook_pending = False
+
+    def close(self, timeout: float = 5.0) -> None:
+        self.dispatcher.close(timeout)
+
+    def apply_config(self, config: DiscordConfig) -> None:
+        """
+        Use a new config from now on; a changed webhook gets a fresh dispatcher, while messages already
+        queued on the old one are still delivered before it shuts down.
+        """
+        config.validate_all()
+        old_dispatcher = None
+        with self._lock:
+            old_config, self.config = self.config, config
+            if (
+                config.webhook_url != old_config.webhook_url
+                or config.max_retries != old_config.max_retries
+            ):
+                old_dispatcher = self.dispatcher
+                self.dispatcher = WebhookDispatcher(
+                    config.webhook_url, self.logger, max_retries=config.max_retries
+                )
+                self.dispatcher.keep_warm(self._keep_warm)
+                if config.webhook_url != old_config.webhook_url:
+                    self._add_redactor(config.webhook_url)
+
+        if old_dispatcher is not None:
+            old_dispatcher.close()
 
     def on_monitor_state_change(self, state, after):
+        # keep the webhook connection hot while queued so the match notification goes out immediately
+        self._keep_warm = state == STATE_IN_QUEUE
+        self.dispatcher.keep_warm(self._keep_warm)
         if state == STATE_IN_GAME:
             self.notify_match_started(queue_duration=after)
             pass
@@ -78,7 +119,10 @@ class DiscordNotifier:
         self._send_discord_webhook("", embed)
 
     @staticmethod
-    def create_discord_webhook_redactor(url: str, *, mask: str = "****") -> Callable[[str], str]:
+    def discord_webhook_secrets(url: str) -> Tuple[str, str]:
+        """
+        The (webhook_id, webhook_token) parts of a webhook url that must not show up in logs.
+        """
         m = re.match(
             r"^https://discord\.com/api/webhooks/(?P<webhook_id>\d+)/(?P<webhook_token>[A-Za-z0-9._-]+)$",
                  url)
@@ -86,12 +130,10 @@ class DiscordNotifier:
             expected_format = "https://discord.com/api/webhooks/{webhook_id}/{webhook_token}"
             raise ValueError(f"Expected format: {expected_format}")
 
-        webhook_id = m.group("webhook_id")
-        webhook_token = m.group("webhook_token")
-
-        def redact(text: str) -> str:
-            if not text:
-                return text
-            return text.replace(webhook_token, mask).replace(webhook_id, mask)
+        return m.group("webhook_id"), m.group("webhook_token")
 
-        return redact
+    @staticmethod
+    def create_discord_webhook_redactor(url: str, *, mask: str = "****") -> Callable[[str], str]:
+        redactions = RedactionRegistry(mask)
+        redactions.add(*DiscordNotifier.discord_webhook_secrets(url))
+        return redactions.redact
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import json
+import queue
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .logging import Logger
+
+
+@dataclass
+class WebhookMessage:
+    payload: Dict[str, Any]
+    on_delivered: Optional[Callable[[], None]] = None
+    on_failed: Optional[Callable[[], None]] = None
+
+
+# queue marker asking the worker to open (or refresh) the pooled connection
+_WARM = object()
+
+
+class WebhookDispatcher:
+    """
+    Delivers JSON webhook messages from a bounded queue on a background worker thread.
+
+    Requests go through one pooled keep-alive session. `warm()` opens the connection ahead of time and
+    `keep_warm(True)` refreshes it periodically, so a message sent later skips DNS, TCP and TLS setup.
+
+    Failed deliveries are retried with jittered exponential backoff. Discord rate limits are honored:
+    a 429 waits for `retry_after` (body) or `Retry-After` (header), and an exhausted
+    `X-RateLimit-Remaining` bucket holds further sends until `X-RateLimit-Reset-After` has passed.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        logger: Logger,
+        max_queue: int = 16,
+        max_retries: int = 3,
+        backoff_s: float = 1.0,
+        max_backoff_s: float = 30.0,
+        timeout_s: float = 5.0,
+        keep_warm_interval_s: float = 45.0,
+        verify: Union[bool, str] = True,
+    ):
+        self.url = url
+        # warm-ups go to the host root, the webhook itself only ever gets the messages
+        parts = urlsplit(url)
+        self._warm_url = f"{parts.scheme}://{parts.netloc}/"
+        self.logger = logger
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.timeout_s = timeout_s
+        self.keep_warm_interval_s = keep_warm_interval_s
+
+        # passed per request: REQUESTS_CA_BUNDLE in the environment would override Session.verify
+        self.verify = verify
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._keep_warm = False
+        self.warmed = threading.Event()
+
+        self._queue: queue.Queue[Union[WebhookMessage, object, None]] = queue.Queue(maxsize=max_queue)
+        self._closed = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._blocked_until = 0.0
+
+    def submit(
+        self,
+        payload: Dict[str, Any],
+        on_delivered: Callable[[], None] = None,
+        on_failed: Callable[[], None] = None,
+    ) -> bool:
+        """
+        Queue a message without blocking; returns False if the queue is full or the dispatcher is closed.
+        """
+        if self._closed.is_set():
+            return False
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(WebhookMessage(payload, on_delivered, on_failed))
+        except queue.Full:
+            self.logger.warning("Webhook queue is full, dropping message.")
+            return False
+        return True
+
+    def warm(self) -> None:
+        """
+        Ask the worker to open the pooled connection now; does not block.
+        """
+        if self._closed.is_set():
+            return
+        self.warmed.clear()
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(_WARM)
+        except queue.Full:
+            pass  # busy sending, the connection is warm anyway
+
+    def keep_warm(self, enabled: bool) -> None:
+        """
+        While enabled the connection is opened right away and refreshed every `keep_warm_interval_s`.
+        """
+        was_enabled, self._keep_warm = self._keep_warm, enabled
+        if enabled and not was_enabled:
+            self.warm()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        Stop accepting messages, let the worker finish what is queued within `timeout` and stop it.
+        """
+        with self._worker_lock:
+            worker = self._worker
+        if worker is None:
+            self._closed.set()
+            return
+
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        worker.join(timeout)
+        self._closed.set()  # abort pending retries if the worker is still busy
+        self._session.close()
+
+    def _ensure_worker(self) -> None:
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="webhook-dispatcher", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                message = self._queue.get(timeout=self.keep_warm_interval_s if self._keep_warm else None)
+            except queue.Empty:
+                message = _WARM
+            if message is None:
+                return
+            if message is _WARM:
+                self._warm_connection()
+                continue
+            delivered = False
+            # noinspection PyBroadException
+            try:
+                delivered = self._deliver(message.payload)
+            except Exception as ex:
+                self.logger.error(f"[!] Webhook error: {ex}")
+
+            callback = message.on_delivered if delivered else message.on_failed
+            if callback is not None:
+                # noinspection PyBroadException
+                try:
+                    callback()
+                except Exception as ex:
+                    self.logger.error(f"Webhook callback failed: {ex}")
+
+    def _deliver(self, payload: Dict[str, Any]) -> bool:
+        data = json.dumps(payload)
+        headers = {"Content-Type": "application/json"}
+
+        for attempt in range(self.max_retries + 1):
+            if not self._sleep(self._blocked_until - time.monotonic()):
+                return False
+
+            delay = self._backoff(attempt)
+            try:
+                resp = self._post(data, headers)
+            except requests.RequestException as ex:
+                self.logger.warning(f"[!] Webhook error (attempt {attempt + 1}): {ex}")
+            else:
+                self._update_rate_limit(resp)
+                if resp.status_code == 429:
+                    delay = self._retry_after(resp)
+                    self.logger.warning(f"Webhook rate limited, retrying in {delay:.1f}s")
+                elif resp.ok:
+                    return True
+                elif resp.status_code < 500:
+                    self.logger.error(f"[!] Webhook rejected: HTTP {resp.status_code} {resp.text[:200]}")
+                    return False
+                else:
+                    self.logger.warning(f"[!] Webhook error (attempt {attempt + 1}): HTTP {resp.status_code}")
+
+            if attempt < self.max_retries and not self._sleep(delay):
+                return False
+
+        self.logger.error(f"[!] Webhook delivery failed after {self.max_retries + 1} attempts.")
+        return False
+
+    def _post(self, data: str, headers: Dict[str, str]) -> requests.Response:
+        resp = self._session.post(
+            self.url, data=data, headers=headers, timeout=self.timeout_s, verify=self.verify
+        )
+        self.warmed.set()
+        return resp
+
+    def _warm_connection(self) -> None:
+        if time.monotonic() < self._blocked_until:
+            # the rate limit bucket is empty; the response that emptied it left a connection in the pool
+            self.warmed.set()
+            return
+        # any response leaves a reusable connection in the pool; reading the (empty) body releases it
+        try:
+            resp = self._session.head(self._warm_url, timeout=self.timeout_s, verify=self.verify)
+            _ = resp.content
+            self.logger.debug(f"Webhook connection warmed (HTTP {resp.status_code})")
+        except requests.RequestException as ex:
+            self.logger.debug(f"Webhook connection warm-up failed: {ex}")
+        finally:
+            self.warmed.set()
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_s * (2**attempt), self.max_backoff_s)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _update_rate_limit(self, resp: requests.Response) -> None:
+        if resp.headers.get("X-RateLimit-Remaining") != "0":
+            return
+        reset_after = _parse_float(resp.headers.get("X-RateLimit-Reset-After"))
+        if reset_after:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + reset_after)
+
+    @staticmethod
+    def _retry_after(resp: requests.Response) -> float:
+        retry_after = None
+        # noinspection PyBroadException
+        try:
+            retry_after = _parse_float(resp.json().get("retry_after"))
+        except Exception:
+            pass
+        if retry_after is None:
+            retry_after = _parse_float(resp.headers.get("Retry-After"))
+        return retry_after if retry_after is not None else 1.0
+
+    def _sleep(self, seconds: float) -> bool:
+        """
+        Interruptible sleep; returns False if the dispatcher was closed meanwhile.
+        """
+        if seconds > 0:
+            return not self._closed.wait(seconds)
+        return not self._closed.is_set()
+
+
+def _parse_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Literal, Optional, Type
+
+from .logging import Logger
+
+OVERFLOW_DROP_OLDEST = "drop-oldest"
+OVERFLOW_DROP_NEWEST = "drop-newest"
+OVERFLOW_BLOCK = "block"
+
+OverflowPolicy = Literal["drop-oldest", "drop-newest", "block"]
+
+
+@dataclass(frozen=True)
+class Event:
+    timestamp: datetime = field(default_factory=datetime.now, kw_only=True)
+
+
+@dataclass(frozen=True)
+class StateChangeEvent(Event):
+    state: str
+    previous: str
+    after: timedelta
+
+
+EventHandler = Callable[[Event], None]
+
+
+@dataclass
+class SubscriberStats:
+    # handled without raising; a handler that raised counts as an error instead
+    delivered: int = 0
+    dropped: int = 0
+    errors: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+
+    @property
+    def mean_s(self) -> float:
+        handled = self.delivered + self.errors
+        return self.total_s / handled if handled else 0.0
+
+
+class Subscription:
+    """
+    A handler registered on an EventBus. Synchronous subscriptions run on the publishing thread,
+    asynchronous ones get a bounded queue drained by their own worker thread.
+    """
+
+    def __init__(
+        self,
+        bus: EventBus,
+        handler: EventHandler,
+        event_type: Type[Event],
+        name: str,
+        asynchronous: bool,
+        max_queue: int,
+        overflow: OverflowPolicy,
+    ):
+        if overflow not in (OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST, OVERFLOW_BLOCK):
+            raise ValueError(f"Unknown overflow policy '{overflow}'")
+        self.bus = bus
+        self.handler = handler
+        self.event_type = event_type
+        self.name = name
+        self.asynchronous = asynchronous
+        self.overflow = overflow
+        self.stats = SubscriberStats()
+        # publishers, the worker and stats() readers all touch the stats
+        self._stats_lock = threading.Lock()
+        self.closed = False
+
+        self._queue: Optional[queue.Queue[Optional[Event]]] = None
+        self._worker: Optional[threading.Thread] = None
+        if asynchronous:
+            self._queue = queue.Queue(maxsize=max_queue)
+            self._worker = threading.Thread(target=self._run, name=f"event-{name}", daemon=True)
+            self._worker.start()
+
+    def offer(self, event: Event) -> None:
+        if self.closed or not isinstance(event, self.event_type):
+            return
+        if not self.asynchronous:
+            self._handle(event)
+            return
+
+        if self.overflow == OVERFLOW_BLOCK:
+            self._queue.put(event)
+            return
+        try:
+            self._queue.put_nowait(event)
+            return
+        except queue.Full:
+            pass
+
+        with self._stats_lock:
+            self.stats.dropped += 1
+        if self.overflow == OVERFLOW_DROP_OLDEST:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                pass
+        self.bus.logger.warning(f"Event queue of '{self.name}' is full ({self.overflow}).")
+
+    def snapshot(self) -> SubscriberStats:
+        with self._stats_lock:
+            return replace(self.stats)
+
+    def close(self, timeout: float = 1.0) -> None:
+        self.closed = True
+        if self._worker is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._worker.join(timeout)
+
+    def _run(self) -> None:
+        while (event := self._queue.get()) is not None:
+            self._handle(event)
+
+    def _handle(self, event: Event) -> None:
+        start = time.perf_counter()
+        failed = False
+        # noinspection PyBroadException
+        try:
+            self.handler(event)
+        except Exception as ex:
+            failed = True
+            self.bus.logger.error(f"Event subscriber '{self.name}' failed: {ex}")
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            if failed:
+                self.stats.errors += 1
+            else:
+                self.stats.delivered += 1
+            self.stats.total_s += elapsed
+            self.stats.max_s = max(self.stats.max_s, elapsed)
+
+
+class EventBus:
+    """
+    Thread-safe publish/subscribe bus. A failing or slow subscriber cannot break or stall the publisher
+    unless it was subscribed synchronously (or with the "block" overflow policy).
+    """
+
+    def __init__(self, logger: Logger):
+        self.logger = logger
+        self._subscriptions: List[Subscription] = []
+        self._lock = threading.Lock()
+
+    def subscribe(
+        self,
+        handler: EventHandler,
+        event_type: Type[Event] = Event,
+        asynchronous: bool = False,
+        max_queue: int = 32,
+        overflow: OverflowPolicy = OVERFLOW_DROP_OLDEST,
+        name: str = None,
+    ) -> Subscription:
+        name = name or getattr(handler, "__qualname__", repr(handler))
+        subscription = Subscription(self, handler, event_type, name, asynchronous, max_queue, overflow)
+        with self._lock:
+            self._subscriptions = self._subscriptions + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions = [s for s in self._subscriptions if s is not subscription]
+        subscription.close()
+
+    def publish(self, event: Event) -> None:
+        # subscriber list is copy-on-write, so iterating it needs no lock
+        for subscription in self._subscriptions:
+            subscription.offer(event)
+
+    def stats(self) -> Dict[str, SubscriberStats]:
+        """
+        A consistent copy of every subscription's stats.
+        """
+        return {s.name: s.snapshot() for s in self._subscriptions}
+
+    def close(self, timeout: float = 1.0) -> None:
+        """
+        Stop all subscriptions, giving asynchronous ones `timeout` to drain; stats stay available.
+        """
+        for subscription in self._subscriptions:
+            subscription.close(timeout)
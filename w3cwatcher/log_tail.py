@@ -0,0 +1,220 @@
+"""
+`tail -f` for the app's own logs: the last lines are read by seeking back from the end of the file, so the
+cost depends on how many lines are wanted, not on the size of the log. New lines are then picked up by
+polling the file size. latest.log starts over with every run and every rotated segment, which shows as a
+different file, a shorter one, or one whose first bytes changed (it may have grown past the old offset by
+the next poll).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+# "2025-01-01 12:00:00.000 [INFO]: ..." as written by w3cwatcher.logging; lines without this header
+# (tracebacks, multi-line messages) belong to the record above them
+_HEADER = re.compile(r"^\d{4}-\d\d-\d\d \d\d:\d\d:\d\d\.\d{3} \[([A-Z]+)]: ")
+
+
+def parse_level(level: str | int) -> int:
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).upper())
+    if not isinstance(value, int):
+        raise ValueError(f"Unknown log level {level!r}")
+    return value
+
+
+def line_level(line: str) -> Optional[int]:
+    """
+    Level of a record's first line, None for a continuation line.
+    """
+    match = _HEADER.match(line)
+    if match is None:
+        return None
+    value = logging.getLevelName(match.group(1))
+    return value if isinstance(value, int) else logging.NOTSET
+
+
+class LogTail:
+    """
+    Reads the last lines of a log file and follows appends, keeping only records at or above `min_level`.
+    """
+
+    # compared on every poll; the first line's millisecond timestamp tells two runs of latest.log apart
+    HEAD_SIZE = 64
+
+    def __init__(
+        self,
+        path: Path | str,
+        min_level: str | int = logging.NOTSET,
+        poll_s: float = 0.25,
+        block_size: int = 64 * 1024,
+    ):
+        self.path = Path(path)
+        self.min_level = parse_level(min_level)
+        self.poll_s = poll_s
+        self.block_size = block_size
+        self._offset = 0
+        self._identity: Optional[Tuple[int, int]] = None
+        self._head = b""
+        self._partial = b""
+        self._level = logging.NOTSET
+
+    def last(self, count: int) -> List[str]:
+        """
+        The last `count` matching lines; following continues right after them.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                lines, self._offset = self._read_backwards(f, stat.st_size, count)
+                f.seek(0)
+                self._head = f.read(min(self.HEAD_SIZE, stat.st_size))
+        except FileNotFoundError:
+            stat = None
+            lines, self._offset = [], 0
+            self._head = b""
+        self._identity = self._identity_of(stat)
+        self._partial = b""
+        return lines
+
+    def poll(self) -> List[str]:
+        """
+        Matching lines appended since the last call; an incomplete last line waits for its newline.
+        """
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return []
+
+        with f:
+            stat = os.fstat(f.fileno())
+            head = f.read(min(self.HEAD_SIZE, stat.st_size))
+            identity = self._identity_of(stat)
+            rewritten = stat.st_size < self._offset or not head.startswith(self._head)
+            if identity != self._identity or rewritten:
+                # replaced, truncated or rewritten from the start: read it from the top
+                self._identity = identity
+                self._offset = 0
+                self._partial = b""
+            self._head = head
+            if stat.st_size == self._offset:
+                return []
+            f.seek(self._offset)
+            data = f.read(stat.st_size - self._offset)
+        self._offset += len(data)
+
+        *complete, self._partial = (self._partial + data).split(b"\n")
+        lines = []
+        for raw in complete:
+            line = self._decode(raw)
+            level = line_level(line)
+            if level is not None:
+                self._level = level
+            if self._level >= self.min_level:
+                lines.append(line)
+        return lines
+
+    def follow(self, count: int = 40, stop: Optional[threading.Event] = None) -> Iterator[str]:
+        """
+        The last `count` matching lines, then new ones as they are written, until `stop` is set.
+        """
+        stop = stop or threading.Event()
+        yield from self.last(count)
+        while not stop.wait(self.poll_s):
+            yield from self.poll()
+
+    def _read_backwards(self, f, size: int, count: int) -> Tuple[List[str], int]:
+        found: List[str] = []  # newest first
+        continuation: List[str] = []  # lines seen since the last header, newest first
+        self._level = None
+        end = None
+        pos = size
+        buffer = b""
+        while pos > 0 and (end is None or len(found) < count):
+            read = min(self.block_size, pos)
+            pos -= read
+            f.seek(pos)
+            buffer = f.read(read) + buffer
+            pieces = buffer.split(b"\n")
+            if end is None:
+                if len(pieces) == 1 and pos > 0:
+                    continue
+                # after the last newline: nothing, or a line still being written, which is left for poll()
+                end = size - len(pieces.pop())
+            # the first piece may start in the middle of a line, keep it for the next block
+            buffer = pieces.pop(0) if pos > 0 and pieces else b""
+            for raw in reversed(pieces):
+                if len(found) >= count:
+                    break
+                self._take(self._decode(raw), found, continuation)
+        if pos == 0 and self.min_level <= logging.NOTSET:
+            # lines before the first header have no level of their own
+            found.extend(continuation)
+
+        if self._level is None:
+            self._level = logging.NOTSET
+        return found[:count][::-1] if count > 0 else [], end or 0
+
+    def _take(self, line: str, found: List[str], continuation: List[str]) -> None:
+        level = line_level(line)
+        if level is None:
+            continuation.append(line)
+            return
+        if self._level is None:
+            # the newest record, continuation lines appended later belong to it
+            self._level = level
+        if level >= self.min_level:
+            found.extend(continuation)
+            found.append(line)
+        continuation.clear()
+
+    @staticmethod
+    def _decode(raw: bytes) -> str:
+        return raw.decode("utf-8", errors="replace").rstrip("\r")
+
+    @staticmethod
+    def _identity_of(stat: Optional[os.stat_result]) -> Optional[Tuple[int, int]]:
+        return None if stat is None else (stat.st_dev, stat.st_ino)
+
+
+def show_log_window(path: Path | str, title: str = "Log", lines: int = 200, max_lines: int = 5000) -> None:
+    """
+    A window following the log, fed by a LogTail. Blocks until the window is closed, so run it on its own
+    thread; all Tk calls stay on that thread.
+    """
+    # tkinter is only needed once somebody opens the window
+    import tkinter as tk
+    from tkinter.scrolledtext import ScrolledText
+
+    log_tail = LogTail(path)
+    root = tk.Tk()
+    root.title(title)
+    text = ScrolledText(root, wrap="none", width=140, height=40, font=("Consolas", 9), state="disabled")
+    text.pack(fill="both", expand=True)
+
+    def append(new_lines: List[str]) -> None:
+        if not new_lines:
+            return
+        follow_end = text.yview()[1] >= 1.0
+        text.configure(state="normal")
+        text.insert("end", "\n".join(new_lines) + "\n")
+        excess = int(text.index("end-1c").split(".")[0]) - 1 - max_lines
+        if excess > 0:
+            text.delete("1.0", f"{excess + 1}.0")
+        text.configure(state="disabled")
+        if follow_end:
+            text.see("end")
+
+    def poll() -> None:
+        append(log_tail.poll())
+        root.after(int(log_tail.poll_s * 1000), poll)
+
+    append(log_tail.last(lines))
+    root.after(int(log_tail.poll_s * 1000), poll)
+    root.mainloop()
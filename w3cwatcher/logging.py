@@ -1,33 +1,476 @@
 from __future__ import annotations
 
 import logging
-
 import os
+import queue
+import re
+import shutil
+import sys
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Callable, Optional, Dict
+from typing import Callable, Optional, Dict, Iterable, List, Set, TextIO, Tuple
 
 from platformdirs import user_log_dir
 
 from w3cwatcher.config import APP_NAME, LoggingConfig
 
 
+class RedactionRegistry:
+    """
+    Secrets to mask in log output, compiled into a single regex so each line is scanned once no matter
+    how many secrets are registered. Secrets sharing a prefix share a branch of the pattern (a trie), so
+    adding more does not multiply the work per character.
+    """
+
+    def __init__(self, mask: str = "****"):
+        self.mask = mask
+        self._secrets: Set[str] = set()
+        self._pattern: Optional[re.Pattern] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._secrets)
+
+    def add(self, *secrets: str) -> None:
+        with self._lock:
+            self._secrets.update(s for s in secrets if s)
+            self._pattern = self._compile(self._secrets)
+
+    def remove(self, *secrets: str) -> None:
+        with self._lock:
+            self._secrets.difference_update(secrets)
+            self._pattern = self._compile(self._secrets)
+
+    def redact(self, text: str) -> str:
+        pattern = self._pattern
+        if pattern is None or not text:
+            return text
+        return pattern.sub(self.mask, text)
+
+    @staticmethod
+    def _compile(secrets: Iterable[str]) -> Optional[re.Pattern]:
+        trie: Dict[str, dict] = {}
+        for secret in secrets:
+            node = trie
+            for ch in secret:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+
+        def render(node: Dict[str, dict]) -> str:
+            branches = [re.escape(ch) + render(child) for ch, child in sorted(node.items()) if ch]
+            if not branches:
+                return ""
+            if len(branches) == 1 and "" not in node:
+                return branches[0]
+            group = f"(?:{'|'.join(branches)})"
+            # a secret ending here may also be the prefix of a longer one; greedy `?` prefers the longer
+            return group + "?" if "" in node else group
+
+        return re.compile(render(trie)) if trie else None
+
+
 class RedactingFormatter(logging.Formatter):
-    def __init__(self, base_formatter: logging.Formatter, redactor: Callable[[str], str]):
+    """
+    Formats with the base formatter, then masks every registered secret in one regex pass (plus any
+    extra redactor callables). The result is cached on the record, so all handlers sharing this formatter
+    format and redact a record only once.
+    """
+
+    def __init__(self, base_formatter: logging.Formatter, redactions: Optional[RedactionRegistry] = None):
         super().__init__(fmt=base_formatter._fmt, datefmt=base_formatter.datefmt)
         self._base = base_formatter
-        self._redact = redactor
+        self.redactions = redactions or RedactionRegistry()
+        self.redactors: List[Callable[[str], str]] = []
 
     def format(self, record: logging.LogRecord) -> str:
+        cached = record.__dict__.get("_w3cwatcher_rendered")
+        if cached is not None and cached[0] is self:
+            return cached[1]
+
+        # noinspection PyBroadException
+        try:
+            rendered = self.redactions.redact(self._base.format(record))
+            for redactor in self.redactors:
+                rendered = redactor(rendered)
+        except Exception:
+            rendered = "[log redaction failed: sensitive data suppressed]"
+        record._w3cwatcher_rendered = (self, rendered)
+        return rendered
+
+
+class LogMaintenance:
+    """
+    Compresses rotated log segments and prunes old logs on a background thread, so nothing that logs ever
+    waits on the filesystem. Pruning keeps the newest `keep` logs (<= 0: no count limit), then drops the
+    oldest until all of them together fit into `max_total_bytes` (<= 0: no size limit). A run's rotated
+    segments count as one log for `keep`. Logs named in `active` are counted but never removed.
+    """
+
+    _PRUNE = "prune"
+    _SEGMENT = re.compile(r"\.\d{3,}\.log$")
+    # what follows the run name: an optional segment number, then .log or .log.gz
+    _RUN_SUFFIX = re.compile(r"(\.\d{3,})?\.log(\.gz)?$")
+
+    def __init__(
+        self,
+        log_dir: Path,
+        app_name: str = APP_NAME,
+        keep: int = 10,
+        max_total_bytes: int = 0,
+        compress: bool = True,
+        active: Iterable[Path] = (),
+    ):
+        self.log_dir = Path(log_dir)
+        self.app_name = app_name
+        self.keep = keep
+        self.max_total_bytes = max_total_bytes
+        self.compress = compress
+        self.active: Set[str] = {Path(p).name for p in active}
+        self.compressed = 0
+        self.pruned = 0
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="log-maintenance", daemon=True)
+        self._thread.start()
+
+    def segment_rotated(self, segment: Path) -> None:
+        self._queue.put(Path(segment))
+
+    def prune_later(self) -> None:
+        self._queue.put(self._PRUNE)
+
+    def flush(self, timeout: float = 30.0) -> None:
+        """
+        Block until all queued work is done.
+        """
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            # noinspection PyBroadException
+            try:
+                if isinstance(item, threading.Event):
+                    item.set()
+                    continue
+                if isinstance(item, Path) and self.compress:
+                    self._compress(item)
+                self._prune()
+            except Exception:
+                # Best-effort; a log that is locked or gone is retried on the next pass
+                pass
+
+    def _compress(self, path: Path) -> Path:
+        import gzip  # only needed once something rotates, keep it off the startup path
+
+        target = path.with_name(path.name + ".gz")
+        tmp = target.with_name(target.name + ".tmp")
+        stat = path.stat()
+        with open(path, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        # keep the segment's age, pruning goes by modification time
+        os.utime(tmp, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(tmp, target)
+        path.unlink()
+        self.compressed += 1
+        return target
+
+    def _prune(self) -> None:
+        prefix = f"{self.app_name}_"
+        logs = []
+        with os.scandir(self.log_dir) as it:
+            for entry in it:
+                name = entry.name
+                if not name.startswith(prefix) or not (name.endswith(".log") or name.endswith(".log.gz")):
+                    continue
+                path = Path(entry.path)
+                # noinspection PyBroadException
+                try:
+                    if self.compress and name not in self.active and self._SEGMENT.search(name):
+                        # left behind by a run that exited before compressing it
+                        path = self._compress(path)
+                    stat = path.stat()
+                except Exception:
+                    continue
+                logs.append((stat.st_mtime_ns, stat.st_size, path))
+
+        logs.sort(key=lambda log: log[0], reverse=True)
+        # runs newest first, by their newest segment
+        runs = list(dict.fromkeys(self._RUN_SUFFIX.sub("", path.name) for _, _, path in logs))
+        kept_runs = set(runs[: self.keep])
+        total = 0
+        for _, size, path in logs:
+            too_many = self.keep > 0 and self._RUN_SUFFIX.sub("", path.name) not in kept_runs
+            too_big = self.max_total_bytes > 0 and total + size > self.max_total_bytes
+            if path.name in self.active or not (too_many or too_big):
+                total += size
+                continue
+            # noinspection PyBroadException
+            try:
+                path.unlink(missing_ok=True)
+                self.pruned += 1
+            except Exception:
+                # Best-effort; ignore locked files
+                total += size
+
+
+class LogFiles:
+    """
+    The per-run log and latest.log, written with the same lines. The per-run log is rotated once it reaches
+    `max_bytes` or `rotate_interval_s` (0 disables either): it is renamed to a numbered segment, which
+    `maintenance` compresses and prunes in the background, and both files start over.
+    Not thread-safe; callers serialize writes (LogWriter's thread or the handler lock).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        latest_path: Path,
+        buffer_size: int = 64 * 1024,
+        max_bytes: int = 0,
+        rotate_interval_s: float = 0.0,
+        maintenance: Optional[LogMaintenance] = None,
+    ):
+        self.path = Path(path)
+        self.latest_path = Path(latest_path)
+        self.buffer_size = buffer_size
+        self.max_bytes = max_bytes
+        self.rotate_interval_s = rotate_interval_s
+        self.maintenance = maintenance
+        self.segments = 0
+        self._open()
+
+    def write(self, line: str) -> None:
+        self._run.write(line)
+        self._latest.write(line)
+        # characters, not bytes; close enough for a size limit
+        self._size += len(line)
+        if self._rotation_due():
+            self.rotate()
+
+    def flush(self) -> None:
+        self._run.flush()
+        self._latest.flush()
+
+    def rotate(self) -> Optional[Path]:
+        self._run.close()
+        self._latest.close()
+        segment = self._next_segment()
+        try:
+            os.replace(self.path, segment)
+        except OSError:
+            # e.g. held open by another process on Windows; keep appending and retry after another segment
+            segment = None
+        self._open()
+        if segment is None:
+            self._size = 0
+        elif self.maintenance is not None:
+            self.maintenance.segment_rotated(segment)
+        return segment
+
+    def close(self) -> None:
+        self._run.close()
+        self._latest.close()
+        if self.maintenance is not None:
+            self.maintenance.close()
+
+    def _open(self) -> None:
+        self._run = open(self.path, "a", encoding="utf-8", buffering=self.buffer_size)
+        self._latest = open(self.latest_path, "w", encoding="utf-8", buffering=self.buffer_size)
+        self._size = self._run.tell()
+        self._opened = time.time()
+
+    def _next_segment(self) -> Path:
+        while True:
+            self.segments += 1
+            segment = self.path.with_name(f"{self.path.stem}.{self.segments:03d}{self.path.suffix}")
+            if not segment.exists() and not segment.with_name(segment.name + ".gz").exists():
+                return segment
+
+    def _rotation_due(self) -> bool:
+        if 0 < self.max_bytes <= self._size:
+            return True
+        return 0 < self.rotate_interval_s <= time.time() - self._opened
+
+
+class LogWriter:
+    """
+    Background writer for queued logging. Each record is formatted (and redacted) once, then the same line
+    goes to the log files and, above its level, to the console. Files are written through large buffers
+    that are flushed every `flush_interval_s`, right away for ERROR and above, and on `flush()`/`close()`.
+    Rotation happens on this thread too.
+    """
+
+    def __init__(self, files: LogFiles, formatter: logging.Formatter, flush_interval_s: float = 1.0):
+        self.files = files
+        self.formatter = formatter
+        self.flush_interval_s = flush_interval_s
+        self.console: Optional[TextIO] = None
+        self.console_level = logging.INFO
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, record: logging.LogRecord) -> None:
+        self._queue.put(record)
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """
+        Block until everything enqueued so far is on disk.
+        """
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = threading.Event()
+
+            if item is None:
+                self._flush()
+                self.files.close()
+                return
+
+            if isinstance(item, threading.Event):
+                self._flush()
+                deadline = None
+                item.set()
+            elif self._write(item):
+                self._flush()
+                deadline = None
+            elif deadline is None:
+                deadline = time.monotonic() + self.flush_interval_s
+
+    def _write(self, record: logging.LogRecord) -> bool:
+        # noinspection PyBroadException
+        try:
+            line = self.formatter.format(record) + "\n"
+        except Exception:
+            line = f"[log formatting failed: {record.levelname} from {record.pathname}:{record.lineno}]\n"
         # noinspection PyBroadException
         try:
-            rendered = self._base.format(record)
-            return self._redact(rendered)
+            self.files.write(line)
         except Exception:
-            return "[log redaction failed: sensitive data suppressed]"
+            pass
+        if self.console is not None and record.levelno >= self.console_level:
+            # noinspection PyBroadException
+            try:
+                self.console.write(line)
+                self.console.flush()
+            except Exception:
+                pass
+        return record.levelno >= logging.ERROR
+
+    def _flush(self) -> None:
+        # noinspection PyBroadException
+        try:
+            self.files.flush()
+        except Exception:
+            pass
+
+
+class LogFilesHandler(logging.Handler):
+    """
+    Unqueued counterpart of QueueingHandler: writes, flushes and rotates LogFiles on the logging thread.
+    """
+
+    def __init__(self, files: LogFiles):
+        super().__init__(logging.DEBUG)
+        self.files = files
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # noinspection PyBroadException
+        try:
+            self.files.write(self.format(record) + "\n")
+            self.files.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        with self.lock:
+            self.files.flush()
+
+    def close(self) -> None:
+        with self.lock:
+            self.files.close()
+        super().close()
+
+
+class QueueingHandler(logging.Handler):
+    """
+    Hands records to a LogWriter; the only logging work left on the calling thread is a queue put.
+    %-style arguments are rendered later on the writer thread, so don't pass objects that are mutated
+    right after logging.
+    """
+
+    def __init__(self, writer: LogWriter):
+        super().__init__(logging.DEBUG)
+        self.writer = writer
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        # no handler lock needed, the queue is thread-safe
+        if self.filter(record):
+            self.writer.put(record)
+            return True
+        return False
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.writer.put(record)
+
+    def setFormatter(self, fmt: Optional[logging.Formatter]) -> None:
+        self.writer.formatter = fmt
+
+    @property
+    def formatter(self) -> logging.Formatter:
+        return self.writer.formatter
+
+    @formatter.setter
+    def formatter(self, fmt: logging.Formatter) -> None:
+        # logging.Handler.__init__ assigns None before the writer is attached
+        if fmt is not None:
+            self.writer.formatter = fmt
+
+    def flush(self) -> None:
+        self.writer.flush()
+
+    def close(self) -> None:
+        self.writer.close()
+        super().close()
 
 
 class Logger:
+    LATEST = "latest.log"
+
     _instances: Dict[str, Logger] = {}
 
     def __init__(
@@ -36,16 +479,28 @@ class Logger:
         log_level: str = "INFO",
         keep: int = 10,
         log_dir: Optional[Path] = None,
+        queued: bool = True,
+        flush_interval_s: float = 1.0,
+        max_bytes: int = 0,
+        rotate_interval_s: float = 0.0,
+        max_total_bytes: int = 0,
+        compress: bool = True,
     ):
         self.app_name = app_name
         self.keep = keep
-        self.log_dir = Path(log_dir) if log_dir else Path(user_log_dir(appname=app_name, appauthor=False))
+        self.queued = queued
+        self.flush_interval_s = flush_interval_s
+        self.max_bytes = max_bytes
+        self.rotate_interval_s = rotate_interval_s
+        self.max_total_bytes = max_total_bytes
+        self.compress = compress
+        self.log_dir = self.get_log_dir(log_dir, app_name)
         self.log_dir.mkdir(parents=True, exist_ok=True)
 
         ts = datetime.now().strftime("%Y%m%d-%H%M%S")
         pid = os.getpid()
         self.file_path = self.log_dir / f"{self.app_name}_{ts}_{pid}.log"
-        self.latest_path = self.log_dir / "latest.log"
+        self.latest_path = self.log_dir / self.LATEST
 
         self.logger = logging.getLogger(self.app_name)
         self.logger.setLevel(log_level or logging.INFO)
@@ -55,15 +510,22 @@ class Logger:
             fmt="%(asctime)s.%(msecs)03d [%(levelname)s]: %(message)s",
             datefmt="%Y-%m-%d %H:%M:%S",
         )
+        # one formatter (and secret registry) shared by all handlers of this app's logger
+        self._formatter: RedactingFormatter = getattr(self.logger, "_w3cwatcher_formatter", None)
+        if self._formatter is None:
+            self._formatter = RedactingFormatter(self._base_fmt)
+            self.logger._w3cwatcher_formatter = self._formatter
+        self.redactions = self._formatter.redactions
 
         # Idempotent: only add our file handlers once per process
-        if not any(
-            isinstance(h, logging.FileHandler) and getattr(h, "_w3cwatcher_file", False)
-            for h in self.logger.handlers
-        ):
+        if self._files() is None:
             self._add_file_handlers()
+        files = self._files()
+        self.file_path = files.path
+        self.maintenance = files.maintenance
 
-        self._prune_old_logs()
+        # pruning a big log directory is slow, leave it to the maintenance thread
+        self.maintenance.prune_later()
 
         self.logger.debug(f"Logging initialized -> {self.file_path}")
 
@@ -80,66 +542,142 @@ class Logger:
             app_name=app_name,
             log_level=getattr(config, "log_level", "INFO"),
             keep=getattr(config, "log_keep", 10),
+            log_dir=getattr(config, "log_dir", None),
+            queued=getattr(config, "log_queued", True),
+            flush_interval_s=getattr(config, "log_flush_interval_s", 1.0),
+            max_bytes=getattr(config, "log_max_bytes", 0),
+            rotate_interval_s=getattr(config, "log_rotate_interval_h", 0.0) * 3600,
+            max_total_bytes=getattr(config, "log_max_total_bytes", 0),
+            compress=getattr(config, "log_compress", True),
         )
         cls._instances[key] = inst
         inst.add_console(config.log_level)
         return inst
 
+    @staticmethod
+    def get_log_dir(log_dir: Optional[Path | str] = None, app_name: str = APP_NAME) -> Path:
+        return Path(log_dir) if log_dir else Path(user_log_dir(appname=app_name, appauthor=False))
+
+    @classmethod
+    def get_latest_path(cls, config: LoggingConfig, app_name: str = APP_NAME) -> Path:
+        """
+        latest.log of the current (or last) run, without starting a new one.
+        """
+        return cls.get_log_dir(getattr(config, "log_dir", None), app_name) / cls.LATEST
+
+    def apply_config(self, config: LoggingConfig) -> None:
+        """
+        Apply a reloaded logging config: level, rotation and pruning limits. Queueing and the log directory
+        only take effect on the next start.
+        """
+        self.set_level(config.log_level)
+        files = self._files()
+        files.max_bytes = config.log_max_bytes
+        files.rotate_interval_s = config.log_rotate_interval_h * 3600
+        maintenance = files.maintenance
+        maintenance.keep = config.log_keep
+        maintenance.max_total_bytes = config.log_max_total_bytes
+        maintenance.compress = config.log_compress
+        maintenance.prune_later()
+
     def set_level(self, level: str | int) -> None:
         lvl = getattr(logging, str(level).upper(), level)
         self.logger.setLevel(lvl)
         for h in self.logger.handlers:
-            h.setLevel(logging.DEBUG if isinstance(h, logging.FileHandler) else lvl)
+            h.setLevel(logging.DEBUG if getattr(h, "_w3cwatcher_file", False) else lvl)
+            if isinstance(h, QueueingHandler):
+                h.writer.console_level = lvl
+
+    def is_enabled_for(self, level: str | int) -> bool:
+        return self.logger.isEnabledFor(getattr(logging, str(level).upper(), level))
+
+    @property
+    def debug_enabled(self) -> bool:
+        """
+        Guard for debug messages that are expensive to build, e.g. on the monitor hot path.
+        """
+        return self.logger.isEnabledFor(logging.DEBUG)
+
+    def flush(self) -> None:
+        for h in self.logger.handlers:
+            h.flush()
 
     def add_console(self, level: str | int = "INFO") -> None:
+        lvl = getattr(logging, str(level).upper(), level)
+        writer = self._writer()
+        if writer is not None:
+            # the writer already formats every record once, print that same line
+            writer.console = sys.stderr
+            writer.console_level = lvl
+            return
+
         if not any(
             isinstance(h, logging.StreamHandler) and getattr(h, "_w3cwatcher_console", False)
             for h in self.logger.handlers
         ):
             ch = logging.StreamHandler()
-            ch.setFormatter(self._base_fmt)
-            ch.setLevel(getattr(logging, str(level).upper(), level))
+            ch.setFormatter(self._formatter)
+            ch.setLevel(lvl)
             ch._w3cwatcher_console = True
             self.logger.addHandler(ch)
 
+    def add_secrets(self, *secrets: str) -> None:
+        """
+        Mask these strings wherever they appear in log output.
+        """
+        self.redactions.add(*secrets)
+
     def add_redactor(self, redactor: Callable[[str], str]) -> None:
         """
-        Apply a redactor on top of each handler's formatter.
+        Apply an arbitrary redactor after the secrets are masked; prefer `add_secrets` for fixed strings.
         """
-        for handler in self.logger.handlers:
-            base = handler.formatter or self._base_fmt
-            handler.setFormatter(RedactingFormatter(base, redactor))
+        self._formatter.redactors.append(redactor)
 
     # ---------- internals ----------
 
-    def _add_file_handlers(self) -> None:
-        """
-        Two file handlers:
-          • append to the per-run file
-          • overwrite 'latest.log'
-        """
-        for path, mode in [(self.file_path, "a"), (self.latest_path, "w")]:
-            fh = logging.FileHandler(path, encoding="utf-8", mode=mode)
-            fh.setFormatter(self._base_fmt)
-            fh.setLevel(logging.DEBUG)  # capture everything to disk
-            fh._w3cwatcher_file = True  # marker to avoid duplicates
-            self.logger.addHandler(fh)
+    def _writer(self) -> Optional[LogWriter]:
+        for h in self.logger.handlers:
+            if isinstance(h, QueueingHandler):
+                return h.writer
+        return None
+
+    def _files(self) -> Optional[LogFiles]:
+        for h in self.logger.handlers:
+            if isinstance(h, QueueingHandler):
+                return h.writer.files
+            if isinstance(h, LogFilesHandler):
+                return h.files
+        return None
 
-    def _prune_old_logs(self) -> None:
+    def _add_file_handlers(self) -> None:
         """
-        Keep the newest `keep` matching '{APP_NAME}_*.log' in the same directory.
+        Two targets, written with the same line:
+          • append to the per-run file (rotated into compressed segments by size and age)
+          • overwrite 'latest.log' (starts over with each segment)
+        Queued, both are written by a background LogWriter.
         """
-        if self.keep <= 0:
-            return
-        pattern = f"{self.app_name}_*.log"
-        files = sorted(self.log_dir.glob(pattern), key=lambda p: p.stat().st_mtime, reverse=True)
-        for old in files[self.keep :]:
-            # noinspection PyBroadException
-            try:
-                old.unlink(missing_ok=True)
-            except Exception:
-                # Best-effort; ignore locked files
-                pass
+        maintenance = LogMaintenance(
+            self.log_dir,
+            self.app_name,
+            keep=self.keep,
+            max_total_bytes=self.max_total_bytes,
+            compress=self.compress,
+            active=[self.file_path],
+        )
+        files = LogFiles(
+            self.file_path,
+            self.latest_path,
+            max_bytes=self.max_bytes,
+            rotate_interval_s=self.rotate_interval_s,
+            maintenance=maintenance,
+        )
+        if self.queued:
+            handler = QueueingHandler(LogWriter(files, self._formatter, self.flush_interval_s))
+        else:
+            handler = LogFilesHandler(files)
+            handler.setFormatter(self._formatter)
+        handler._w3cwatcher_file = True  # marker to avoid duplicates
+        self.logger.addHandler(handler)
 
     # Delegate logging methods to the wrapped logger
     def debug(self, msg, *args, **kwargs):
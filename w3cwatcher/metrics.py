@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from .logging import Logger
+
+if TYPE_CHECKING:
+    import asyncio
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class RollingHistogram:
+    """
+    Keeps the last `size` samples in a ring buffer for percentiles, plus all-time count, sum and max.
+    Recording is O(1); percentiles sort a copy of the window and are meant for periodic reporting.
+    """
+
+    def __init__(self, size: int = 1024):
+        self._samples: List[float] = [0.0] * size
+        self._size = size
+        self._next = 0
+        self._filled = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        self._samples[self._next] = value
+        self._next = (self._next + 1) % self._size
+        if self._filled < self._size:
+            self._filled += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantiles(self, qs: Tuple[float, ...] = QUANTILES) -> Dict[float, float]:
+        window = sorted(self._samples[: self._filled])
+        if not window:
+            return {q: 0.0 for q in qs}
+        return {q: window[min(int(q * len(window)), len(window) - 1)] for q in qs}
+
+
+class StageMetrics:
+    """
+    Per-stage timing of monitor ticks.
+
+    Usage on the hot path is lap style, so each stage costs one perf_counter() call:
+        t = time.perf_counter()
+        ...
+        t = metrics.lap("capture", t)
+    """
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._stages: Dict[str, RollingHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = RollingHistogram(self.window)
+            histogram.record(seconds)
+
+    def lap(self, stage: str, start: float) -> float:
+        now = time.perf_counter()
+        self.record(stage, now - start)
+        return now
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            stages = list(self._stages.items())
+            return {
+                stage: {
+                    "count": h.count,
+                    "sum": h.total,
+                    "max": h.max,
+                    **{f"p{int(q * 100)}": v for q, v in h.quantiles().items()},
+                }
+                for stage, h in stages
+            }
+
+    def format_summary(self) -> str:
+        parts = []
+        for stage, s in self.summary().items():
+            parts.append(
+                f"{stage} p50={s['p50'] * 1000:.2f} p95={s['p95'] * 1000:.2f} "
+                f"p99={s['p99'] * 1000:.2f} max={s['max'] * 1000:.2f}"
+            )
+        return "Tick timings (ms): " + "; ".join(parts)
+
+    def prometheus_text(self, prefix: str = "w3cwatcher") -> str:
+        name = f"{prefix}_stage_seconds"
+        lines = [f"# HELP {name} Time spent per monitor tick stage.", f"# TYPE {name} summary"]
+        for stage, s in self.summary().items():
+            for q in QUANTILES:
+                lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} {s[f"p{int(q * 100)}"]:.9f}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {s["sum"]:.9f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {s["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+class AsyncMetricsServer:
+    """
+    Serves `StageMetrics` in Prometheus text format at http://127.0.0.1:<port>/metrics from the running
+    asyncio event loop.
+    """
+
+    READ_TIMEOUT_S = 5.0
+
+    def __init__(self, metrics: StageMetrics, port: int, logger: Logger, host: str = "127.0.0.1"):
+        self.metrics = metrics
+        self.logger = logger
+        self._server: Optional[asyncio.Server] = None
+        self._host = host
+        self._port = port
+
+    @property
+    def port(self) -> Optional[int]:
+        return self._server.sockets[0].getsockname()[1] if self._server else None
+
+    async def start(self) -> None:
+        import asyncio
+
+        if self._server is not None:
+            return
+        self._server = await asyncio.start_server(self._handle, self._host, self._port)
+        self.logger.info(f"Metrics available at http://{self._host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        import asyncio
+
+        try:
+            async with asyncio.timeout(self.READ_TIMEOUT_S):
+                request_line = await reader.readline()
+                # headers are not needed, but have to be read before answering
+                while (await reader.readline()).strip():
+                    pass
+            method, path, *_ = request_line.decode("latin-1").split() + ["", ""]
+            if method == "GET" and path.rstrip("/") == "/metrics":
+                status, content_type = "200 OK", "text/plain; version=0.0.4"
+                body = self.metrics.prometheus_text().encode("utf-8")
+            else:
+                status, content_type, body = "404 Not Found", "text/plain", b"Not Found\n"
+            head = (
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+            )
+            writer.write(head.encode("latin-1") + body)
+            await writer.drain()
+        except (TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
@@ -1,45 +1,242 @@
 from __future__ import annotations
+import threading
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
 
-import win32gui
-import win32con
+import numpy as np
+from platformdirs import user_cache_dir
 
 from . import utils
+from .capture import CaptureBackend, ImageGrabCaptureBackend, grab_points
+from .clock import Clock
 from .logging import Logger
-from .config import MonitorConfig
+from .config import APP_NAME, MonitorConfig
+from .metrics import StageMetrics
+from .monitor_plan import MonitorPlan
+from .recording import IN_GAME, IN_QUEUE, STATES, WINDOW_FOUND, TickRecorder
+from .scheduler import DeadlineScheduler
 from .state_manager import StateManager, STATE_WAITING, STATE_IN_QUEUE, STATE_IN_GAME, STATE_DISABLED
-from .utils import Point, show_error
+from .utils import Point
 from .utils.platform import set_dpi_awareness
 
 
+def classify_probes(
+    lut: utils.ColorLUT,
+    pixels: np.ndarray,
+    in_queue_color: str | int,
+    quorum: float,
+    counts: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Color indices of (..., probes, 3) RGB samples and whether each sample counts as in queue: at least
+    `quorum` of its probes show `in_queue_color` (a name or a color index). `counts` limits each sample to
+    its first N probes.
+    """
+    colors = lut.classify(pixels)
+    if isinstance(in_queue_color, str):
+        in_queue_color = utils.color_index(in_queue_color)
+    hits = colors == in_queue_color
+    if counts is None:
+        matches = np.count_nonzero(hits, axis=-1) if hits.ndim > 1 else np.count_nonzero(hits)
+        return colors, matches >= quorum * colors.shape[-1]
+    hits &= np.arange(colors.shape[-1]) < np.asarray(counts)[..., None]
+    return colors, np.count_nonzero(hits, axis=-1) >= quorum * np.asarray(counts)
+
+
+def next_state(was_in_queue: bool, in_queue: bool, in_game: bool) -> Optional[str]:
+    """
+    The state a sample moves the monitor to, None to stay.
+    """
+    if in_queue and not was_in_queue:
+        return STATE_IN_QUEUE
+    if in_game and was_in_queue:
+        return STATE_IN_GAME
+    if was_in_queue and not in_queue and not in_game:
+        return STATE_WAITING
+    return None
+
+
+@dataclass
+class ReplayStats:
+    ticks: int = 0
+    samples: int = 0
+    # (timestamp, state) of every state change
+    transitions: List[Tuple[float, str]] = field(default_factory=list)
+    # samples whose in-queue verdict or resulting state differ from what was recorded
+    classification_mismatches: int = 0
+    state_mismatches: int = 0
+    elapsed_s: float = 0.0
+
+
 class Monitor:
-    def __init__(self, logger: Logger, config: MonitorConfig, state_manager: StateManager):
+    def __init__(
+        self,
+        logger: Logger,
+        config: MonitorConfig,
+        state_manager: StateManager,
+        capture: Optional[CaptureBackend] = None,
+        recorder: Optional[TickRecorder] = None,
+        clock: Optional[Clock] = None,
+    ):
         self.config = config
         self.logger = logger
         self._stop = False
+        # set on stop and on a new plan, so a sleeping loop reacts at once
+        self._wake = threading.Event()
+        self._stop_requested_at: Optional[float] = None
+        # set by a running AsyncMonitor, wakes its event loop
+        self._async_waker: Optional[Callable[[], None]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lifecycle_lock = threading.Lock()
+        self.last_stop_latency_s: Optional[float] = None
+        self._window_missing = False
         self.state_manager = state_manager
-
-    def stop(self):
+        self.capture: CaptureBackend = capture or ImageGrabCaptureBackend()
+        self._window_locator: Optional[utils.WindowLocator] = None
+        self._geometry_cache: Optional[utils.WindowGeometryCache] = None
+        self._color_lut: Optional[utils.ColorLUT] = None
+        # `plan` is published by apply_config from any thread; the loop switches to it between two ticks
+        self.plan: Optional[MonitorPlan] = None
+        self._active_plan: Optional[MonitorPlan] = None
+        self.recorder = recorder
+        # perf_counter stays for the stage timings, they measure real work even in a simulation
+        self.clock: Clock = clock or state_manager.clock
+        self.metrics = StageMetrics()
+
+    def start(self) -> bool:
+        """
+        Run the loop on a background thread. Returns False, without starting anything, while a previous
+        loop is still running, so there is never more than one sampler.
+        """
+        with self._lifecycle_lock:
+            if self.running:
+                return False
+            self._reset_stop()
+            self._thread = threading.Thread(target=self._run, name="monitor", daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self) -> None:
+        """
+        Ask the loop (or a pending `show_debug_image`) to stop; it wakes up right away. See `join()`.
+        """
+        if not self._stop:
+            self._stop_requested_at = time.perf_counter()
         self._stop = True
+        self._wake_up()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the thread started by `start()`; returns False if it is still running after `timeout`.
+        """
+        thread = self._thread
+        if thread is None:
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    @property
+    def running(self) -> bool:
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def _reset_stop(self) -> None:
+        self._stop = False
+        self._stop_requested_at = None
+        self._wake.clear()
+
+    def apply_config(self, config: MonitorConfig) -> None:
+        """
+        Switch to a new config without stopping; a running loop wakes up and picks it up before its next
+        tick. Raises ValueError (and keeps the current plan) if the config does not compile.
+        """
+        self.plan = MonitorPlan.compile(config)
+        self.config = config
+        self._wake_up()
+
+    def _wake_up(self) -> None:
+        self._wake.set()
+        waker = self._async_waker
+        if waker is not None:
+            waker()
+
+    def _sync_plan(self) -> bool:
+        """
+        Make the published plan the active one, rebuilding only the caches it invalidates. Returns True if
+        the plan changed.
+        """
+        plan = self.plan
+        if plan is None:
+            plan = self.plan = MonitorPlan.compile(self.config)
+        previous = self._active_plan
+        if plan is previous:
+            return False
+
+        titles = (plan.w3champions_title, plan.warcraft3_title)
+        if previous is None or titles != (previous.w3champions_title, previous.warcraft3_title):
+            self._window_locator = utils.WindowLocator(titles)
+        geometry = (plan.offsets, plan.aspect_ratio)
+        if previous is None or geometry != (previous.offsets, previous.aspect_ratio):
+            self._geometry_cache = utils.WindowGeometryCache(
+                plan.offsets, plan.aspect_ratio, clock=self.clock.monotonic
+            )
+        self._geometry_cache.ownership_ttl_s = plan.ownership_recheck_s
+        self._active_plan = plan
+        return True
+
+    def _locate_windows(self) -> Tuple[Optional[int], Optional[int]]:
+        plan = self._active_plan
+        try:
+            handles = self._window_locator.locate()
+        except Exception as ex:
+            self.logger.warning(f"Could not enumerate windows: {ex}")
+            return None, None
+        return handles[plan.w3champions_title], handles[plan.warcraft3_title]
+
+    def _get_color_lut(self) -> utils.ColorLUT:
+        if self._color_lut is None:
+            self._color_lut = utils.get_color_lut(cache_dir=user_cache_dir(APP_NAME, appauthor=False))
+        return self._color_lut
+
+    def _sample_probes(self, window_info: _WindowInfo) -> Tuple[np.ndarray, np.ndarray, bool]:
+        """
+        Grab all probes at once and classify them; returns (pixels, color indices, in_queue).
+        """
+        t = time.perf_counter()
+        pixels = grab_points(self.capture, window_info.probe_screen_pos)
+        t = self.metrics.lap("capture", t)
+        plan = self._active_plan
+        colors, in_queue = classify_probes(
+            self._get_color_lut(), pixels, plan.in_queue_color_index, plan.probe_quorum
+        )
+        self.metrics.lap("classify", t)
+        return pixels, colors, bool(in_queue)
 
     def show_debug_image(self):
         self.logger.info("Gathering debug info:")
         set_dpi_awareness()
-        self._stop = False
-        window_info = self._wait_for_window(self.config.poll_s)
+        self._reset_stop()
+        self._sync_plan()
+        plan = self._active_plan
+        window_info = self._wait_for_window(plan.poll_s)
         if window_info is None:
             self.logger.error("Failed to get W3C window info.")
             return
 
         in_game = window_info.hwnd_warcraft3
-        rgb = utils.grab_pixel_rgb(*window_info.watched_screen_pos)
-        color_name = utils.name_color(*rgb)
-        in_queue = color_name == self.config.in_queue_color
-        self.logger.debug(f"RGB={rgb} ({color_name}) -> in_queue={in_queue}, in_game={in_game}")
+        pixels, colors, in_queue = self._sample_probes(window_info)
+        color_names = utils.COLOR_NAMES_ARRAY[colors]
+        rgb = tuple(pixels[0].tolist())
+        color_name = color_names[0]
+        self.logger.debug(
+            f"RGB={pixels.tolist()} ({color_names.tolist()}) -> in_queue={in_queue}, in_game={in_game}"
+        )
 
-        img = utils.get_window_image(window_info.hwnd_w3c, self.config.enforced_window_aspect_ratio)
+        img = self.capture.grab_window(window_info.hwnd_w3c, plan.aspect_ratio)
         img = utils.draw_rectangle(img, window_info.watched_window_pos, size=30, outline="yellow", width=5)
+        for probe_window_pos in window_info.probe_window_pos[1:]:
+            img = utils.draw_rectangle(img, probe_window_pos, size=10, outline="cyan", width=3)
 
         self.logger.info(
             f"""
@@ -47,9 +244,10 @@ class Monitor:
             Point: 
                 screen_pos = {window_info.watched_screen_pos}
                 window_pos = {window_info.watched_window_pos}
-                %_pos = {(self.config.x_offset_pct, self.config.y_offset_pct)}
+                %_pos = {plan.offsets[0]}
             RGB={rgb}
             color_name={color_name}
+            probes={list(zip(window_info.probe_window_pos, color_names.tolist()))}
             in_queue={in_queue}
             in_game={in_game}
         """
@@ -58,116 +256,191 @@ class Monitor:
         img.show()
 
     def run(self):
-        try:
-            self.config.validate_all()
-        except Exception as ex:
-            self.logger.error(ex)
-            show_error(str(ex))
-            return
-
-        set_dpi_awareness()
-        self._stop = False
-
-        self.logger.info(f"Monitoring started")
-        self.state_manager.update_state(STATE_WAITING)
-        was_in_queue = False
+        """
+        Run the loop on the calling thread until `stop()`; `start()` runs it on a thread of its own.
+        """
+        self._reset_stop()
+        self._run()
 
-        poll_rate_s = self.config.poll_s
+    def _run(self):
+        # the loop itself lives in AsyncMonitor; here it gets an event loop of its own on this thread, and
+        # ticks run on the loop unless the metrics server shares it. Imported here, so --check and --replay
+        # never load asyncio
+        import asyncio
 
-        while not self._stop:
-            try:
-                window_info = self._wait_for_window(poll_rate_s)
-                if window_info is None:
-                    time.sleep(poll_rate_s)
-                    continue
+        from .async_monitor import AsyncMonitor
 
-                in_game = window_info.hwnd_warcraft3 is not None
-                rgb = utils.grab_pixel_rgb(*window_info.watched_screen_pos)
-                color_name = utils.name_color(*rgb)
-                in_queue = color_name == self.config.in_queue_color
+        asyncio.run(AsyncMonitor(self, offload=False).run(reset_stop=False))
 
-                self.logger.debug(f"RGB={rgb} ({color_name}) -> in_queue={in_queue}, in_game={in_game}")
+    def _tick(self, was_in_queue: bool) -> Optional[Tuple[bool, bool]]:
+        """
+        One sampling step. Returns None if the window is unavailable, else (in_game, was_in_queue) where
+        the latter is the value to pass to the next tick.
+        """
+        tick_start = time.perf_counter()
+        window_info = self._find_window()
+        if window_info is None:
+            if self.recorder is not None:
+                self.recorder.record(self.clock.time(), None, state=self.state_manager.current_state)
+            return None
 
-                if in_queue and not was_in_queue:
-                    self.state_manager.update_state(STATE_IN_QUEUE)
+        in_game = window_info.hwnd_warcraft3 is not None
+        pixels, colors, in_queue = self._sample_probes(window_info)
 
-                if in_game and was_in_queue:
-                    self.state_manager.update_state(STATE_IN_GAME)
+        if self.logger.debug_enabled:
+            self.logger.debug(
+                f"RGB={pixels.tolist()} ({utils.COLOR_NAMES_ARRAY[colors].tolist()}) "
+                f"-> in_queue={in_queue}, in_game={in_game}"
+            )
 
-                if was_in_queue and not in_queue and not in_game:
-                    self.state_manager.update_state(STATE_WAITING)
+        t = time.perf_counter()
+        new_state = next_state(was_in_queue, in_queue, in_game)
+        if new_state is not None:
+            self.state_manager.update_state(new_state)
+        self.metrics.lap("dispatch", t)
+
+        if self.recorder is not None:
+            self.recorder.record(
+                self.clock.time(),
+                window_info.hwnd_w3c,
+                window_info.hwnd_warcraft3,
+                window_info.probe_screen_pos,
+                pixels,
+                colors,
+                in_queue=in_queue,
+                in_game=in_game,
+                was_in_queue=was_in_queue,
+                state=self.state_manager.current_state,
+            )
+        self.metrics.lap("tick", tick_start)
+        return in_game, in_queue and not in_game
 
-                was_in_queue = in_queue and not in_game
-                poll_rate_s = self.config.reduced_poll_s if in_game else self.config.poll_s
-                time.sleep(poll_rate_s)
-            except Exception as e:
-                self.logger.error(e)
-                self._stop = True
-                break
+    def replay(self, ticks: np.ndarray) -> ReplayStats:
+        """
+        Feed recorded ticks (see `recording.read_recording`) through classification and the state logic of
+        the current config as fast as possible, without a desktop. State changes go to the state manager as
+        they would live; samples that now end up differently than recorded are counted.
+        """
+        start = time.perf_counter()
+        self._sync_plan()
+        plan = self._active_plan
+        stats = ReplayStats(ticks=len(ticks))
+        found = (ticks["flags"] & WINDOW_FOUND) != 0
+        samples = ticks[found]
+        stats.samples = len(samples)
+
+        # classify everything in one go, only the state machine has to walk the ticks one by one
+        _, in_queue = classify_probes(
+            self._get_color_lut(),
+            samples["rgb"],
+            plan.in_queue_color_index,
+            plan.probe_quorum,
+            counts=samples["probes"],
+        )
+        recorded_in_queue = (samples["flags"] & IN_QUEUE) != 0
+        stats.classification_mismatches = int(np.count_nonzero(in_queue != recorded_in_queue))
+        in_game = ((samples["flags"] & IN_GAME) != 0).tolist()
+        recorded_states = samples["state"].tolist()
+        timestamps = samples["t"].tolist()
 
+        self.state_manager.update_state(STATE_WAITING)
+        state_index = {state: i for i, state in enumerate(STATES)}
+        current = state_index[self.state_manager.current_state]
+        was_in_queue = False
+        for i, sample_in_queue in enumerate(in_queue.tolist()):
+            new_state = next_state(was_in_queue, sample_in_queue, in_game[i])
+            if new_state is not None:
+                self.state_manager.update_state(new_state)
+                if state_index[new_state] != current:
+                    current = state_index[new_state]
+                    stats.transitions.append((timestamps[i], new_state))
+            if current != recorded_states[i]:
+                stats.state_mismatches += 1
+            was_in_queue = sample_in_queue and not in_game[i]
         self.state_manager.update_state(STATE_DISABLED)
 
+        stats.elapsed_s = time.perf_counter() - start
+        self.logger.info(
+            f"Replayed {stats.ticks} ticks ({stats.samples} with a window) in {stats.elapsed_s:.3f}s: "
+            f"{len(stats.transitions)} state changes, {stats.classification_mismatches} in-queue and "
+            f"{stats.state_mismatches} state mismatches against the recording"
+        )
+        return stats
+
     @dataclass
     class _WindowInfo:
         hwnd_w3c: int
         hwnd_warcraft3: int | None
         watched_screen_pos: Point
         watched_window_pos: Point
+        probe_screen_pos: List[Point]
+        probe_window_pos: List[Point]
 
     def _wait_for_window(self, poll_rate_s: float) -> _WindowInfo | None:
-        waiting = False
-
-        def _wait():
-            nonlocal waiting
-            if not waiting:
-                self.logger.info("Waiting for W3C window...")
-                waiting = True
-            time.sleep(poll_rate_s)
-
+        self._window_missing = False
+        scheduler = DeadlineScheduler(clock=self.clock)
         while not self._stop:
-            hwnd_w3c = utils.find_window_by_title(self.config.w3champions_window_title)
-            hwnd_warcraft3 = utils.find_window_by_title(self.config.warcraft3_window_title)
+            self._wake.clear()
+            window_info = self._find_window()
+            if window_info is not None:
+                return window_info
+            if not self._stop:
+                scheduler.wait(poll_rate_s, wake=self._wake)
+
+        return None
 
-            if not hwnd_w3c:
+    def _find_window(self) -> _WindowInfo | None:
+        """
+        Single lookup of the W3C window and probe positions; logs when the window goes missing or returns.
+        """
+        t = time.perf_counter()
+        hwnd_w3c, hwnd_warcraft3 = self._locate_windows()
+        t = self.metrics.lap("locate_windows", t)
+
+        w3c_title = self._active_plan.w3champions_title.keyword
+        if not hwnd_w3c:
+            self.logger.debug("[!] Could not find window with title matching '%s'.", w3c_title)
+            return self._on_window_missing()
+
+        geometry_cache = self._geometry_cache
+        geometry = geometry_cache.geometry(hwnd_w3c)
+        t = self.metrics.lap("window_geometry", t)
+
+        if geometry is None or geometry.screen_points[0] == (0, 0):
+            self.logger.debug("%s window is not visible.", w3c_title)
+            return self._on_window_missing()
+        probe_screen_pos, probe_window_pos = geometry.screen_points, geometry.window_points
+        point_screen_pos, point_window_pos = probe_screen_pos[0], probe_window_pos[0]
+
+        belongs = geometry_cache.belongs(geometry)
+        self.metrics.lap("ownership_check", t)
+        if not belongs and self.logger.debug_enabled:
+            try:
+                title = utils.get_root_window_title_at(point_screen_pos)
                 self.logger.debug(
-                    f"[!] Could not find window with title containing '{self.config.w3champions_window_title}'."
+                    f"[skip] {point_screen_pos} belongs to '{title}', not {w3c_title}"
                 )
-                _wait()
-                continue
-
-            point_screen_pos, point_window_pos = utils.hwnd_relative_to_screen_xy(
-                hwnd_w3c,
-                self.config.x_offset_pct,
-                self.config.y_offset_pct,
-                self.config.enforced_window_aspect_ratio,
-            )
-
-            if point_screen_pos == (0, 0):
-                self.logger.debug(f"{self.config.w3champions_window_title} window is not visible.")
-                _wait()
-                continue
-
-            if not utils.point_belongs_to_window(hwnd_w3c, point_screen_pos):
-                try:
-                    under = win32gui.WindowFromPoint(point_screen_pos)
-                    title = win32gui.GetWindowText(win32gui.GetAncestor(under, win32con.GA_ROOT))
-                    self.logger.debug(
-                        f"[skip] {point_screen_pos} belongs to '{title}', not {self.config.w3champions_window_title}"
-                    )
-                except Exception as ex:
-                    self.logger.debug(f"[skip] {point_screen_pos} could not check pixel ownership: {ex}")
-
-                _wait()
-                continue
-
-            if waiting:
-                self.logger.info("W3C Window detected.")
-
-            return Monitor._WindowInfo(
-                hwnd_w3c=hwnd_w3c,
-                hwnd_warcraft3=hwnd_warcraft3,
-                watched_screen_pos=point_screen_pos,
-                watched_window_pos=point_window_pos,
-            )
+            except Exception as ex:
+                self.logger.debug(f"[skip] {point_screen_pos} could not check pixel ownership: {ex}")
+
+        if not belongs:
+            return self._on_window_missing()
+
+        if self._window_missing:
+            self.logger.info("W3C Window detected.")
+            self._window_missing = False
+
+        return Monitor._WindowInfo(
+            hwnd_w3c=hwnd_w3c,
+            hwnd_warcraft3=hwnd_warcraft3,
+            watched_screen_pos=point_screen_pos,
+            watched_window_pos=point_window_pos,
+            probe_screen_pos=probe_screen_pos,
+            probe_window_pos=probe_window_pos,
+        )
 
+    def _on_window_missing(self) -> None:
+        if not self._window_missing:
+            self.logger.info("Waiting for W3C window...")
+            self._window_missing = True
         return None
@@ -0,0 +1,71 @@
+"""
+`MonitorConfig` compiled into what the monitor loop actually needs: title matchers, validated probe
+offsets, the color index to look for and the poll intervals. The config stays the editable, mutable thing;
+a plan is immutable, so the loop can hold one for a whole tick while a reload publishes the next one.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Tuple
+
+from . import utils
+from .config import MonitorConfig
+from .utils.geometry import check_relative_offsets
+from .utils.window import TitleMatcher
+
+
+@dataclass(frozen=True, slots=True)
+class MonitorPlan:
+    w3champions_title: TitleMatcher
+    warcraft3_title: TitleMatcher
+    # the watched point first, then the extra probes
+    offsets: Tuple[Tuple[float, float], ...]
+    aspect_ratio: float
+    in_queue_color: str
+    in_queue_color_index: int
+    probe_quorum: float
+    poll_s: float
+    in_queue_poll_s: float
+    reduced_poll_s: float
+    window_missing_poll_s: float
+    window_missing_max_poll_s: float
+    ownership_recheck_s: float
+    metrics_log_interval_s: float
+    metrics_port: int
+
+    @classmethod
+    def compile(cls, config: MonitorConfig) -> MonitorPlan:
+        """
+        Validate `config` and build a plan from it; raises ValueError for anything the loop could not use.
+        """
+        config.validate_all()
+        matcher = TitleMatcher.regex if config.window_title_match == "regex" else TitleMatcher.substring
+        offsets = ((float(config.x_offset_pct), float(config.y_offset_pct)),) + tuple(
+            (float(x), float(y)) for x, y in config.probe_offsets_pct or []
+        )
+        check_relative_offsets(offsets)
+        return cls(
+            w3champions_title=matcher(config.w3champions_window_title),
+            warcraft3_title=matcher(config.warcraft3_window_title),
+            offsets=offsets,
+            aspect_ratio=config.enforced_window_aspect_ratio,
+            in_queue_color=config.in_queue_color,
+            in_queue_color_index=utils.color_index(config.in_queue_color),
+            probe_quorum=config.probe_quorum,
+            poll_s=config.poll_s,
+            in_queue_poll_s=config.in_queue_poll_s,
+            reduced_poll_s=config.reduced_poll_s,
+            window_missing_poll_s=config.window_missing_poll_s,
+            window_missing_max_poll_s=config.window_missing_max_poll_s,
+            ownership_recheck_s=config.ownership_recheck_s,
+            metrics_log_interval_s=config.metrics_log_interval_s,
+            metrics_port=config.metrics_port,
+        )
+
+    def poll_interval(self, in_game: bool, in_queue: bool) -> float:
+        if in_game:
+            return self.reduced_poll_s
+        if in_queue:
+            return self.in_queue_poll_s
+        return self.poll_s
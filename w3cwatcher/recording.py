@@ -0,0 +1,171 @@
+"""
+Tick recordings: every monitor tick appended as one fixed-width binary record, so a recording can be
+memory-mapped as a numpy array of millions of ticks and replayed through the detection and state logic
+(`Monitor.replay`) without a desktop.
+
+File layout: a 16 byte header (magic, version, record size, probe slots), then `TICK` records back to back.
+Up to `MAX_PROBES` probes are stored per tick; unused slots are zero.
+"""
+
+from __future__ import annotations
+
+import struct
+from pathlib import Path
+from typing import BinaryIO, Optional, Sequence
+
+import numpy as np
+
+from .config import MAX_PROBE_OFFSETS
+from .state_manager import STATE_DISABLED, STATE_IN_GAME, STATE_IN_QUEUE, STATE_WAITING
+from .utils import Point
+
+MAGIC = b"W3CWREC\0"
+VERSION = 1
+MAX_PROBES = 8
+
+# states are stored as an index into this tuple
+STATES = (STATE_DISABLED, STATE_WAITING, STATE_IN_QUEUE, STATE_IN_GAME)
+
+# flags
+WINDOW_FOUND = 1
+IN_QUEUE = 2
+IN_GAME = 4
+WAS_IN_QUEUE = 8
+
+HEADER = struct.Struct("<8sHHB3x")
+# time, W3C hwnd, Warcraft III hwnd (0: none), probe count, flags, state, probe screen x/y, RGB, colors
+TICK = struct.Struct(f"<dQQBBBx{MAX_PROBES * 2}i{MAX_PROBES * 3}s{MAX_PROBES}s4x")
+
+# the same layout as a numpy record, for reading whole recordings at once
+TICK_DTYPE = np.dtype(
+    [
+        ("t", "<f8"),
+        ("hwnd_w3c", "<u8"),
+        ("hwnd_warcraft3", "<u8"),
+        ("probes", "u1"),
+        ("flags", "u1"),
+        ("state", "u1"),
+        ("_pad", "u1"),
+        ("points", "<i4", (MAX_PROBES, 2)),
+        ("rgb", "u1", (MAX_PROBES, 3)),
+        ("colors", "u1", (MAX_PROBES,)),
+        ("_pad2", "u1", (4,)),
+    ]
+)
+if TICK_DTYPE.itemsize != TICK.size:
+    raise RuntimeError(f"TICK_DTYPE is {TICK_DTYPE.itemsize} bytes, TICK records are {TICK.size}")
+if MAX_PROBE_OFFSETS + 1 > MAX_PROBES:
+    raise RuntimeError(
+        f"{MAX_PROBE_OFFSETS} probe offsets and the watched point exceed {MAX_PROBES} probe slots"
+    )
+
+
+class RecordingError(ValueError):
+    pass
+
+
+class TickRecorder:
+    """
+    Appends ticks to a recording file; an existing recording is continued. Writes are buffered, call
+    `close()` (or `flush()`) to get everything on disk.
+    """
+
+    def __init__(self, path: Path | str, buffer_size: int = 64 * 1024):
+        self.path = Path(path)
+        self.ticks = 0
+        self._file: Optional[BinaryIO] = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        size = self.path.stat().st_size if self.path.exists() else 0
+        exists = size > 0
+        if exists:
+            with open(self.path, "r+b") as f:
+                _read_header(f, self.path)
+                # drop a record cut short by a crash, so appended ones stay aligned
+                f.truncate(size - (size - HEADER.size) % TICK.size)
+        self._file = open(self.path, "ab", buffering=buffer_size)
+        if not exists:
+            self._file.write(HEADER.pack(MAGIC, VERSION, TICK.size, MAX_PROBES))
+
+    def record(
+        self,
+        t: float,
+        hwnd_w3c: Optional[int],
+        hwnd_warcraft3: Optional[int] = None,
+        points: Sequence[Point] = (),
+        pixels: Optional[np.ndarray] = None,
+        colors: Optional[np.ndarray] = None,
+        in_queue: bool = False,
+        in_game: bool = False,
+        was_in_queue: bool = False,
+        state: str = STATE_DISABLED,
+    ) -> None:
+        """
+        One tick; pass only `t` (and the state) for a tick where the window was not found. Raises
+        ValueError for more than `MAX_PROBES` points.
+        """
+        count = len(points)
+        if count > MAX_PROBES:
+            raise ValueError(f"A tick records at most {MAX_PROBES} probes, got {count}")
+        flags = (
+            (WINDOW_FOUND if hwnd_w3c else 0)
+            | (IN_QUEUE if in_queue else 0)
+            | (IN_GAME if in_game else 0)
+            | (WAS_IN_QUEUE if was_in_queue else 0)
+        )
+        xy = [int(v) for point in points for v in point]
+        xy += [0] * (MAX_PROBES * 2 - len(xy))
+        rgb = colors_bytes = b""
+        if count:
+            # "s" fields are zero padded by struct
+            rgb = np.asarray(pixels, dtype=np.uint8)[:count, :3].tobytes()
+            colors_bytes = np.asarray(colors, dtype=np.uint8)[:count].tobytes()
+        self._file.write(
+            TICK.pack(
+                t,
+                hwnd_w3c or 0,
+                hwnd_warcraft3 or 0,
+                count,
+                flags,
+                STATES.index(state),
+                *xy,
+                rgb,
+                colors_bytes,
+            )
+        )
+        self.ticks += 1
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _read_header(f: BinaryIO, path: Path) -> None:
+    data = f.read(HEADER.size)
+    if len(data) < HEADER.size:
+        raise RecordingError(f"{path} is not a tick recording (too short)")
+    magic, version, record_size, max_probes = HEADER.unpack(data)
+    if magic != MAGIC:
+        raise RecordingError(f"{path} is not a tick recording")
+    if (version, record_size, max_probes) != (VERSION, TICK.size, MAX_PROBES):
+        raise RecordingError(
+            f"{path} is a version {version} recording ({record_size} byte records, {max_probes} probes), "
+            f"expected version {VERSION} ({TICK.size} bytes, {MAX_PROBES} probes)"
+        )
+
+
+def read_recording(path: Path | str) -> np.ndarray:
+    """
+    Memory-map a recording as a structured array of TICK_DTYPE. A record cut short by a crash is ignored.
+    """
+    path = Path(path)
+    with open(path, "rb") as f:
+        _read_header(f, path)
+    count = (path.stat().st_size - HEADER.size) // TICK.size
+    if count == 0:
+        return np.zeros(0, dtype=TICK_DTYPE)
+    return np.memmap(path, dtype=TICK_DTYPE, mode="r", offset=HEADER.size, shape=(count,))
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Callable, Optional
+
+from .clock import SYSTEM_CLOCK, Clock
+from .logging import Logger
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+class DeadlineScheduler:
+    """
+    Fixed-rate scheduler: each wait() sleeps until the previous deadline plus `interval`, so time spent
+    doing work between waits does not stretch the period. A missed deadline is counted and reported, and
+    the schedule restarts from now instead of bursting to catch up.
+
+    A wait can be cut short by setting a `wake` event (returns at once) or by a `cancelled` predicate
+    (polled every SLICE_S). `wait_async()` is the same for an event loop, woken by an asyncio.Event.
+    """
+
+    # granularity for checking the cancel predicate during long sleeps
+    SLICE_S = 0.25
+
+    def __init__(self, logger: Optional[Logger] = None, clock: Clock = SYSTEM_CLOCK):
+        self.logger = logger
+        self.clock = clock
+        self._deadline: Optional[float] = None
+        self.missed = 0
+        self.max_lateness_s = 0.0
+        # how far past the deadline the last wait() actually returned
+        self.last_overshoot_s = 0.0
+        # whether the last wait() was cut short by `wake` or `cancelled`
+        self.interrupted = False
+
+    def reset(self) -> None:
+        self._deadline = None
+
+    def wait(
+        self,
+        interval_s: float,
+        cancelled: Callable[[], bool] = None,
+        wake: Optional[threading.Event] = None,
+    ) -> float:
+        """
+        Sleep until the next deadline; returns how late the deadline was already (0.0 if on time).
+        """
+        lateness = self._next_deadline(interval_s)
+        if lateness > 0:
+            return lateness
+
+        while (remaining := self._deadline - self.clock.monotonic()) > 0:
+            if cancelled is not None and cancelled():
+                self.interrupted = True
+                break
+            if wake is not None:
+                timeout = min(remaining, self.SLICE_S) if cancelled is not None else remaining
+                if self.clock.wait(wake, timeout):
+                    self.interrupted = True
+                    break
+                continue
+            self.clock.sleep(min(remaining, self.SLICE_S) if cancelled is not None else remaining)
+        self.last_overshoot_s = max(self.clock.monotonic() - self._deadline, 0.0)
+        return 0.0
+
+    async def wait_async(self, interval_s: float, wake: asyncio.Event) -> float:
+        """
+        `wait()` for a coroutine: sleeps on the event loop until the next deadline or until `wake` is set.
+        """
+        lateness = self._next_deadline(interval_s)
+        if lateness > 0:
+            return lateness
+
+        while (remaining := self._deadline - self.clock.monotonic()) > 0:
+            if await self.clock.wait_async(wake, remaining):
+                self.interrupted = True
+                break
+        self.last_overshoot_s = max(self.clock.monotonic() - self._deadline, 0.0)
+        return 0.0
+
+    def _next_deadline(self, interval_s: float) -> float:
+        """
+        Move the deadline on by `interval_s`; returns how late it already is, restarting from now if so.
+        """
+        self.interrupted = False
+        now = self.clock.monotonic()
+        if self._deadline is None:
+            self._deadline = now
+        self._deadline += interval_s
+
+        lateness = now - self._deadline
+        if lateness <= 0:
+            return 0.0
+        self.missed += 1
+        self.max_lateness_s = max(self.max_lateness_s, lateness)
+        if self.logger:
+            self.logger.debug(
+                f"Missed poll deadline by {lateness * 1000:.1f} ms "
+                f"(interval {interval_s}s, {self.missed} missed so far)"
+            )
+        self._deadline = now
+        self.last_overshoot_s = lateness
+        return lateness
+
+
+class Backoff:
+    """
+    Exponential backoff between `initial_s` and `max_s`.
+    """
+
+    def __init__(self, initial_s: float, max_s: float, factor: float = 2.0):
+        self.initial_s = initial_s
+        self.max_s = max(max_s, initial_s)
+        self.factor = factor
+        self._current = initial_s
+
+    def next(self) -> float:
+        current = self._current
+        self._current = min(self._current * self.factor, self.max_s)
+        return current
+
+    def reset(self) -> None:
+        self._current = self.initial_s
@@ -1,7 +1,14 @@
 from __future__ import annotations
-from datetime import datetime, timedelta
+import threading
+from collections import deque
+from datetime import timedelta
+from .clock import SYSTEM_CLOCK, Clock
+from .events import EventBus, StateChangeEvent, Subscription
 from .logging import Logger
-from typing import Callable
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
+
+if TYPE_CHECKING:
+    import asyncio
 
 
 STATE_WAITING = 'waiting'
@@ -10,26 +17,82 @@ STATE_IN_GAME = 'in-game'
 STATE_DISABLED = 'disabled'
 
 StateChangeListener = Callable[[str, timedelta],None]
+AsyncStateChangeListener = Callable[[str, timedelta], Awaitable[None]]
 
 class StateManager:
-    def __init__(self,logger: Logger):
-        self.state_change_listeners = []
+    def __init__(self, logger: Logger, bus: Optional[EventBus] = None, clock: Clock = SYSTEM_CLOCK):
+        self.bus = bus or EventBus(logger)
+        self.clock = clock
         self.current_state = STATE_DISABLED
-        self.last_state_change = datetime.now()
+        self.last_state_change = clock.now()
+        # durations come from the monotonic clock, so a wall clock adjustment can't distort "Time in Queue"
+        self._last_state_change_monotonic = clock.monotonic()
         self.logger = logger
+        # re-entrant so a synchronous listener may itself update the state
+        self._lock = threading.RLock()
+        # state changes waiting to be published, in order; drained by whoever holds _publish_lock
+        self._outbox: deque[StateChangeEvent] = deque()
+        self._publish_lock = threading.RLock()
+
+    def add_state_change_listener(
+        self, listener: StateChangeListener, asynchronous: bool = False
+    ) -> Subscription:
+        def handler(event: StateChangeEvent):
+            listener(event.state, event.after)
+
+        name = getattr(listener, "__qualname__", repr(listener))
+        return self.bus.subscribe(handler, StateChangeEvent, asynchronous=asynchronous, name=name)
+
+    def add_async_state_change_listener(
+        self, listener: AsyncStateChangeListener, loop: asyncio.AbstractEventLoop
+    ) -> Subscription:
+        """
+        Subscribe a coroutine function: every state change is scheduled on `loop`, in order, from whichever
+        thread changed the state, without waiting for the coroutine to finish.
+        """
+        import asyncio
+
+        name = getattr(listener, "__qualname__", repr(listener))
 
-    def add_state_change_listener(self, listener: StateChangeListener):
-        self.state_change_listeners.append(listener)
+        def report(future) -> None:
+            if not future.cancelled() and future.exception() is not None:
+                self.logger.error(f"Event subscriber '{name}' failed: {future.exception()}")
+
+        def handler(event: StateChangeEvent):
+            future = asyncio.run_coroutine_threadsafe(listener(event.state, event.after), loop)
+            future.add_done_callback(report)
+
+        return self.bus.subscribe(handler, StateChangeEvent, name=name)
 
     def update_state(self, new_state):
-        if self.current_state == new_state:
-            self.logger.debug(f"Ignoring state update: current=new ({new_state})")
-            return
-        after = datetime.now() - self.last_state_change
-        self.logger.debug(f"Updating status to {new_state} after {after}")
-        self.current_state = new_state
-        self.last_state_change = datetime.now()
-
-        self.logger.debug(f"Invoking {len(self.state_change_listeners)} state change listeners.")
-        for l in self.state_change_listeners:
-            l(new_state, after)
+        with self._lock:
+            if self.current_state == new_state:
+                self.logger.debug("Ignoring state update: current=new (%s)", new_state)
+                return
+            now = self.clock.now()
+            now_monotonic = self.clock.monotonic()
+            after = timedelta(seconds=now_monotonic - self._last_state_change_monotonic)
+            self.logger.debug(f"Updating status to {new_state} after {after}")
+            event = StateChangeEvent(
+                state=new_state, previous=self.current_state, after=after, timestamp=now
+            )
+            self.current_state = new_state
+            self.last_state_change = now
+            self._last_state_change_monotonic = now_monotonic
+            self._outbox.append(event)
+
+        # published after releasing the state lock, so a slow or blocking subscriber never holds up a state
+        # change, nor deadlocks one that reads the state
+        self._publish()
+
+    def _publish(self) -> None:
+        while self._outbox:
+            # whoever holds the lock publishes everything queued, in order, and looks again after releasing
+            # it, so no event is left behind
+            if not self._publish_lock.acquire(blocking=False):
+                return
+            try:
+                while self._outbox:
+                    self.bus.publish(self._outbox.popleft())
+            finally:
+                self._publish_lock.release()
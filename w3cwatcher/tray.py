@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import os
 import ctypes
 import threading
 from .logging import Logger
@@ -12,6 +11,7 @@ from PIL import Image, ImageDraw
 import pystray
 
 from .config import APP_NAME, TrayConfig
+from .log_tail import show_log_window
 from .monitor import Monitor
 from .state_manager import STATE_WAITING, STATE_DISABLED, STATE_IN_QUEUE, STATE_IN_GAME
 from .utils import open_file
@@ -21,6 +21,8 @@ from .utils.config_base import get_config_file
 class TrayApp:
     _mutex_name = "W3CWatcherSingletonMutex"
     _singleton_mutex_handle = None
+    # the monitor wakes up on stop, this only guards against a capture call that hangs
+    STOP_TIMEOUT_S = 2.0
 
     def __init__(self, logger: Logger, config: TrayConfig, monitor: Monitor):
         self.logger = logger
@@ -33,7 +35,9 @@ class TrayApp:
         self._icon_blue = self._icon_image(color=(60, 60, 200))
 
         self._icon = pystray.Icon(APP_NAME, self._icon_grey, APP_NAME)
+        # "Check capture area"; the monitor loop itself runs on the monitor's own thread
         self._worker: Optional[threading.Thread] = None
+        self._log_window: Optional[threading.Thread] = None
 
         self._icon.menu = pystray.Menu(
             pystray.MenuItem("Start", self._start),
@@ -50,7 +54,7 @@ class TrayApp:
             pystray.MenuItem("Quit", self._quit),
         )
 
-        self.monitor.state_manager.add_state_change_listener(self.on_monitor_state_change)
+        self.monitor.state_manager.add_state_change_listener(self.on_monitor_state_change, asynchronous=True)
 
     @staticmethod
     def _icon_image(color=(200, 60, 60)) -> Image.Image:
@@ -63,29 +67,55 @@ class TrayApp:
         self.start()
 
     def start(self):
-        if self._worker and self._worker.is_alive():
+        if self.monitor.running:
             self.logger.info("Already running.")
             return
-
-        self._worker = threading.Thread(target=self.monitor.run, daemon=True)
-        self._worker.start()
+        if not self._stop_worker():
+            return
+        if not self.monitor.start():
+            self.logger.warning("The previous monitoring loop has not stopped yet, not starting another.")
 
     def _stop(self, _):
+        self.stop()
+
+    def stop(self) -> bool:
+        self.monitor.stop()
+        if not self.monitor.join(self.STOP_TIMEOUT_S):
+            self.logger.warning(f"Monitoring did not stop within {self.STOP_TIMEOUT_S}s.")
+            return False
+        return self._stop_worker()
+
+    def _stop_worker(self) -> bool:
+        if self._worker is None:
+            return True
         self.monitor.stop()
+        self._worker.join(self.STOP_TIMEOUT_S)
+        if self._worker.is_alive():
+            self.logger.warning(f"Capture check did not finish within {self.STOP_TIMEOUT_S}s.")
+            return False
         self._worker = None
+        return True
 
     def _quit(self, _):
         self._stop(_)
         self._icon.stop()
 
     def _check(self, _):
-        self._stop(_)
-        self._worker = threading.Thread(target=self.monitor.show_debug_image, daemon=True)
+        if not self.stop():
+            return
+        self._worker = threading.Thread(target=self.monitor.show_debug_image, name="check", daemon=True)
         self._worker.start()
 
     def _log(self, _):
-        # os.startfile(self.s.logfile)
-        os.system(f"start powershell -command \"Get-Content '{self.logger.latest_path}' -Wait -Tail 40\"")
+        if self._log_window and self._log_window.is_alive():
+            return
+        self._log_window = threading.Thread(
+            target=show_log_window,
+            args=(self.logger.latest_path, f"{APP_NAME} - {self.logger.latest_path}"),
+            name="log-window",
+            daemon=True,
+        )
+        self._log_window.start()
 
     def _settings(self, _):
         path = get_config_file(path=self.config.get_file_path(), user_config=True, app_name=APP_NAME)
@@ -96,6 +126,13 @@ class TrayApp:
         #
         self.monitor.state_manager.update_state(STATE_IN_GAME)
 
+    def apply_config(self, config: TrayConfig) -> None:
+        """
+        Use a reloaded tray config from now on; `autostart` is only read when the tray starts.
+        """
+        config.validate_all()
+        self.config = config
+
     def run(self):
         if self.config.autostart:
             self.start()
@@ -1,4 +1,34 @@
-from .geometry import *
-from .image import *
-from .platform import *
-from .window import *
+"""
+Helpers are resolved from the submodules on first access (PEP 562), so importing `w3cwatcher.utils` for
+e.g. `open_file` does not load numpy, PIL or win32. Submodules are searched from lightest to heaviest.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import Any, List
+
+_SUBMODULES = ("platform", "geometry", "window", "color", "image")
+
+
+def __getattr__(name: str) -> Any:
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    if not name.startswith("_"):
+        for submodule in _SUBMODULES:
+            module = importlib.import_module(f"{__name__}.{submodule}")
+            if name in getattr(module, "__all__", ()) or (
+                not hasattr(module, "__all__") and hasattr(module, name)
+            ):
+                value = getattr(module, name)
+                globals()[name] = value
+                return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> List[str]:
+    names = set(globals())
+    for submodule in _SUBMODULES:
+        module = importlib.import_module(f"{__name__}.{submodule}")
+        names.update(getattr(module, "__all__", (n for n in vars(module) if not n.startswith("_"))))
+    return sorted(names)
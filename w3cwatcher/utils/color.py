@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+COLOR_NAMES: Tuple[str, ...] = (
+    "unknown", "black", "white", "gray",
+    "red", "green", "blue", "yellow", "magenta", "cyan",
+    "orange", "lime", "purple",
+)  # fmt: skip
+
+_COLOR_INDEX = {name: i for i, name in enumerate(COLOR_NAMES)}
+COLOR_NAMES_ARRAY = np.array(COLOR_NAMES)
+
+# Bump when the rules in classify_rules change so cached tables are rebuilt
+_RULES_VERSION = 1
+
+
+def color_index(name: str) -> int:
+    try:
+        return _COLOR_INDEX[name]
+    except KeyError:
+        raise ValueError(f"Unknown color name '{name}', expected one of {COLOR_NAMES}") from None
+
+
+def classify_rules(pixels: np.ndarray) -> np.ndarray:
+    """
+    Evaluate the `name_color` rules on an (..., 3) RGB array; returns uint8 indices into COLOR_NAMES.
+    """
+    px = np.asarray(pixels, dtype=np.int16)
+    r, g, b = px[..., 0], px[..., 1], px[..., 2]
+    max_c = px[..., :3].max(axis=-1)
+    min_c = px[..., :3].min(axis=-1)
+    low = max_c - min_c < 15
+
+    conditions = [
+        low & (max_c < 40),
+        low & (max_c > 215),
+        low,
+        (r > 200) & (g < 80) & (b < 80),
+        (g > 200) & (r < 80) & (b < 80),
+        (b > 200) & (r < 80) & (g < 80),
+        (r > 200) & (g > 200) & (b < 80),
+        (r > 200) & (b > 200) & (g < 80),
+        (g > 200) & (b > 200) & (r < 80),
+        (r > g) & (r > b) & (g > 100),
+        (r > g) & (r > b),
+        (g > r) & (g > b) & (r > 100),
+        (g > r) & (g > b),
+        (b > r) & (b > g) & (r > 100),
+        (b > r) & (b > g),
+    ]
+    choices = [
+        "black", "white", "gray",
+        "red", "green", "blue", "yellow", "magenta", "cyan",
+        "orange", "red", "lime", "green", "purple", "blue",
+    ]  # fmt: skip
+    return np.select(conditions, [_COLOR_INDEX[c] for c in choices], default=0).astype(np.uint8)
+
+
+class ColorLUT:
+    """
+    Quantized RGB -> color index lookup table built from `classify_rules`.
+
+    `bits` is the per-channel resolution: 8 gives an exact 256^3 table (16 MiB), lower values trade
+    accuracy at rule boundaries for size (5 bits = 32^3 = 32 KiB). Each cell holds the classification
+    of its bin center.
+    """
+
+    def __init__(self, table: np.ndarray, bits: int):
+        side = 1 << bits
+        if table.shape != (side * side * side,) or table.dtype != np.uint8:
+            raise ValueError(f"Expected a flat uint8 table of {side}^3 entries, got {table.dtype}{table.shape}")
+        self.table = table
+        self.bits = bits
+        self._shift = 8 - bits
+
+    @classmethod
+    def build(cls, bits: int = 8) -> ColorLUT:
+        if not 1 <= bits <= 8:
+            raise ValueError("bits must be in the 1..8 range")
+        side = 1 << bits
+        shift = 8 - bits
+        centers = (np.arange(side, dtype=np.int16) << shift) + ((1 << shift) >> 1)
+
+        gg, bb = np.meshgrid(centers, centers, indexing="ij")
+        slab = np.empty((side, side, 3), dtype=np.int16)
+        slab[..., 1] = gg
+        slab[..., 2] = bb
+
+        table = np.empty((side, side, side), dtype=np.uint8)
+        # one red slice at a time keeps the temporary arrays small
+        for i, red in enumerate(centers):
+            slab[..., 0] = red
+            table[i] = classify_rules(slab)
+        return cls(table.reshape(-1), bits)
+
+    @classmethod
+    def load_or_build(cls, bits: int = 8, cache_dir: Optional[Path | str] = None) -> ColorLUT:
+        if cache_dir is None:
+            return cls.build(bits)
+
+        path = Path(cache_dir) / f"color_lut_v{_RULES_VERSION}_{bits}bit.npy"
+        # noinspection PyBroadException
+        try:
+            return cls(np.load(path, mmap_mode="r"), bits)
+        except Exception:
+            pass
+
+        lut = cls.build(bits)
+        # noinspection PyBroadException
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, lut.table)
+            os.replace(tmp, path)
+        except Exception:
+            pass  # caching is best-effort
+        return lut
+
+    def index(self, r: int, g: int, b: int) -> int:
+        s, bits = self._shift, self.bits
+        return int(self.table[(((r >> s) << bits | (g >> s)) << bits) | (b >> s)])
+
+    def name(self, r: int, g: int, b: int) -> str:
+        return COLOR_NAMES[self.index(r, g, b)]
+
+    def classify(self, pixels: np.ndarray) -> np.ndarray:
+        """
+        Classify an (..., 3) uint8 RGB array in one indexing operation; returns uint8 color indices.
+        """
+        px = np.asarray(pixels)
+        s, bits = self._shift, self.bits
+        r = px[..., 0].astype(np.intp) >> s
+        g = px[..., 1].astype(np.intp) >> s
+        b = px[..., 2].astype(np.intp) >> s
+        return self.table[(((r << bits) | g) << bits) | b]
+
+    def names(self, pixels: np.ndarray) -> np.ndarray:
+        return COLOR_NAMES_ARRAY[self.classify(pixels)]
+
+
+_luts: Dict[Tuple[int, Optional[str]], ColorLUT] = {}
+_luts_lock = threading.Lock()
+
+
+def get_color_lut(bits: int = 8, cache_dir: Optional[Path | str] = None) -> ColorLUT:
+    """
+    Process-wide LUT, loaded from (or saved to) `cache_dir` when given.
+    """
+    key = (bits, str(cache_dir) if cache_dir is not None else None)
+    with _luts_lock:
+        lut = _luts.get(key)
+        if lut is None:
+            lut = _luts[key] = ColorLUT.load_or_build(bits, cache_dir)
+        return lut
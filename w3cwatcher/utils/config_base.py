@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import argparse
+import json
+import os
 import sys
+from contextlib import contextmanager
 
-import tomlkit
 from dataclasses import dataclass, fields, Field, MISSING
 from pathlib import Path
 from dataclasses import field as dc_field
@@ -31,6 +33,7 @@ FIELD_HELP_TEXT = "help_text"
 FIELD_SERIALIZER = "serializer"
 FIELD_MODIFIABLE = "modifiable"
 FIELD_VALIDATORS = "validator"
+FIELD_SECRET = "secret"
 
 AUTO_ARG = -1
 
@@ -122,9 +125,13 @@ def field(
     serialize: bool = True,
     serializer: SerializerFunc = default_serializer,
     validators: ValidatorFunc | List[ValidatorFunc] | None = None,
+    secret: bool = False,
     **kwargs,
 ):
     metadata = kwargs.pop("metadata", {}) or {}
+    if secret:
+        metadata[FIELD_SECRET] = True
+
     if arg is not None:
         metadata[FIELD_ARG] = arg
 
@@ -151,11 +158,120 @@ def field(
     return dc_field(metadata=metadata, **kwargs)
 
 
+@dataclass(frozen=True)
+class FieldSpec:
+    """
+    Everything the config machinery needs to know about one field, resolved once per class.
+    """
+
+    name: str
+    field: Field
+    type: Any
+    arg: Optional[str]
+    help_text: Optional[str]
+    serializer: SerializerFunc
+    validators: Tuple[ValidatorFunc, ...]
+    modifiable: bool
+    is_config: bool
+    secret: bool
+
+
+@dataclass(frozen=True)
+class ConfigSchema:
+    fields: Tuple[FieldSpec, ...]
+    by_name: Dict[str, FieldSpec]
+
+    @classmethod
+    def build(cls, config_cls: type) -> ConfigSchema:
+        hints = get_type_hints(config_cls)
+        specs = []
+        # noinspection PyTypeChecker
+        for f in fields(config_cls):
+            if f.name.startswith("_"):
+                continue
+            f_type = hints.get(f.name, str) if isinstance(f.type, str) else f.type
+            arg = f.metadata.get(FIELD_ARG, None)
+            if arg == AUTO_ARG:
+                arg = "--" + f.name.replace("_", "-")
+            specs.append(
+                FieldSpec(
+                    name=f.name,
+                    field=f,
+                    type=f_type,
+                    arg=arg or None,
+                    help_text=f.metadata.get(FIELD_HELP_TEXT, None),
+                    serializer=f.metadata.get(FIELD_SERIALIZER, do_not_serialize_serializer),
+                    validators=tuple(f.metadata.get(FIELD_VALIDATORS, [])),
+                    modifiable=f.metadata.get(FIELD_MODIFIABLE, True),
+                    is_config=_is_config_field(f),
+                    secret=f.metadata.get(FIELD_SECRET, False),
+                )
+            )
+        return cls(fields=tuple(specs), by_name={spec.name: spec for spec in specs})
+
+
+class _Transaction:
+    """
+    State of a `ConfigBase.batch()`: a snapshot of every config in the tree for rollback, and which fields
+    were assigned on each config so only those get validated on commit.
+    """
+
+    def __init__(self, root: ConfigBase):
+        self.root = root
+        self.snapshots: Dict[int, Tuple[ConfigBase, Dict[str, Any]]] = {}
+        self.dirty: Dict[int, Set[str]] = {}
+        self.attach(root)
+
+    def attach(self, config: ConfigBase) -> None:
+        for node in config._iter_configs():
+            object.__setattr__(node, "_txn", self)
+            if id(node) not in self.snapshots:
+                self.snapshots[id(node)] = (node, node._snapshot())
+
+    def touch(self, config: ConfigBase, name: str) -> None:
+        self.dirty.setdefault(id(config), set()).add(name)
+
+    def collect_errors(self, config: ConfigBase) -> Dict[str, ValidationError]:
+        errors = {}
+        dirty = self.dirty.get(id(config), ())
+        for spec in config.schema().fields:
+            value = getattr(config, spec.name)
+            if spec.is_config:
+                if spec.name in dirty:
+                    # replaced as a whole, so validate the entire new subtree
+                    sub_errors, _ = value.validate_all(raise_error=False)
+                else:
+                    sub_errors = self.collect_errors(value)
+                if sub_errors:
+                    errors[spec.name] = sub_errors
+            elif spec.name in dirty:
+                field_errors = config.validate_field(spec, value)
+                config._validation_errors[spec.name] = field_errors
+                if field_errors:
+                    errors[spec.name] = field_errors
+        return errors
+
+    def rollback(self) -> None:
+        for node, snapshot in self.snapshots.values():
+            node._restore(snapshot)
+
+    def detach(self) -> None:
+        for node, _ in self.snapshots.values():
+            object.__setattr__(node, "_txn", None)
+
+
+def _is_config_field(f: Field[Any]) -> bool:
+    factory = f.default_factory
+    return factory is not MISSING and isinstance(factory, type) and issubclass(factory, ConfigBase)
+
+
 @dataclass
 class ConfigBase:
     VALIDATION_ERRORS_ON_SETATTR = True
 
     _initialized: ClassVar[Set] = set()
+    _schema: ClassVar[Optional[ConfigSchema]] = None
+    _txn: ClassVar[Optional[_Transaction]] = None
 
     _source: Dict[str, str] = field(default_factory=dict)
     _modified: Set[str] = field(default_factory=set)
@@ -167,25 +283,56 @@ class ConfigBase:
         if cls not in ConfigBase._initialized:
             ConfigBase._initialized.add(cls)
             dataclass()(cls)
+            try:
+                cls._schema = ConfigSchema.build(cls)
+            except NameError:
+                # forward reference to a class that is not defined yet, resolved on first use instead
+                pass
+
+    @classmethod
+    def schema(cls) -> ConfigSchema:
+        schema = cls.__dict__.get("_schema")
+        if schema is None:
+            schema = cls._schema = ConfigSchema.build(cls)
+        return schema
+
+    @classmethod
+    def secret_paths(cls, prefix: str = "") -> List[str]:
+        """
+        Dotted paths of every field declared with `secret=True`, nested sections included.
+        """
+        paths = []
+        for spec in cls.schema().fields:
+            if spec.is_config:
+                paths += spec.type.secret_paths(f"{prefix}{spec.name}.")
+            elif spec.secret:
+                paths.append(prefix + spec.name)
+        return paths
 
     def __post__init__(self):
         self._init_tracking()
 
     def __setattr__(self, name, value):
-        # noinspection PyTypeChecker
-        matching_fields = list(f for f in fields(self) if name == f.name)
-        if len(matching_fields) == 0:
+        spec = type(self).schema().by_name.get(name)
+        if spec is None:
             return super().__setattr__(name, value)
-        fld = matching_fields[0]
 
         if not hasattr(self, name) or value == getattr(self, name):
             return super().__setattr__(name, value)
 
-        if not fld.metadata.get(FIELD_MODIFIABLE, True):
+        if not spec.modifiable:
             raise AttributeError(f"Field '{name}' is not modifiable")
 
-        errors = self.validate_field(fld, value)
-        self._validation_errors[fld.name] = errors
+        if self._txn is not None:
+            # validated once when the batch commits
+            if spec.is_config:
+                self._txn.attach(value)
+            self._txn.touch(self, name)
+            self._modified.add(name)
+            return super().__setattr__(name, value)
+
+        errors = self.validate_field(spec, value)
+        self._validation_errors[name] = errors
         if ConfigBase.VALIDATION_ERRORS_ON_SETATTR and len(errors):
             msg = "\n".join(f"- {m}" for m in errors)
             raise ValueError(f"Validation failed:\n{msg}")
@@ -197,8 +344,11 @@ class ConfigBase:
         return super().__setattr__(name, value)
 
     @staticmethod
-    def validate_field(fld: Field[Any], value: Any, raise_error=False) -> List[str]:
-        validators = fld.metadata.get(FIELD_VALIDATORS, [])
+    def validate_field(fld: Field[Any] | FieldSpec, value: Any, raise_error=False) -> List[str]:
+        if isinstance(fld, FieldSpec):
+            validators = fld.validators
+        else:
+            validators = fld.metadata.get(FIELD_VALIDATORS, [])
         errors = []
         for v in validators:
             errors += v(value)
@@ -208,26 +358,73 @@ class ConfigBase:
 
         return errors
 
+    @contextmanager
+    def batch(self) -> Iterator[Self]:
+        """
+        Apply several changes as one transaction:
+
+            with config.batch():
+                config.monitor.poll_s = 0.5
+                config.monitor.in_queue_color = "orange"
+
+        Assignments inside the block skip validation; on exit the assigned fields are validated once,
+        and if any of them fail (or the block raises) every config in the tree is rolled back to its
+        state before the batch. Nested batches join the outermost one. Mutating values in place
+        (e.g. list.append) is not tracked, assign a new value instead.
+        """
+        if self._txn is not None:
+            yield self
+            return
+
+        txn = _Transaction(self)
+        try:
+            yield self
+            errors = txn.collect_errors(self)
+            if errors and ConfigBase.VALIDATION_ERRORS_ON_SETATTR:
+                raise ValueError(self._get_validation_message(errors))
+        except BaseException:
+            txn.rollback()
+            raise
+        finally:
+            txn.detach()
+
+    def _iter_configs(self) -> Iterator[ConfigBase]:
+        yield self
+        for spec in self.schema().fields:
+            if spec.is_config:
+                yield from getattr(self, spec.name)._iter_configs()
+
+    def _snapshot(self) -> Dict[str, Any]:
+        state = {spec.name: getattr(self, spec.name) for spec in self.schema().fields}
+        state["_source"] = dict(self._source)
+        state["_modified"] = set(self._modified)
+        state["_validation_errors"] = dict(self._validation_errors)
+        state["_file_path"] = self._file_path
+        return state
+
+    def _restore(self, state: Dict[str, Any]) -> None:
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
     def _set_silently(self, name: str, value):
         object.__setattr__(self, name, value)
 
     def _init_tracking(self):
-        # noinspection PyTypeChecker
-        for f in fields(self):
-            if f.name.startswith("_"):
-                continue
-            self._source.setdefault(f.name, DEFAULT_SOURCE)
+        for spec in self.schema().fields:
+            self._source.setdefault(spec.name, DEFAULT_SOURCE)
 
     @classmethod
-    def _get_field_type(cls, f: Field[Any]):
-        cls_types = get_type_hints(cls)
-        if isinstance(f.type, str):
-            return cls_types.get(f.name, str)
-        return f.type
+    def _get_field_type(cls, f: Field[Any] | FieldSpec):
+        spec = cls.schema().by_name.get(f.name)
+        if spec is not None:
+            return spec.type
+        return f.type if not isinstance(f.type, str) else get_type_hints(cls).get(f.name, str)
 
     @staticmethod
-    def _is_config(f: Field[Any]):
-        return f.default_factory != MISSING and issubclass(f.default_factory, ConfigBase)
+    def _is_config(f: Field[Any] | FieldSpec):
+        if isinstance(f, FieldSpec):
+            return f.is_config
+        return _is_config_field(f)
 
     @classmethod
     def fill_arg_parse(
@@ -240,37 +437,28 @@ class ConfigBase:
         if namespace:
             group = parser.add_argument_group(title=namespace, description=description)
 
-        # noinspection PyTypeChecker
-        for f in fields(cls):
-            help_text = f.metadata.get(FIELD_HELP_TEXT, None)
-            arg = f.metadata.get(FIELD_ARG, None)
-
-            name = f.name
-
-            if name.startswith("_"):
-                continue
-
-            if not arg:
+        for spec in cls.schema().fields:
+            if not spec.arg:
                 continue
 
-            if arg == AUTO_ARG:
-                arg = "--" + name.replace("_", "-")
-
-            name = name
-            f_type = cls._get_field_type(f)
-
-            if cls._is_config(f):
-                f.default_factory.fill_arg_parse(
-                    group,
-                    namespace=f"{namespace}.{name}" if arg == AUTO_ARG else arg,
-                    description=help_text,
-                )
-            elif f_type is bool:
+            if spec.is_config:
+                spec.type.fill_arg_parse(group, namespace=spec.arg, description=spec.help_text)
+            elif spec.type is bool:
                 parser.add_argument(
-                    arg, dest=name, action="store_true", default=argparse.SUPPRESS, help=help_text
+                    spec.arg,
+                    dest=spec.name,
+                    action="store_true",
+                    default=argparse.SUPPRESS,
+                    help=spec.help_text,
                 )
             else:
-                parser.add_argument(arg, dest=name, type=f_type, default=argparse.SUPPRESS, help=help_text)
+                parser.add_argument(
+                    spec.arg,
+                    dest=spec.name,
+                    type=spec.type,
+                    default=argparse.SUPPRESS,
+                    help=spec.help_text,
+                )
 
     @classmethod
     def get_argument_parser(cls, *args, **kwargs) -> argparse.ArgumentParser:
@@ -279,25 +467,19 @@ class ConfigBase:
         return parser
 
     def _iter_fields(self, include_defaults: bool, only_serializable: bool = False):
-        for f in fields(self):
-            name = f.name
-            if name.startswith("_"):
-                continue
-
+        for spec in self.schema().fields:
+            name = spec.name
             source = self._source.get(name, DEFAULT_SOURCE)
             if not include_defaults and source == DEFAULT_SOURCE:
                 continue
 
-            value = getattr(self, name)
-            comment = f.metadata.get(FIELD_HELP_TEXT)
-            serializer = f.metadata.get(FIELD_SERIALIZER, do_not_serialize_serializer)
-            if only_serializable and serializer == do_not_serialize_serializer:
+            if only_serializable and spec.serializer == do_not_serialize_serializer:
                 continue
-            yield name, f, value, comment, serializer, source
+            yield name, spec, getattr(self, name), spec.help_text, spec.serializer, source
 
     def _walk(self, include_defaults: bool) -> Iterator[Node]:
-        for name, f, value, comment, serializer, source in self._iter_fields(include_defaults):
-            if self._is_config(f):
+        for name, spec, value, comment, serializer, source in self._iter_fields(include_defaults):
+            if spec.is_config:
                 # recurse into child config
                 value: ConfigBase
                 yield TableNode(
@@ -325,6 +507,8 @@ class ConfigBase:
     def as_toml(
         self, include_defaults: bool, comment: Literal[None, "help_text", "source"] = None, _table=None
     ):
+        import tomlkit
+
         def fill(table, nodes: Iterable[Node]) -> None:
             for node in nodes:
                 if isinstance(node, TableNode):
@@ -356,54 +540,99 @@ class ConfigBase:
             args = parser.parse_args(argv or None)
 
         cfg = cls()
-        # noinspection PyTypeChecker
-        for f in fields(cls):
-            if cls._is_config(f):
-                val = f.default_factory.from_args(args, argv)
-                setattr(cfg, f.name, val)
-                cfg._source[f.name] = "arg"
-            elif hasattr(args, f.name):
-                val = getattr(args, f.name)
-                if val is not None:
-                    setattr(cfg, f.name, val)
-                    cfg._source[f.name] = "arg"
-
+        with cfg.batch():
+            cfg._fill_from_args(args)
         return cfg
 
+    def _fill_from_args(self, args: argparse.Namespace) -> None:
+        for spec in self.schema().fields:
+            if spec.is_config:
+                child: ConfigBase = getattr(self, spec.name)
+                child._fill_from_args(args)
+                if len(child._modified) > 0:
+                    self._modified.add(spec.name)
+                self._source[spec.name] = "arg"
+            elif hasattr(args, spec.name):
+                val = getattr(args, spec.name)
+                if val is not None:
+                    setattr(self, spec.name, val)
+                    self._source[spec.name] = "arg"
+
     @classmethod
-    def from_file(cls, file: Path | str) -> Self:
-        loaded = tomlkit.loads(file.read_text(encoding="utf-8"))
+    def from_file(cls, file: Path | str, round_trip: bool = False) -> Self:
+        """
+        Parse with the stdlib `tomllib`; `round_trip=True` uses tomlkit, which keeps comments and
+        formatting but is several times slower and never needed just to read values.
+        """
+        file = Path(file)
+        text = file.read_text(encoding="utf-8")
+        if round_trip:
+            import tomlkit
+
+            loaded = tomlkit.loads(text).unwrap()
+        else:
+            import tomllib
+
+            loaded = tomllib.loads(text)
         # noinspection PyTypeChecker
         cfg = cls.from_dict(loaded, source=file)
         cfg._file_path = file
         return cfg
 
+    @classmethod
+    def from_files(cls, files: Iterable[Path | str], cache: LayerCache = None) -> Self:
+        """
+        Merge config layers in order, later files taking precedence; missing files are skipped.
+        """
+        cache = cache or LayerCache()
+        cfg = cls()
+        with cfg.batch():
+            for file in files:
+                file = Path(file)
+                loaded = cache.read(file)
+                if loaded is not None:
+                    cfg.update_from(cls.from_dict(loaded, source=file))
+        return cfg
+
     def get_file_path(self) -> Path | None:
         return self._file_path
 
     @classmethod
-    def from_dict(cls, config_dict: Dict[Serializable], validate: bool = False, source: Any = "from_dict") -> Self:
+    def from_dict(cls, config_dict: Dict[Serializable], source: Any = "from_dict") -> Self:
+        """
+        Build a config from (nested) plain values, validated together once all of them are set.
+        """
         cfg = cls()
-        # noinspection PyTypeChecker
-        for fld in fields(cls):
-            name = fld.name
+        with cfg.batch():
+            cfg._fill_from_dict(config_dict, source)
+        return cfg
+
+    def _fill_from_dict(self, config_dict: Dict[Serializable], source: Any) -> None:
+        for spec in self.schema().fields:
+            name = spec.name
             if name in config_dict:
                 value = config_dict[name]
-                if cls._is_config(fld):
-                    instance: ConfigBase = cls._get_field_type(fld).from_dict(value, validate=validate, source=source)
-                    setattr(cfg, name, instance)
-                    if len(instance._modified) > 0:
-                        cfg._modified.add(name)
+                if spec.is_config:
+                    child: ConfigBase = getattr(self, name)
+                    child._fill_from_dict(value, source)
+                    if len(child._modified) > 0:
+                        self._modified.add(name)
                 else:
-                    if validate:
-                        cls.validate_field(fld, value)
-                    setattr(cfg, name, cls._get_field_type(fld)(value))
-                    cfg._modified.add(name)
+                    setattr(self, name, self._coerce(spec, value))
+                    self._modified.add(name)
 
-                cfg._source[name] = source
-        return cfg
+                self._source[name] = source
+
+    @staticmethod
+    def _coerce(spec: FieldSpec, value: Any) -> Any:
+        # list() would split a string into characters and fails on a scalar, leave those to the validators
+        if spec.type is list and not isinstance(value, (list, tuple)):
+            return value
+        return spec.type(value)
 
     def save(self, path: Path | str = None, include_defaults=False, comment=True):
+        import tomlkit
+
         path = Path(path)
         path.parent.mkdir(parents=True, exist_ok=True)
         doc = self.as_toml(include_defaults=include_defaults, comment='help_text' if comment else None)
@@ -414,51 +643,67 @@ class ConfigBase:
         if not isinstance(other, type(self)):
             raise TypeError(f"'other' must be {type(self).__name__}")
 
-        for f in fields(self):
-            name = f.name
+        with self.batch():
+            self._merge(other)
+        return self
+
+    def _merge(self, other: ConfigBase) -> None:
+        for spec in self.schema().fields:
+            name = spec.name
 
             my_val = getattr(self, name)
             their_val = getattr(other, name, None)
 
-            if name == "discord_webhook_url":
-                pass
-
-            if self._is_config(f):
+            if spec.is_config:
                 if their_val is not None:
                     my_val.update_from(their_val)
                 continue
 
-            if name.startswith("_"):
-                continue
-
-            if not f.metadata.get(FIELD_MODIFIABLE, True):
+            if not spec.modifiable:
                 continue
 
             if name not in other._modified:
                 continue
 
             if my_val != their_val:
-                self._set_silently(name, their_val)
+                setattr(self, name, their_val)
             self._source[name] = other._source.get(name, "merge")
             self._modified.add(name)
 
-        return self
+    def diff(self, other: Self, _prefix: str = "") -> Dict[str, Set[str]]:
+        """
+        Names of the fields that differ from `other`, grouped by dotted section path ("" for this level).
+        """
+        changes: Dict[str, Set[str]] = {}
+        for spec in self.schema().fields:
+            mine, theirs = getattr(self, spec.name), getattr(other, spec.name)
+            if spec.is_config:
+                changes.update(mine.diff(theirs, f"{_prefix}{spec.name}."))
+            elif mine != theirs:
+                changes.setdefault(_prefix.rstrip("."), set()).add(spec.name)
+        return changes
+
+    def section(self, path: str) -> ConfigBase:
+        """
+        Nested config at a dotted path as returned by `diff`.
+        """
+        node = self
+        for name in filter(None, path.split(".")):
+            node = getattr(node, name)
+        return node
 
     def validate_all(self, raise_error: bool = True) -> Tuple[ValidationError, str]:
-        # noinspection PyTypeChecker
         validation_errors = {}
-        for f in fields(self):
-            if f.name.startswith('_'):
-                continue
-            if self._is_config(f):
-                cfg: ConfigBase = getattr(self, f.name)
+        for spec in self.schema().fields:
+            if spec.is_config:
+                cfg: ConfigBase = getattr(self, spec.name)
                 errors, _ = cfg.validate_all(raise_error=False)
                 if len(errors) > 0:
-                    validation_errors[f.name], _ = cfg.validate_all(raise_error=False)
+                    validation_errors[spec.name] = errors
 
-            errors = self.validate_field(f, getattr(self, f.name, None), raise_error=False)
+            errors = self.validate_field(spec, getattr(self, spec.name, None), raise_error=False)
             if len(errors) > 0:
-                validation_errors[f.name] = errors
+                validation_errors[spec.name] = errors
 
         if validation_message := self._get_validation_message(validation_errors):
             if raise_error:
@@ -470,6 +715,13 @@ class ConfigBase:
     def _get_validation_message(
         validation_errors: Dict[str, ValidationError], prefix: str = ""
     ) -> str | None:
+        if message := ConfigBase._format_validation_errors(validation_errors, prefix):
+            return "There are some validation errors:\n" + message
+
+        return None
+
+    @staticmethod
+    def _format_validation_errors(validation_errors: Dict[str, ValidationError], prefix: str = "") -> str:
         message = ""
         for name, errors in validation_errors.items():
             if len(errors) == 0:
@@ -479,16 +731,105 @@ class ConfigBase:
                 for error in errors:
                     message += f"{prefix}  - {error}\n"
             elif isinstance(errors, dict):
-                message += ConfigBase._get_validation_message(validation_errors, prefix=prefix + "  ")
+                message += ConfigBase._format_validation_errors(errors, prefix=prefix + "  ")
             else:
                 raise ValueError(
                     f"Unexpected type: ({type(errors)}) '{errors}'",
                 )
+        return message
 
-        if message:
-            return "There are some validation errors:\n" + message
 
-        return None
+class LayerCache:
+    """
+    Parsed TOML files keyed by path, mtime and size, so an unchanged file is never parsed twice. With a
+    `cache_file` the entries are also kept on disk as JSON between runs; call `save()` after loading.
+    Layers holding any of the dotted `secrets` paths (see `ConfigBase.secret_paths`) stay in memory only
+    and are parsed again on the next run.
+    """
+
+    VERSION = 2
+
+    def __init__(self, cache_file: Path | str = None, secrets: Iterable[str] = ()):
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.secrets = [path.split(".") for path in secrets]
+        self._entries: Dict[str, Tuple[int, int, dict]] = {}
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        if self.cache_file is not None:
+            self._load()
+
+    @staticmethod
+    def signature(file: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = file.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def read(self, file: Path) -> Optional[dict]:
+        """
+        Return the parsed content of `file`, or None if it does not exist.
+        """
+        signature = self.signature(file)
+        if signature is None:
+            return None
+
+        key = str(file.resolve())
+        entry = self._entries.get(key)
+        if entry is not None and (entry[0], entry[1]) == signature:
+            self.hits += 1
+            return entry[2]
+
+        # not needed at all while every layer is served from the cache
+        import tomllib
+
+        self.misses += 1
+        loaded = tomllib.loads(file.read_text(encoding="utf-8"))
+        self._entries[key] = (*signature, loaded)
+        self._dirty = True
+        return loaded
+
+    def save(self) -> None:
+        if self.cache_file is None or not self._dirty:
+            return
+        entries = {
+            key: [mtime, size, loaded]
+            for key, (mtime, size, loaded) in self._entries.items()
+            if not self._holds_secret(loaded)
+        }
+        data = {"version": self.VERSION, "entries": entries}
+        # noinspection PyBroadException
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_file.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(tmp, self.cache_file)
+            self._dirty = False
+        except Exception:
+            # best effort, e.g. values JSON can't represent (TOML dates) or a read-only cache dir
+            pass
+
+    def _holds_secret(self, loaded: dict) -> bool:
+        for path in self.secrets:
+            node = loaded
+            for key in path:
+                node = node.get(key) if isinstance(node, dict) else None
+            if node is not None:
+                return True
+        return False
+
+    def _load(self) -> None:
+        # noinspection PyBroadException
+        try:
+            data = json.loads(self.cache_file.read_text(encoding="utf-8"))
+            if data.get("version") == self.VERSION:
+                self._entries = {key: tuple(entry) for key, entry in data["entries"].items()}
+            else:
+                # rewritten on save, older versions kept secrets on disk
+                self._dirty = True
+        except Exception:
+            self._entries = {}
 
 
 def get_config_file(
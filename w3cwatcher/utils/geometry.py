@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Tuple
+from typing import List, Sequence, Tuple
 
 Point = Tuple[int, int]
 Rect = Tuple[int, int, int, int]
@@ -24,3 +24,29 @@ def crop_to_aspect_ratio(rect: Rect, aspect_ratio: float) -> Rect:
     else:
         new_h = int(round(width / aspect_ratio))
         return l, t, r, t + new_h
+
+
+def check_relative_offsets(offsets: Sequence[Tuple[float, float]]) -> None:
+    for x_relative_ltr, y_relative_ttb in offsets:
+        if not (0.0 <= x_relative_ltr <= 100.0 and 0.0 <= y_relative_ttb <= 100.0):
+            raise ValueError("x_relative_ltr and y_relative_ttb must be in the 0..100 range")
+
+
+def relative_to_points(
+    bbox: Rect, offsets: Sequence[Tuple[float, float]]
+) -> Tuple[List[Point], List[Point]]:
+    """
+    Map relative offsets inside `bbox` to (screen, bbox relative) pixel positions.
+    """
+    left, top, right, bottom = bbox
+    width = right - left
+    height = bottom - top
+
+    screen_points: List[Point] = []
+    window_points: List[Point] = []
+    for x_relative_ltr, y_relative_ttb in offsets:
+        x_pixel_offset = int(round(x_relative_ltr * width))
+        y_pixel_offset = int(round(y_relative_ttb * height))
+        screen_points.append((left + x_pixel_offset, top + y_pixel_offset))
+        window_points.append((x_pixel_offset, y_pixel_offset))
+    return screen_points, window_points
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-from typing import Optional, Tuple
+from typing import List, Optional, Sequence, Tuple
 
+import numpy as np
 from PIL import Image, ImageGrab, ImageDraw
 
-from .geometry import crop_to_aspect_ratio, Point
+from .color import COLOR_NAMES_ARRAY, classify_rules
+from .geometry import crop_to_aspect_ratio, check_relative_offsets, relative_to_points, Point
 from .window import get_client_bbox_in_screen
 
 
@@ -14,26 +16,29 @@ def hwnd_relative_to_screen_xy(
     y_relative_ttb: float,
     aspect_ratio: float = None,
 ) -> Tuple[Point, Point]:
+    screen_points, window_points = hwnd_relative_to_screen_points(
+        hwnd, [(x_relative_ltr, y_relative_ttb)], aspect_ratio
+    )
+    return screen_points[0], window_points[0]
 
 
-    if not (0.0 <= x_relative_ltr <= 100.0 and 0.0 <= y_relative_ttb <= 100.0):
-        raise ValueError("x_relative_ltr and y_relative_ttb must be in the 0..100 range")
+def hwnd_relative_to_screen_points(
+    hwnd: int,
+    offsets: Sequence[Tuple[float, float]],
+    aspect_ratio: float = None,
+) -> Tuple[List[Point], List[Point]]:
+    """
+    Map relative client offsets to (screen, window) pixel positions using a single client rect lookup.
+    Returns (0, 0) for every point if the client area is empty.
+    """
+    check_relative_offsets(offsets)
 
     try:
         client_bbox = get_client_bbox_in_screen(hwnd, aspect_ratio)
     except RuntimeError:
-        return (0,0), (0,0)
-
-    left, top, right, bottom = client_bbox
-    width = right - left
-    height = bottom - top
+        return [(0, 0)] * len(offsets), [(0, 0)] * len(offsets)
 
-    x_pixel_offset = int(round(x_relative_ltr * width))
-    y_pixel_offset = int(round(y_relative_ttb * height))
-    screen_x = left + x_pixel_offset
-    screen_y = top + y_pixel_offset
-
-    return (screen_x, screen_y), (x_pixel_offset, y_pixel_offset)
+    return relative_to_points(client_bbox, offsets)
 
 
 def grab_pixel_rgb(screen_x: int, screen_y: int) -> Tuple[int, int, int]:
@@ -101,3 +106,10 @@ def name_color(r: int, g: int, b: int) -> str:
         return "purple" if r > 100 else "blue"
 
     return "unknown"
+
+
+def name_colors(pixels: np.ndarray) -> np.ndarray:
+    """
+    Vectorized `name_color` for an (..., 3) array of RGB pixels; returns an array of color names.
+    """
+    return COLOR_NAMES_ARRAY[classify_rules(pixels)]
@@ -4,22 +4,17 @@ import sys
 import ctypes
 from pathlib import Path
 from typing import Optional
-import tkinter as tk
-from tkinter import messagebox
 
 
 _IS_WINDOWS = os.name == "nt"
 
+# GetAncestor flags (not all exposed in win32con)
+GA_PARENT = 1
+GA_ROOT = 2
+GA_ROOTOWNER = 3
 
-if _IS_WINDOWS:
-    from win32com.client import Dispatch
-    from win32com.shell import shell, shellcon
-
-    # GetAncestor flags (not all exposed in win32con)
-    GA_PARENT = 1
-    GA_ROOT = 2
-    GA_ROOTOWNER = 3
 
+if _IS_WINDOWS:
     DPI_RESULT_OK = 0
     DPI_RESULT_ALREADY_SET = 0x5
     PROCESS_PER_MONITOR_DPI_AWARE = 2
@@ -67,7 +62,12 @@ def open_file(file: Path | str) -> None:
     else:
         subprocess.Popen(["xdg-open", str(file)])
 
+
 def show_error(message: str) -> None:
+    # tkinter is only needed when there is an error to show
+    import tkinter as tk
+    from tkinter import messagebox
+
     root = tk.Tk()
     root.withdraw()
     messagebox.showerror("W3CWatcher Error", message)
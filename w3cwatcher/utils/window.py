@@ -1,11 +1,17 @@
 from __future__ import annotations
 
-from typing import Callable, Optional
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Optional, Pattern, Sequence, Tuple
 
-import win32con
-import win32gui
+try:
+    import win32con
+    import win32gui
+except ImportError:  # non-Windows; window helpers raise through ensure_windows()
+    win32con = win32gui = None
 
-from .geometry import Point, Rect, crop_to_aspect_ratio
+from .geometry import Point, Rect, check_relative_offsets, crop_to_aspect_ratio, relative_to_points
 from .platform import ensure_windows, GA_ROOT
 
 
@@ -30,15 +36,122 @@ def _enum_windows(predicate: Callable[[int, str], bool]) -> Optional[int]:
 
     try:
         win32gui.EnumWindows(_cb, None)
-    except Exception as ex:
-        print(ex)
+    except Exception:
+        # EnumWindows reports an error when the callback stops enumeration early, anything else is real
+        if result is None:
+            raise
     return result
 
 
-def find_window_by_title(keyword: str) -> Optional[int]:
-    if not keyword:
-        raise ValueError("keyword must be a non-empty string")
-    return _enum_windows(lambda _hwnd, title: keyword.lower() in title.lower())
+@dataclass(frozen=True, slots=True)
+class TitleMatcher:
+    """
+    A window title test prepared once: a substring or a regular expression, both ignoring case. `matches`
+    takes the already lowercased title, so one `lower()` per window serves every matcher.
+    """
+
+    keyword: str
+    lowered: str  # substring matchers only
+    pattern: Optional[Pattern[str]] = None
+
+    @classmethod
+    def substring(cls, keyword: str) -> TitleMatcher:
+        if not keyword:
+            raise ValueError("keyword must be a non-empty string")
+        return cls(keyword, keyword.lower())
+
+    @classmethod
+    def regex(cls, pattern: str) -> TitleMatcher:
+        if not pattern:
+            raise ValueError("pattern must be a non-empty string")
+        try:
+            compiled = re.compile(pattern, re.IGNORECASE)
+        except re.error as ex:
+            raise ValueError(f"Invalid window title pattern {pattern!r}: {ex}") from None
+        return cls(pattern, "", compiled)
+
+    def matches(self, lowered_title: str) -> bool:
+        if self.pattern is not None:
+            return self.pattern.search(lowered_title) is not None
+        return self.lowered in lowered_title
+
+
+def _as_matcher(keyword: str | TitleMatcher) -> TitleMatcher:
+    return keyword if isinstance(keyword, TitleMatcher) else TitleMatcher.substring(keyword)
+
+
+def find_window_by_title(keyword: str | TitleMatcher) -> Optional[int]:
+    matcher = _as_matcher(keyword)
+    return _enum_windows(lambda _hwnd, title: matcher.matches(title.lower()))
+
+
+def find_windows_by_titles(keywords: Sequence[str | TitleMatcher]) -> Dict[Hashable, Optional[int]]:
+    """
+    Find the first visible window for each title keyword (or TitleMatcher) in a single EnumWindows pass.
+    """
+    ensure_windows()
+    if not keywords or not all(keywords):
+        raise ValueError("keywords must be non-empty strings")
+
+    pending = {keyword: _as_matcher(keyword) for keyword in keywords}
+    result: Dict[Hashable, Optional[int]] = {keyword: None for keyword in keywords}
+
+    def _cb(hwnd, _param):
+        if not win32gui.IsWindowVisible(hwnd):
+            return True  # continue
+        title = (win32gui.GetWindowText(hwnd) or "").lower()
+        if not title:
+            return True
+        for keyword, matcher in list(pending.items()):
+            if matcher.matches(title):
+                result[keyword] = hwnd
+                del pending[keyword]
+        return bool(pending)  # stop once every keyword matched
+
+    try:
+        win32gui.EnumWindows(_cb, None)
+    except Exception:
+        # EnumWindows reports an error when the callback stops enumeration early, anything else is real
+        if pending:
+            raise
+    return result
+
+
+class WindowLocator:
+    """
+    Locates windows by title keyword (or TitleMatcher), caching handles between calls.
+
+    Cached handles are revalidated with IsWindow/GetWindowText; a full enumeration only runs for keywords
+    whose handle is missing or went stale, and covers all of them in one pass.
+    """
+
+    def __init__(self, keywords: Sequence[str | TitleMatcher]):
+        if not keywords or not all(keywords):
+            raise ValueError("keywords must be non-empty strings")
+        self.keywords = tuple(dict.fromkeys(keywords))
+        self._matchers = {keyword: _as_matcher(keyword) for keyword in self.keywords}
+        self._cache: Dict[Hashable, Optional[int]] = {keyword: None for keyword in self.keywords}
+        self.enumerations = 0
+
+    def locate(self) -> Dict[Hashable, Optional[int]]:
+        stale = [keyword for keyword, hwnd in self._cache.items() if not self._is_valid(keyword, hwnd)]
+        if stale:
+            self.enumerations += 1
+            self._cache.update(find_windows_by_titles(stale))
+        return dict(self._cache)
+
+    def invalidate(self) -> None:
+        self._cache = {keyword: None for keyword in self.keywords}
+
+    def _is_valid(self, keyword: Hashable, hwnd: Optional[int]) -> bool:
+        if not hwnd:
+            return False
+        try:
+            if not (win32gui.IsWindow(hwnd) and win32gui.IsWindowVisible(hwnd)):
+                return False
+            return self._matchers[keyword].matches((win32gui.GetWindowText(hwnd) or "").lower())
+        except Exception:
+            return False
 
 
 def bring_to_foreground(hwnd: int) -> None:
@@ -67,6 +180,12 @@ def point_belongs_to_window(hwnd: int, screen_pos: Point) -> bool:
     return this_root == that_root
 
 
+def get_root_window_title_at(screen_pos: Point) -> str:
+    ensure_windows()
+    under = win32gui.WindowFromPoint(screen_pos)
+    return win32gui.GetWindowText(win32gui.GetAncestor(under, GA_ROOT))
+
+
 def get_client_bbox_in_screen(hwnd: int, aspect_ratio: float = None) -> Rect:
     ensure_windows()
     l, t = win32gui.ClientToScreen(hwnd, (0, 0))
@@ -81,3 +200,78 @@ def get_client_bbox_in_screen(hwnd: int, aspect_ratio: float = None) -> Rect:
         pass
 
     return client_bbox
+
+
+@dataclass(frozen=True)
+class ProbeGeometry:
+    hwnd: int
+    client_bbox: Rect  # whole client area in screen coordinates, before cropping to the aspect ratio
+    screen_points: Tuple[Point, ...]
+    window_points: Tuple[Point, ...]
+
+
+class WindowGeometryCache:
+    """
+    Probe positions for a window, recomputed only when its handle or client rect changes, so a tick costs
+    two Win32 calls (ClientToScreen, GetClientRect) instead of the full mapping.
+
+    Also remembers whether the first probe landed on the window itself rather than on something covering
+    it. That check (WindowFromPoint plus two GetAncestor calls) is repeated every `ownership_ttl_s` and
+    whenever the geometry changes; a failed check is repeated on the next call.
+    """
+
+    def __init__(
+        self,
+        offsets: Sequence[Tuple[float, float]],
+        aspect_ratio: Optional[float] = None,
+        ownership_ttl_s: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        check_relative_offsets(offsets)
+        self.offsets = tuple(offsets)
+        self.aspect_ratio = aspect_ratio
+        self.ownership_ttl_s = ownership_ttl_s
+        self._clock = clock
+        self._geometry: Optional[ProbeGeometry] = None
+        self._owned_until = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def geometry(self, hwnd: int) -> Optional[ProbeGeometry]:
+        """
+        Probe positions for `hwnd`, None if its client area is empty (e.g. minimized).
+        """
+        try:
+            client_bbox = get_client_bbox_in_screen(hwnd)
+        except RuntimeError:
+            self.invalidate()
+            return None
+
+        cached = self._geometry
+        if cached is not None and cached.hwnd == hwnd and cached.client_bbox == client_bbox:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        bbox = client_bbox
+        if self.aspect_ratio is not None:
+            bbox = crop_to_aspect_ratio(client_bbox, self.aspect_ratio)
+        screen_points, window_points = relative_to_points(bbox, self.offsets)
+        self._geometry = ProbeGeometry(hwnd, client_bbox, tuple(screen_points), tuple(window_points))
+        self._owned_until = 0.0
+        return self._geometry
+
+    def belongs(self, geometry: ProbeGeometry) -> bool:
+        """
+        Whether the first probe of `geometry` is on its window, cached for `ownership_ttl_s` once true.
+        """
+        now = self._clock()
+        if geometry is self._geometry and now < self._owned_until:
+            return True
+        owned = point_belongs_to_window(geometry.hwnd, geometry.screen_points[0])
+        self._owned_until = now + self.ownership_ttl_s if owned and geometry is self._geometry else 0.0
+        return owned
+
+    def invalidate(self) -> None:
+        self._geometry = None
+        self._owned_until = 0.0